@@ -4,11 +4,24 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from app.extensions import db
+from app.auth.hashing import init_password_hasher
+from app.models.search import include_object
+from app.auth.identity_cache import init_identity_cache
+from app.auth.revocation import init_revocation_list, is_token_revoked
+from app.utils.cache import init_response_cache
+from app.utils.compression import init_compression
+from app.utils.jobs import init_job_queue
+from app.utils.metrics import init_metrics
+from app.utils.ratelimit import init_rate_limiter
+from app.utils.replica import init_replica
+from app.utils.request_metrics import init_request_metrics
+from app.utils.sqlite import init_sqlite_pragmas
 
 from config import config
 
 migrate = Migrate()
 jwt = JWTManager()
+jwt.token_in_blocklist_loader(is_token_revoked)
 
 
 def create_app(config_name: str = 'default') -> Flask:
@@ -16,18 +29,34 @@ def create_app(config_name: str = 'default') -> Flask:
     app.config.from_object(config[config_name])
 
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_sqlite_pragmas(app)
+    init_replica(app)
+    migrate.init_app(app, db, include_object=include_object)
+    init_request_metrics(app)
+    init_metrics(app)
     jwt.init_app(app)
+    init_revocation_list(app)
     CORS(app, origins=app.config.get('CORS_ORIGINS'))
+    init_response_cache(app)
+    init_compression(app)
+    init_identity_cache(app)
+    init_password_hasher(app)
+    init_rate_limiter(app)
+    init_job_queue(app)
 
     from app.api.posts import posts_bp
     from app.api.comments import comments_bp
+    from app.api.export import export_bp
     from app.auth.routes import auth_bp
     from app.ui_routes import ui 
 
     app.register_blueprint(posts_bp)
     app.register_blueprint(comments_bp)
+    app.register_blueprint(export_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(ui)
 
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
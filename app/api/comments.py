@@ -1,78 +1,135 @@
 
+from math import ceil
+from typing import Optional
+
 from flask import Blueprint, jsonify, request
-from sqlalchemy import desc
+from sqlalchemy import func, select
 
 from app import db
 from app.models import Comment, Post, User
 from app.schemas import CommentSchema, CommentCreateSchema
-from app.utils.decorators import validate_json, auth_required, paginate_query
+from app.services import ServiceError
+from app.services import comments as comment_service
+from app.utils.cache import tag_response
+from app.utils.decorators import (
+    validate_json, auth_required, paginate_query, cached_response, conditional_get, use_replica, sparse_fields
+)
+from app.utils.fieldsets import restricted_schema
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.ratelimit import rate_limit
 
 # Create blueprint
 comments_bp = Blueprint('comments', __name__, url_prefix='/api/comments')
 
 
+def _post_comments_version(post_id: int) -> Optional[tuple]:
+    # Comment authors are nested in the body, so a renamed commenter changes the version too
+    row = db.session.execute(
+        select(
+            Post.updated_at, func.count(Comment.id), func.max(Comment.updated_at), func.max(Comment.id),
+            func.max(User.updated_at)
+        )
+        .outerjoin(Comment, Comment.post_id == Post.id)
+        .outerjoin(User, User.id == Comment.author_id)
+        .where(Post.id == post_id, Post.is_published.is_(True))
+        .group_by(Post.id)
+    ).first()
+    if row is None:
+        return None
+    post_updated_at, count, comments_updated_at, last_id, authors_updated_at = row
+    return (
+        f'{post_id}:{post_updated_at.isoformat()}:{count}:{last_id}:{comments_updated_at}:{authors_updated_at}',
+        max(post_updated_at, comments_updated_at or post_updated_at, authors_updated_at or post_updated_at)
+    )
+
+
 @comments_bp.route('/posts/<int:post_id>', methods=['GET'])
+@use_replica
+@conditional_get(_post_comments_version)
+@cached_response
 @paginate_query(default_per_page=20, max_per_page=100)
-def get_post_comments(post_id: int, page: int, per_page: int) -> tuple:
+@sparse_fields(CommentSchema)
+def get_post_comments(post_id: int, page: int, per_page: int, fields: Optional[frozenset[str]]) -> tuple:
+    if 'before' in request.args:
+        return _get_post_comments_before(post_id, request.args['before'], per_page, fields)
     try:
-        
-        post = Post.query.get(post_id)
-        if not post or not post.is_published:
-            return jsonify({'error': 'Post not found'}), 404
-        
-        comments_query = Comment.query.filter_by(post_id=post_id).order_by(desc(Comment.created_at))
-        
-        # Apply pagination
-        paginated_comments = comments_query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        post, comments, total = comment_service.list_post_comments(post_id, page, per_page, fields)
         
         # Serialize comments
-        comment_schema = CommentSchema(many=True)
-        comments_data = comment_schema.dump(paginated_comments.items)
+        comment_schema = restricted_schema(CommentSchema, fields, many=True)
+        comments_data = comment_schema.dump(comments)
+        _tag_thread(post, comments)
     
         return jsonify({
             'comments': comments_data,
-            'post': {
-                'id': post.id,
-                'title': post.title,
-                'slug': post.slug
-            },
+            'post': _post_summary(post),
             'pagination': {
                 'page': page,
                 'per_page': per_page,
-                'total': paginated_comments.total,
-                'pages': paginated_comments.pages,
-                'has_next': paginated_comments.has_next,
-                'has_prev': paginated_comments.has_prev
+                'total': total,
+                'pages': ceil(total / per_page),
+                'has_next': page * per_page < total,
+                'has_prev': page > 1
             }
         }), 200
         
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
+    except Exception as err:
+        return jsonify({'error': 'Failed to fetch comments', 'details': str(err)}), 500
+
+
+def _post_summary(post: Post) -> dict:
+    return {'id': post.id, 'title': post.title, 'slug': post.slug}
+
+
+def _tag_thread(post: Post, comments: list[Comment]) -> None:
+    tag_response(
+        f'post:{post.id}',
+        f'comments:{post.id}',
+        *(f'user:{comment.author_id}' for comment in comments)
+    )
+
+
+def _get_post_comments_before(post_id: int, cursor: str, per_page: int,
+                              fields: Optional[frozenset[str]]) -> tuple:
+    try:
+        position = decode_cursor(cursor)
+    except InvalidCursor as err:
+        return jsonify({'error': str(err)}), 400
+    
+    try:
+        post, comments, has_next = comment_service.list_post_comments_before(post_id, position, per_page, fields)
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id) if has_next else None
+        
+        comment_schema = restricted_schema(CommentSchema, fields, many=True)
+        comments_data = comment_schema.dump(comments)
+        _tag_thread(post, comments)
+        
+        return jsonify({
+            'comments': comments_data,
+            'post': _post_summary(post),
+            'pagination': {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_next': has_next
+            }
+        }), 200
+        
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         return jsonify({'error': 'Failed to fetch comments', 'details': str(err)}), 500
 
 
 @comments_bp.route('', methods=['POST'])
+@rate_limit('write')
 @auth_required
 @validate_json(CommentCreateSchema)
 def create_comment(current_user: User, validated_data: dict) -> tuple:
 
     try:
-        post = Post.query.get(validated_data['post_id'])
-        if not post or not post.is_published:
-            return jsonify({'error': 'Post not found'}), 404
-        
-        comment = Comment(
-            name=validated_data['name'],
-            content=validated_data['content'],
-            post_id=validated_data['post_id'],
-            author_id=current_user.id
-        )
-        
-        db.session.add(comment)
-        db.session.commit()
+        comment = comment_service.create_comment(current_user, validated_data)
         
         comment_schema = CommentSchema()
         comment_data = comment_schema.dump(comment)
@@ -82,40 +139,39 @@ def create_comment(current_user: User, validated_data: dict) -> tuple:
             'comment': comment_data
         }), 201
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Failed to create comment', 'details': str(err)}), 500
 
 
 @comments_bp.route('/<int:comment_id>', methods=['GET'])
-def get_comment(comment_id: int) -> tuple:
+@use_replica
+@sparse_fields(CommentSchema)
+def get_comment(comment_id: int, fields: Optional[frozenset[str]]) -> tuple:
 
     try:
-        comment = Comment.query.get(comment_id)
-        if not comment:
-            return jsonify({'error': 'Comment not found'}), 404
+        comment = comment_service.get_comment(comment_id, fields)
         
-        comment_schema = CommentSchema()
+        comment_schema = restricted_schema(CommentSchema, fields)
         comment_data = comment_schema.dump(comment)
-        comment_data['author_id'] = comment.author_id
         
         return jsonify({'comment': comment_data}), 200
         
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         return jsonify({'error': 'Failed to fetch comment', 'details': str(err)}), 500
 
 
 @comments_bp.route('/<int:comment_id>', methods=['PUT'])
+@rate_limit('write')
 @auth_required
 def update_comment(comment_id: int, current_user: User) -> tuple:
 
     try:
-        comment = Comment.query.get(comment_id)
-        if not comment:
-            return jsonify({'error': 'Comment not found'}), 404
-        if not comment.can_edit(current_user.id):
-            return jsonify({'error': 'Permission denied'}), 403
-        
         if not request.is_json:
             return jsonify({'error': 'Request must be JSON'}), 400
         
@@ -123,17 +179,7 @@ def update_comment(comment_id: int, current_user: User) -> tuple:
         if not json_data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        if 'name' in json_data:
-            if not json_data['name'].strip():
-                return jsonify({'error': 'Name cannot be empty'}), 400
-            comment.name = json_data['name'].strip()
-        
-        if 'content' in json_data:
-            if not json_data['content'].strip():
-                return jsonify({'error': 'Content cannot be empty'}), 400
-            comment.content = json_data['content'].strip()
-        
-        db.session.commit()
+        comment = comment_service.update_comment(comment_id, current_user, json_data)
         
         comment_schema = CommentSchema()
         comment_data = comment_schema.dump(comment)
@@ -143,27 +189,26 @@ def update_comment(comment_id: int, current_user: User) -> tuple:
             'comment': comment_data
         }), 200
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Failed to update comment', 'details': str(err)}), 500
 
 
 @comments_bp.route('/<int:comment_id>', methods=['DELETE'])
+@rate_limit('write')
 @auth_required
 def delete_comment(comment_id: int, current_user: User) -> tuple:
     try:
-        comment = Comment.query.get(comment_id)
-        if not comment:
-            return jsonify({'error': 'Comment not found'}), 404
-
-        if not comment.can_delete(current_user.id):
-            return jsonify({'error': 'Permission denied'}), 403
-
-        db.session.delete(comment)
-        db.session.commit()
+        comment_service.delete_comment(comment_id, current_user)
 
         return jsonify({'message': 'Comment deleted successfully'}), 200
 
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Failed to delete comment', 'details': str(err)}), 500
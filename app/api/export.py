@@ -0,0 +1,31 @@
+import json
+from datetime import datetime
+from typing import Any, Iterator
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from app.services.export import iter_posts_with_comments
+
+# Create blueprint
+export_bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+
+def _encode(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+@export_bp.route('/posts.ndjson', methods=['GET'])
+def export_posts() -> Any:
+    since = request.args.get('since')
+    try:
+        since_dt = datetime.fromisoformat(since) if since else None
+    except ValueError:
+        return jsonify({'error': 'since must be an ISO 8601 datetime'}), 400
+    
+    def generate() -> Iterator[str]:
+        for post in iter_posts_with_comments(since=since_dt):
+            yield json.dumps(post, default=_encode, separators=(',', ':')) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
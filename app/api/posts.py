@@ -1,29 +1,43 @@
+import logging
+from typing import Optional, Sequence
 
-from flask import Blueprint, jsonify, request
-from sqlalchemy import desc
+from flask import Blueprint, current_app, jsonify, request
+from marshmallow import ValidationError
+from sqlalchemy import select
 
 from app import db
 from app.models import Post, User
 from app.schemas import PostSchema, PostCreateSchema, PostUpdateSchema, PostListSchema
-from app.utils.decorators import validate_json, auth_required, paginate_query
+from app.services import ServiceError
+from app.services import posts as post_service
+from app.utils.cache import tag_response
+from app.utils.decorators import (
+    validate_json, auth_required, paginate_query, cached_response, conditional_get, use_replica, sparse_fields
+)
+from app.utils.fieldsets import restricted_schema
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.utils.ratelimit import rate_limit
+
+logger = logging.getLogger('app.api')
 
 # Create blueprint
 posts_bp = Blueprint('posts', __name__, url_prefix='/api/posts')
 
 
 @posts_bp.route('', methods=['GET'])
+@use_replica
+@cached_response
 @paginate_query(default_per_page=10, max_per_page=50)
-def get_posts(page: int, per_page: int) -> tuple:
+@sparse_fields(PostListSchema)
+def get_posts(page: int, per_page: int, fields: Optional[frozenset[str]]) -> tuple:
+    if 'cursor' in request.args:
+        return _get_posts_by_cursor(request.args['cursor'], per_page, fields)
     try:
-        posts_query = Post.query.filter_by(is_published=True).order_by(desc(Post.created_at))
-        paginated_posts = posts_query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
-        
-        post_schema = PostListSchema(many=True)
+        paginated_posts = post_service.list_published_posts(page, per_page, fields)
+        
+        post_schema = restricted_schema(PostListSchema, fields, many=True)
         posts_data = post_schema.dump(paginated_posts.items)
+        _tag_feed(paginated_posts.items)
         
         return jsonify({
             'posts': posts_data,
@@ -41,77 +55,171 @@ def get_posts(page: int, per_page: int) -> tuple:
         return jsonify({'error': 'Failed to fetch posts', 'details': str(err)}), 500
 
 
+def _tag_feed(posts: Sequence[Post]) -> None:
+    tag_response('feed', *(f'post:{post.id}' for post in posts), *(f'user:{post.author_id}' for post in posts))
+
+
+def _get_posts_by_cursor(cursor: str, per_page: int, fields: Optional[frozenset[str]]) -> tuple:
+    try:
+        position = decode_cursor(cursor)
+    except InvalidCursor as err:
+        return jsonify({'error': str(err)}), 400
+    
+    try:
+        posts, has_next = post_service.list_published_posts_after(position, per_page, fields)
+        next_cursor = encode_cursor(posts[-1].created_at, posts[-1].id) if has_next else None
+        
+        post_schema = restricted_schema(PostListSchema, fields, many=True)
+        posts_data = post_schema.dump(posts)
+        _tag_feed(posts)
+        
+        return jsonify({
+            'posts': posts_data,
+            'pagination': {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_next': has_next
+            }
+        }), 200
+        
+    except Exception as err:
+        return jsonify({'error': 'Failed to fetch posts', 'details': str(err)}), 500
+
+
+@posts_bp.route('/search', methods=['GET'])
+@paginate_query(default_per_page=10, max_per_page=50)
+def search_posts(page: int, per_page: int) -> tuple:
+    try:
+        results, has_next = post_service.search_posts(request.args.get('q', ''), page, per_page)
+        
+        return jsonify({
+            'results': results,
+            'pagination': {
+                'page': page,
+                'per_page': per_page,
+                'has_next': has_next,
+                'has_prev': page > 1
+            }
+        }), 200
+        
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
+    except Exception as err:
+        return jsonify({'error': 'Failed to search posts', 'details': str(err)}), 500
+
+
+def _post_version(post_id: int) -> Optional[tuple]:
+    row = db.session.execute(
+        select(Post.updated_at, Post.comment_count, User.updated_at)
+        .join(User, User.id == Post.author_id)
+        .where(Post.id == post_id, Post.is_published.is_(True))
+    ).first()
+    if row is None:
+        return None
+    post_updated_at, comment_count, author_updated_at = row
+    return (
+        f'{post_id}:{post_updated_at.isoformat()}:{comment_count}:{author_updated_at.isoformat()}',
+        max(post_updated_at, author_updated_at)
+    )
+
+
 @posts_bp.route('/<int:post_id>', methods=['GET'])
-def get_post(post_id: int) -> tuple:
+@use_replica
+@conditional_get(_post_version)
+@cached_response
+@sparse_fields(PostSchema)
+def get_post(post_id: int, fields: Optional[frozenset[str]]) -> tuple:
     try:
-        post = Post.query.get(post_id)
-        if not post:
-            return jsonify({'error': 'Post not found'}), 404
-        if not post.is_published:
-            return jsonify({'error': 'Post not found'}), 404
+        post = post_service.get_published_post(post_id, fields)
         
-        post_schema = PostSchema()
+        post_schema = restricted_schema(PostSchema, fields)
         post_data = post_schema.dump(post)
-        post_data['author_id'] = post.author_id
+        if fields is None:
+            post_data['author_id'] = post.author_id
+        tag_response(f'post:{post.id}', f'user:{post.author_id}')
         
         return jsonify({'post': post_data}), 200
         
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         return jsonify({'error': 'Failed to fetch post', 'details': str(err)}), 500
 
 
 @posts_bp.route('', methods=['POST'])
+@rate_limit('write')
 @auth_required
 @validate_json(PostCreateSchema)
 def create_post(current_user: User, validated_data: dict) -> tuple:
     try:
-        post = Post(
-            title=validated_data['title'],
-            content=validated_data['content'],
-            author_id=current_user.id,
-            is_published= True #validated_data.get('is_published', True) # Will work on this later
-        )
-        
-        db.session.add(post)
-        db.session.commit()
+        post = post_service.create_post(current_user, validated_data)
         
         post_schema = PostSchema()
         post_data = post_schema.dump(post)
-        print(f"Post created: {post_data['title']} by {current_user.username}")
+        
         return jsonify({
             'message': 'Post created successfully',
             'post': post_data
         }), 201
         
     except Exception as err:
-        print(err)
+        logger.exception('Failed to create post')
         db.session.rollback()
         return jsonify({'error': 'Failed to create post', 'details': str(err)}), 500
 
 
-@posts_bp.route('/<int:post_id>', methods=['PUT'])
+@posts_bp.route('/batch', methods=['POST'])
+@rate_limit('write')
 @auth_required
-@validate_json(PostUpdateSchema)
-def update_post(post_id: int, current_user: User, validated_data: dict) -> tuple:
+def create_posts_batch(current_user: User) -> tuple:
+    json_data = request.get_json(silent=True)
+    items = json_data.get('posts') if isinstance(json_data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': "Request must be JSON with a non-empty 'posts' list"}), 400
+    
+    max_items = current_app.config['POSTS_BATCH_MAX']
+    if len(items) > max_items:
+        return jsonify({'error': f'A batch may contain at most {max_items} posts'}), 400
+    
     try:
-        post = Post.query.get(post_id)
-        if not post:
-            return jsonify({'error': 'Post not found'}), 404
-        
-        if not post.can_edit(current_user.id):
-            return jsonify({'error': 'Permission denied'}), 403
+        errors: dict = {}
+        try:
+            loaded = PostCreateSchema(many=True).load(items)
+        except ValidationError as err:
+            errors = err.messages_dict
+            loaded = err.valid_data
         
-        if 'title' in validated_data:
-            post.title = validated_data['title']
-            post.slug = post._generate_slug(validated_data['title'])
+        valid = [(index, data) for index, data in enumerate(loaded) if index not in errors]
+        created = post_service.create_posts(current_user, [data for _, data in valid]) if valid else []
         
-        if 'content' in validated_data:
-            post.content = validated_data['content']
+        results = [
+            {'index': index, 'status': 'invalid', 'errors': messages}
+            for index, messages in errors.items()
+        ]
+        results += [
+            {'index': index, 'status': 'created', 'id': post_id, 'slug': slug}
+            for (index, _), (post_id, slug) in zip(valid, created)
+        ]
+        results.sort(key=lambda result: result['index'])
         
-        if 'is_published' in validated_data:
-            post.is_published = validated_data['is_published']
+        return jsonify({
+            'results': results,
+            'created': len(created),
+            'failed': len(errors)
+        }), 201 if created else 400
         
-        db.session.commit()
+    except Exception as err:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create posts', 'details': str(err)}), 500
+
+
+@posts_bp.route('/<int:post_id>', methods=['PUT'])
+@rate_limit('write')
+@auth_required
+@validate_json(PostUpdateSchema)
+def update_post(post_id: int, current_user: User, validated_data: dict) -> tuple:
+    try:
+        post = post_service.update_post(post_id, current_user, validated_data)
         
         post_schema = PostSchema()
         post_data = post_schema.dump(post)
@@ -121,30 +229,28 @@ def update_post(post_id: int, current_user: User, validated_data: dict) -> tuple
             'post': post_data
         }), 200
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Failed to update post', 'details': str(err)}), 500
 
 
 @posts_bp.route('/<int:post_id>', methods=['DELETE'])
+@rate_limit('write')
 @auth_required
 def delete_post(post_id: int, current_user: User) -> tuple:
     try:
-        post = Post.query.get(post_id)
-        if not post:
-            return jsonify({'error': 'Post not found'}), 404
-        
-        if not post.can_delete(current_user.id):
-            return jsonify({'error': 'Permission denied'}), 403
-        
-        db.session.delete(post)
-        db.session.commit()
+        post_service.delete_post(post_id, current_user)
         
         return jsonify({
             'message': 'Post deleted successfully'
         }), 200
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Failed to delete post', 'details': str(err)}), 500
-
@@ -0,0 +1,77 @@
+"""Async (ASGI) variant of the JSON API.
+
+Serves the same ``/api/posts``, ``/api/comments`` and ``/api/auth`` contracts as the Flask
+app, on the same models, schemas and query builders, through async SQLAlchemy. Tokens are
+interchangeable between the two. The response cache, ETags, metrics, replica routing and
+the identity cache are Flask-only for now.
+
+    uvicorn asgi:app --workers 4
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.responses import Response
+
+from app.auth.hashing import PasswordHasher
+from app.services.errors import ServiceError
+from app.utils.ratelimit import create_buckets
+from app.utils.sqlite import _apply_on_connect, sqlite_pragmas
+from config import config
+from . import auth, comments, posts
+from .common import InvalidRequest, JWTError, handle_invalid_request, handle_jwt_error, handle_service_error
+
+_ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite'}
+
+
+def create_async_db_engine(database_uri: str, settings: dict) -> AsyncEngine:
+    url = make_url(database_uri)
+    url = url.set(drivername=_ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    options = {}
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        options['poolclass'] = StaticPool  # one shared connection, or every session sees an empty database
+    engine = create_async_engine(url, **options)
+    if engine.dialect.name == 'sqlite':
+        statements = sqlite_pragmas(settings)
+        if statements:
+            _apply_on_connect(engine.sync_engine, statements)
+    return engine
+
+
+EXCEPTION_HANDLERS: dict[Any, Callable[..., Awaitable[Response]]] = {
+    InvalidRequest: handle_invalid_request,
+    ServiceError: handle_service_error,
+    JWTError: handle_jwt_error,
+}
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette) -> AsyncIterator[None]:
+    yield
+    await app.state.engine.dispose()
+
+
+def create_asgi_app(config_name: str = 'default') -> Starlette:
+    settings = config[config_name]
+    values = {key: getattr(settings, key) for key in dir(settings) if key.isupper()}
+    engine = create_async_db_engine(settings.SQLALCHEMY_DATABASE_URI, values)
+
+    app = Starlette(
+        routes=[*posts.routes, *comments.routes, *auth.routes],
+        exception_handlers=EXCEPTION_HANDLERS,
+        lifespan=_lifespan
+    )
+    app.state.settings = settings
+    app.state.engine = engine
+    app.state.sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    app.state.rate_limiter = create_buckets(settings.RATE_LIMIT_BACKEND, settings.RATE_LIMIT_DATABASE)
+    app.state.hasher = PasswordHasher(
+        rounds=settings.BCRYPT_LOG_ROUNDS,
+        max_workers=settings.BCRYPT_WORKERS or os.cpu_count() or 1,
+        queue_limit=settings.BCRYPT_QUEUE_LIMIT
+    )
+    return app
@@ -0,0 +1,160 @@
+import jwt
+from sqlalchemy import exists, or_, select
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.models import RevokedToken, User
+from app.schemas import UserLoginSchema, UserRegistrationSchema, UserSchema
+from app.services.auth import already_revoked_query, revocation_rows
+from app.services.errors import AuthenticationFailed, ServiceError
+from .common import (
+    create_token, current_user, error, rate_limit, read_json, session, settings, token_claims, validated,
+    verified_identity
+)
+
+
+class AsyncUserRegistrationSchema(UserRegistrationSchema):
+    """Uniqueness needs an awaitable session, so ``register`` checks it after loading."""
+
+    def validate_username(self, value: str) -> None:
+        pass
+
+    def validate_email(self, value: str) -> None:
+        pass
+
+
+def _issue_tokens(request: Request, user: User) -> dict:
+    config = settings(request)
+    return {
+        'access_token': create_token(config, user.id, 'access'),
+        'refresh_token': create_token(config, user.id, 'refresh')
+    }
+
+
+@rate_limit('register')
+async def register(request: Request) -> JSONResponse:
+    data = await validated(request, AsyncUserRegistrationSchema())
+    async with session(request) as db:
+        taken = (await db.execute(
+            select(User.username, User.email)
+            .where(or_(User.username == data['username'], User.email == data['email']))
+        )).all()
+        details = {}
+        if any(username == data['username'] for username, _ in taken):
+            details['username'] = ['Username already exists']
+        if any(email == data['email'] for _, email in taken):
+            details['email'] = ['Email already registered']
+        if details:
+            return error('Validation failed', 400, details=details)
+        if data['password'] != data['confirm_password']:
+            raise ServiceError('Password and confirm password should be same!', 401)
+
+        # User() would hash synchronously through the Flask app's hasher
+        user = User.__mapper__.class_manager.new_instance()
+        user.username = data['username']
+        user.email = data['email']
+        user.first_name = data.get('first_name')
+        user.last_name = data.get('last_name')
+        user.password_hash = await request.app.state.hasher.hash_async(data['password'])
+        db.add(user)
+        await db.commit()
+    return JSONResponse({
+        'message': 'User registered successfully',
+        'user': UserSchema().dump(user),
+        **_issue_tokens(request, user)
+    }, 201)
+
+
+@rate_limit('login')
+async def login(request: Request) -> JSONResponse:
+    data = await validated(request, UserLoginSchema())
+    hasher = request.app.state.hasher
+    async with session(request) as db:
+        user = await db.scalar(select(User).where(User.username == data['username']))
+        if not user or not await hasher.verify_async(data['password'], user.password_hash):
+            raise AuthenticationFailed('Invalid username or password')
+        if not user.is_active:
+            raise AuthenticationFailed('Account is deactivated')
+        if hasher.needs_rehash(user.password_hash):
+            user.password_hash = await hasher.hash_async(data['password'])
+            await db.commit()
+    return JSONResponse({
+        'message': 'Login successful',
+        'user': UserSchema().dump(user),
+        **_issue_tokens(request, user)
+    })
+
+
+@rate_limit('refresh')
+async def refresh(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        identity = await verified_identity(request, db, 'refresh')
+        user = await db.get(User, int(identity))
+    if not user or not user.is_active:
+        return error('User not found or inactive', 401)
+    return JSONResponse({'access_token': create_token(settings(request), identity, 'access')})
+
+
+@rate_limit('write')
+async def logout(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        claims = token_claims(request, token_type=None)
+        await verified_identity(request, db, claims['type'])
+        revoked = [claims]
+        json_data = await read_json(request)
+        refresh_token = json_data.get('refresh_token') if isinstance(json_data, dict) else None
+        if refresh_token:
+            try:
+                refresh_claims = jwt.decode(refresh_token, settings(request).JWT_SECRET_KEY, algorithms=['HS256'])
+            except jwt.InvalidTokenError:
+                raise ServiceError('Invalid refresh token')
+            if refresh_claims.get('type') != 'refresh' or str(refresh_claims['sub']) != str(claims['sub']):
+                raise ServiceError('Invalid refresh token')
+            revoked.append(refresh_claims)
+        rows = revocation_rows(revoked)
+        existing = set((await db.scalars(already_revoked_query(rows))).all())
+        for jti, row in rows.items():
+            if jti not in existing:
+                db.add(RevokedToken(**row))
+        await db.commit()
+    return JSONResponse({'message': 'Logged out successfully'})
+
+
+async def get_current_user(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+    return JSONResponse({'user': UserSchema().dump(user)})
+
+
+@rate_limit('write')
+async def update_profile(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        if request.headers.get('content-type', '').split(';')[0].strip() != 'application/json':
+            return error('Request must be JSON', 400)
+        json_data = await read_json(request)
+        if not json_data:
+            return error('No JSON data provided', 400)
+
+        if 'first_name' in json_data:
+            user.first_name = json_data['first_name']
+        if 'last_name' in json_data:
+            user.last_name = json_data['last_name']
+        if 'email' in json_data:
+            taken = await db.scalar(select(exists().where(User.email == json_data['email'], User.id != user.id)))
+            if taken:
+                raise ServiceError('Email already taken')
+            user.email = json_data['email']
+        await db.commit()
+    return JSONResponse({'message': 'Profile updated successfully', 'user': UserSchema().dump(user)})
+
+
+routes = [
+    Route('/api/auth/register', register, methods=['POST']),
+    Route('/api/auth/login', login, methods=['POST']),
+    Route('/api/auth/refresh', refresh, methods=['POST']),
+    Route('/api/auth/logout', logout, methods=['POST']),
+    Route('/api/auth/me', get_current_user, methods=['GET']),
+    Route('/api/auth/me', update_profile, methods=['PUT']),
+]
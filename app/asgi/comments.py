@@ -0,0 +1,145 @@
+from math import ceil
+
+from sqlalchemy.orm import joinedload
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.models import Comment, Post, User
+from app.schemas import CommentCreateSchema, CommentSchema
+from app.services.comments import comment_count_query, thread_page_query, thread_statement, unpack_thread
+from app.services.errors import NotFound, PermissionDenied, ServiceError
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from .common import current_user, error, page_args, rate_limit, read_json, session, validated
+
+
+class AsyncCommentCreateSchema(CommentCreateSchema):
+    """The post lookup needs an awaitable session, so ``create_comment`` does it instead."""
+
+    def validate_post_exists(self, value: int) -> None:
+        pass
+
+
+def _post_summary(post: Post) -> dict:
+    return {'id': post.id, 'title': post.title, 'slug': post.slug}
+
+
+async def _own_comment(db, comment_id: int, user: User, for_delete: bool = False) -> Comment:
+    comment = await db.get(Comment, comment_id, options=[joinedload(Comment.author)])
+    if not comment:
+        raise NotFound('Comment not found')
+    allowed = comment.can_delete(user.id) if for_delete else comment.can_edit(user.id)
+    if not allowed:
+        raise PermissionDenied('Permission denied')
+    return comment
+
+
+async def get_post_comments(request: Request) -> JSONResponse:
+    post_id = request.path_params['post_id']
+    page, per_page = page_args(request, default_per_page=20, max_per_page=100)
+    if 'before' in request.query_params:
+        try:
+            position = decode_cursor(request.query_params['before'])
+        except InvalidCursor as err:
+            return error(str(err), 400)
+        async with session(request) as db:
+            page_query = thread_page_query(post_id, position).limit(per_page + 1)
+            post, comments = unpack_thread((await db.execute(thread_statement(post_id, page_query))).all())
+        has_next = len(comments) > per_page
+        comments = comments[:per_page]
+        return JSONResponse({
+            'comments': CommentSchema(many=True).dump(comments),
+            'post': _post_summary(post),
+            'pagination': {
+                'per_page': per_page,
+                'next_cursor': encode_cursor(comments[-1].created_at, comments[-1].id) if has_next else None,
+                'has_next': has_next
+            }
+        })
+
+    async with session(request) as db:
+        page_query = thread_page_query(post_id).offset((page - 1) * per_page).limit(per_page)
+        post, comments = unpack_thread((await db.execute(thread_statement(post_id, page_query))).all())
+        total = await db.scalar(comment_count_query(post_id))
+    return JSONResponse({
+        'comments': CommentSchema(many=True).dump(comments),
+        'post': _post_summary(post),
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': ceil(total / per_page),
+            'has_next': page * per_page < total,
+            'has_prev': page > 1
+        }
+    })
+
+
+@rate_limit('write')
+async def create_comment(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        data = await validated(request, AsyncCommentCreateSchema())
+        post = await db.get(Post, data['post_id'])
+        if not post:
+            return error('Validation failed', 400, details={'post_id': ['Post not found']})
+        if not post.is_published:
+            raise NotFound('Post not found')
+        comment = Comment(name=data['name'], content=data['content'], post_id=post.id, author_id=user.id)
+        comment.author = user
+        db.add(comment)
+        await db.commit()
+        return JSONResponse({'message': 'Comment created successfully', 'comment': CommentSchema().dump(comment)}, 201)
+
+
+async def get_comment(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        comment = await db.get(Comment, request.path_params['comment_id'], options=[joinedload(Comment.author)])
+    if not comment:
+        raise NotFound('Comment not found')
+    comment_data = CommentSchema().dump(comment)
+    comment_data['author_id'] = comment.author_id
+    return JSONResponse({'comment': comment_data})
+
+
+@rate_limit('write')
+async def update_comment(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        if request.headers.get('content-type', '').split(';')[0].strip() != 'application/json':
+            return error('Request must be JSON', 400)
+        json_data = await read_json(request)
+        if not json_data:
+            return error('No JSON data provided', 400)
+        comment = await _own_comment(db, request.path_params['comment_id'], user)
+
+        if 'name' in json_data:
+            if not json_data['name'].strip():
+                raise ServiceError('Name cannot be empty')
+            comment.name = json_data['name'].strip()
+        if 'content' in json_data:
+            if not json_data['content'].strip():
+                raise ServiceError('Content cannot be empty')
+            comment.content = json_data['content'].strip()
+
+        await db.commit()
+        return JSONResponse({'message': 'Comment updated successfully', 'comment': CommentSchema().dump(comment)})
+
+
+@rate_limit('write')
+async def delete_comment(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        comment = await _own_comment(db, request.path_params['comment_id'], user, for_delete=True)
+        await db.delete(comment)
+        await db.commit()
+    return JSONResponse({'message': 'Comment deleted successfully'})
+
+
+routes = [
+    Route('/api/comments', create_comment, methods=['POST']),
+    Route('/api/comments/posts/{post_id:int}', get_post_comments, methods=['GET']),
+    Route('/api/comments/{comment_id:int}', get_comment, methods=['GET']),
+    Route('/api/comments/{comment_id:int}', update_comment, methods=['PUT']),
+    Route('/api/comments/{comment_id:int}', delete_comment, methods=['DELETE']),
+]
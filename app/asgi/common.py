@@ -0,0 +1,181 @@
+import math
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+
+import jwt
+from marshmallow import Schema, ValidationError
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.models import RevokedToken, User
+from app.services.errors import AuthenticationFailed, ServiceError
+from app.utils.ratelimit import take_tokens
+
+
+def settings(request: Request) -> Any:
+    return request.app.state.settings
+
+
+def session(request: Request) -> AsyncSession:
+    return request.app.state.sessionmaker()
+
+
+def error(message: str, status_code: int, **extra: Any) -> JSONResponse:
+    return JSONResponse({'error': message, **extra}, status_code=status_code)
+
+
+async def read_json(request: Request) -> Optional[Any]:
+    """The JSON body, or None for a non-JSON request, mirroring ``request.get_json(silent=True)``."""
+    if request.headers.get('content-type', '').split(';')[0].strip() != 'application/json':
+        return None
+    try:
+        return await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class InvalidRequest(Exception):
+    """Raised by ``validated`` with the 400 response to send back."""
+
+    def __init__(self, response: JSONResponse) -> None:
+        super().__init__(response.body)
+        self.response = response
+
+
+async def validated(request: Request, schema: Schema) -> dict:
+    """Same checks and error bodies as ``validate_json``."""
+    if request.headers.get('content-type', '').split(';')[0].strip() != 'application/json':
+        raise InvalidRequest(error('Request must be JSON', 400))
+    try:
+        data = await request.json()
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidRequest(error('Invalid JSON data', 400))
+    if not data:
+        raise InvalidRequest(error('No JSON data provided', 400))
+    try:
+        return schema.load(data)
+    except ValidationError as err:
+        raise InvalidRequest(error('Validation failed', 400, details=err.messages))
+
+
+def page_args(request: Request, default_per_page: int, max_per_page: int) -> tuple[int, int]:
+    """Same rules as ``paginate_query``; unparsable numbers fall back to the defaults."""
+    def as_int(name: str, default: int) -> int:
+        try:
+            return int(request.query_params.get(name, default))
+        except ValueError:
+            return default
+
+    page = as_int('page', 1)
+    per_page = as_int('per_page', default_per_page)
+    if page < 1:
+        raise ServiceError('Page must be >= 1')
+    if per_page < 1 or per_page > max_per_page:
+        raise ServiceError(f'Per page must be between 1 and {max_per_page}')
+    return page, per_page
+
+
+def create_token(config: Any, identity: Any, token_type: str) -> str:
+    """Mint a token with the same claims and key as flask-jwt-extended, so both apps accept it."""
+    now = datetime.now(timezone.utc)
+    expires = config.JWT_ACCESS_TOKEN_EXPIRES if token_type == 'access' else config.JWT_REFRESH_TOKEN_EXPIRES
+    claims = {
+        'fresh': False, 'iat': now, 'jti': str(uuid.uuid4()), 'type': token_type,
+        'sub': identity, 'nbf': now, 'exp': now + expires
+    }
+    return jwt.encode(claims, config.JWT_SECRET_KEY, algorithm='HS256')
+
+
+def token_claims(request: Request, token_type: Optional[str] = 'access') -> dict:
+    """Decoded claims of the bearer token; ``token_type=None`` accepts either type."""
+    header = request.headers.get('authorization', '')
+    if not header:
+        raise JWTError('Missing Authorization Header')
+    scheme, _, token = header.partition(' ')
+    if scheme != 'Bearer' or not token:
+        raise JWTError("Bad Authorization header. Expected 'Authorization: Bearer <JWT>'")
+    try:
+        claims = jwt.decode(token, settings(request).JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        raise JWTError('Token has expired')
+    except jwt.InvalidTokenError as err:
+        raise JWTError(str(err), 422)
+    if token_type is not None and claims.get('type') != token_type:
+        raise JWTError(f'Only {token_type} tokens are allowed', 422)
+    return claims
+
+
+async def verified_identity(request: Request, db: AsyncSession, token_type: str = 'access') -> Any:
+    """Identity of a valid, unrevoked token; one indexed lookup instead of the Flask app's cached list."""
+    claims = token_claims(request, token_type)
+    if await db.scalar(select(exists().where(RevokedToken.jti == claims['jti']))):
+        raise JWTError('Token has been revoked')
+    return claims['sub']
+
+
+async def current_user(request: Request, db: AsyncSession) -> User:
+    """Async counterpart of ``auth_required``."""
+    user = await db.get(User, int(await verified_identity(request, db)))
+    if not user or not user.is_active:
+        raise AuthenticationFailed('User not found or inactive')
+    return user
+
+
+async def _rate_limit_key(request: Request, kind: str) -> Optional[str]:
+    """Same bucket keys as ``KEY_FUNCTIONS`` in the Flask app."""
+    if kind == 'ip':
+        return request.client.host if request.client else None
+    if kind == 'username':
+        data = await read_json(request)
+        username = data.get('username') if isinstance(data, dict) else None
+        return username.lower() if isinstance(username, str) else None
+    try:
+        return str(token_claims(request)['sub'])
+    except JWTError:
+        return None
+
+
+def rate_limit(scope: str) -> Callable:
+    """Async counterpart of ``app.utils.ratelimit.rate_limit``; rejects before the handler runs."""
+
+    def decorator(handler: Callable[[Request], Awaitable[JSONResponse]]) -> Callable:
+        @wraps(handler)
+        async def wrapper(request: Request) -> JSONResponse:
+            config = settings(request)
+            if config.RATE_LIMIT_ENABLED:
+                limits = config.RATE_LIMITS.get(scope, {})
+                keys = {kind: await _rate_limit_key(request, kind) for kind in limits}
+                wait = take_tokens(request.app.state.rate_limiter, scope, keys, limits)
+                if wait:
+                    retry_after = math.ceil(wait)
+                    return JSONResponse({'error': 'Too many requests', 'retry_after': retry_after},
+                                        status_code=429, headers={'Retry-After': str(retry_after)})
+            return await handler(request)
+        return wrapper
+    return decorator
+
+
+class JWTError(Exception):
+    """Rendered as ``{"msg": ...}`` like flask-jwt-extended's own error handlers."""
+
+    def __init__(self, message: str, status_code: int = 401) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+async def handle_invalid_request(request: Request, exc: InvalidRequest) -> JSONResponse:
+    return exc.response
+
+
+async def handle_service_error(request: Request, exc: ServiceError) -> JSONResponse:
+    return error(exc.message, exc.status_code)
+
+
+async def handle_jwt_error(request: Request, exc: JWTError) -> JSONResponse:
+    return JSONResponse({'msg': exc.message}, status_code=exc.status_code)
+
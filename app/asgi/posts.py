@@ -0,0 +1,199 @@
+from datetime import datetime
+from math import ceil
+
+from marshmallow import ValidationError
+from sqlalchemy import desc, func, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.models import Post, User
+from app.schemas import PostCreateSchema, PostListSchema, PostSchema, PostUpdateSchema
+from app.services.errors import NotFound, PermissionDenied, ServiceError
+from app.services.posts import (
+    SEARCH_SQL, assign_slugs, published_feed_query, search_params, search_results, slug_conflicts_query
+)
+from app.utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+from .common import current_user, error, page_args, rate_limit, read_json, session, settings, validated
+
+
+async def _allocate_slugs(db, titles: list[str], exclude: tuple = ()) -> list[str]:
+    taken = set((await db.scalars(slug_conflicts_query(titles))).all())
+    taken.difference_update(exclude)
+    return assign_slugs(titles, taken)
+
+
+async def _own_post(db, post_id: int, user: User) -> Post:
+    post = await db.get(Post, post_id)
+    if not post:
+        raise NotFound('Post not found')
+    if not post.can_edit(user.id):
+        raise PermissionDenied('Permission denied')
+    return post
+
+
+async def get_posts(request: Request) -> JSONResponse:
+    page, per_page = page_args(request, default_per_page=10, max_per_page=50)
+    if 'cursor' in request.query_params:
+        try:
+            position = decode_cursor(request.query_params['cursor'])
+        except InvalidCursor as err:
+            return error(str(err), 400)
+        async with session(request) as db:
+            posts = (await db.scalars(published_feed_query(position).limit(per_page + 1))).all()
+        has_next = len(posts) > per_page
+        posts = posts[:per_page]
+        return JSONResponse({
+            'posts': PostListSchema(many=True).dump(posts),
+            'pagination': {
+                'per_page': per_page,
+                'next_cursor': encode_cursor(posts[-1].created_at, posts[-1].id) if has_next else None,
+                'has_next': has_next
+            }
+        })
+
+    async with session(request) as db:
+        published = Post.is_published.is_(True)
+        total = await db.scalar(select(func.count(Post.id)).where(published)) or 0
+        posts = (await db.scalars(
+            select(Post).options(selectinload(Post.author)).where(published)
+            .order_by(desc(Post.created_at)).offset((page - 1) * per_page).limit(per_page)
+        )).all()
+    return JSONResponse({
+        'posts': PostListSchema(many=True).dump(posts),
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': ceil(total / per_page),
+            'has_next': page * per_page < total,
+            'has_prev': page > 1
+        }
+    })
+
+
+async def search_posts(request: Request) -> JSONResponse:
+    page, per_page = page_args(request, default_per_page=10, max_per_page=50)
+    async with session(request) as db:
+        if db.bind.dialect.name != 'sqlite':
+            raise ServiceError('Search is only available on SQLite', 501)
+        params = search_params(request.query_params.get('q', ''), page, per_page)
+        rows = (await db.execute(SEARCH_SQL, params)).mappings().all()
+    results, has_next = search_results(rows, per_page)
+    return JSONResponse({
+        'results': results,
+        'pagination': {'page': page, 'per_page': per_page, 'has_next': has_next, 'has_prev': page > 1}
+    })
+
+
+async def get_post(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        post = await db.get(Post, request.path_params['post_id'], options=[joinedload(Post.author)])
+    if not post or not post.is_published:
+        raise NotFound('Post not found')
+    post_data = PostSchema().dump(post)
+    post_data['author_id'] = post.author_id
+    return JSONResponse({'post': post_data})
+
+
+@rate_limit('write')
+async def create_post(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        data = await validated(request, PostCreateSchema())
+        post = Post(
+            title=data['title'],
+            content=data['content'],
+            author_id=user.id,
+            slug=(await _allocate_slugs(db, [data['title']]))[0],
+            is_published=True  # matches the Flask handler until is_published is honoured
+        )
+        post.author = user
+        db.add(post)
+        await db.commit()
+        return JSONResponse({'message': 'Post created successfully', 'post': PostSchema().dump(post)}, 201)
+
+
+@rate_limit('write')
+async def create_posts_batch(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        json_data = await read_json(request)
+        items = json_data.get('posts') if isinstance(json_data, dict) else None
+        if not isinstance(items, list) or not items:
+            return error("Request must be JSON with a non-empty 'posts' list", 400)
+        max_items = settings(request).POSTS_BATCH_MAX
+        if len(items) > max_items:
+            return error(f'A batch may contain at most {max_items} posts', 400)
+
+        errors: dict = {}
+        try:
+            loaded = PostCreateSchema(many=True).load(items)
+        except ValidationError as err:
+            errors = err.messages_dict
+            loaded = err.valid_data
+        valid = [(index, data) for index, data in enumerate(loaded) if index not in errors]
+
+        created = []
+        if valid:
+            now = datetime.utcnow()
+            slugs = await _allocate_slugs(db, [data['title'] for _, data in valid])
+            rows = [
+                {'title': data['title'], 'content': data['content'], 'slug': slug, 'author_id': user.id,
+                 'is_published': True, 'created_at': now, 'updated_at': now}
+                for (_, data), slug in zip(valid, slugs)
+            ]
+            ids = (await db.scalars(insert(Post).returning(Post.id, sort_by_parameter_order=True), rows)).all()
+            await db.commit()
+            created = list(zip(ids, slugs))
+
+    results = [{'index': index, 'status': 'invalid', 'errors': messages} for index, messages in errors.items()]
+    results += [
+        {'index': index, 'status': 'created', 'id': post_id, 'slug': slug}
+        for (index, _), (post_id, slug) in zip(valid, created)
+    ]
+    results.sort(key=lambda result: result['index'])
+    return JSONResponse(
+        {'results': results, 'created': len(created), 'failed': len(errors)},
+        201 if created else 400
+    )
+
+
+@rate_limit('write')
+async def update_post(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        data = await validated(request, PostUpdateSchema())
+        post = await _own_post(db, request.path_params['post_id'], user)
+        if 'title' in data:
+            post.title = data['title']
+            post.slug = (await _allocate_slugs(db, [data['title']], exclude=(post.slug,)))[0]
+        if 'content' in data:
+            post.content = data['content']
+        if 'is_published' in data:
+            post.is_published = data['is_published']
+        await db.commit()
+        await db.refresh(post, ['author'])
+        return JSONResponse({'message': 'Post updated successfully', 'post': PostSchema().dump(post)})
+
+
+@rate_limit('write')
+async def delete_post(request: Request) -> JSONResponse:
+    async with session(request) as db:
+        user = await current_user(request, db)
+        post = await _own_post(db, request.path_params['post_id'], user)
+        await db.delete(post)
+        await db.commit()
+    return JSONResponse({'message': 'Post deleted successfully'})
+
+
+routes = [
+    Route('/api/posts', get_posts, methods=['GET']),
+    Route('/api/posts', create_post, methods=['POST']),
+    Route('/api/posts/search', search_posts, methods=['GET']),
+    Route('/api/posts/batch', create_posts_batch, methods=['POST']),
+    Route('/api/posts/{post_id:int}', get_post, methods=['GET']),
+    Route('/api/posts/{post_id:int}', update_post, methods=['PUT']),
+    Route('/api/posts/{post_id:int}', delete_post, methods=['DELETE']),
+]
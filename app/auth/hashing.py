@@ -0,0 +1,116 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import bcrypt
+from flask import Flask, current_app, has_app_context
+
+from app.services.errors import ServiceError
+from app.utils.metrics import BCRYPT_IN_FLIGHT, BCRYPT_QUEUE_DEPTH
+
+
+class HasherBusy(ServiceError):
+    status_code = 503
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated bounded pool so a login burst cannot starve request workers.
+
+    At most ``max_workers`` hashes run at once and ``queue_limit`` more may wait; anything
+    beyond that fails fast with ``HasherBusy`` instead of queueing behind the burst.
+    """
+
+    def __init__(self, rounds: int = 12, max_workers: int = 2, queue_limit: int = 16) -> None:
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self.reset()
+
+    def reset(self) -> None:
+        """(Re)create the pool; a forked child must not use the parent's threads, locks or counts."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.queue_limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _submit(self, func: Callable, *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Server busy, please retry shortly')
+        self._track(1)
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Optional[Future] = None) -> None:
+        self._track(-1)
+        self._slots.release()
+
+    def _run(self, func: Callable, *args: Any) -> Any:
+        return self._submit(func, *args).result()
+
+    def _track(self, delta: int) -> None:
+        with self._lock:
+            queued = self.queue_depth
+            self.in_flight += delta
+            queued = self.queue_depth - queued
+        BCRYPT_IN_FLIGHT.inc(delta)
+        if queued:
+            BCRYPT_QUEUE_DEPTH.inc(queued)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.max_workers, 0)
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    async def hash_async(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await asyncio.wrap_future(self._submit(bcrypt.hashpw, password.encode('utf-8'), salt))
+        return hashed.decode('utf-8')
+
+    async def verify_async(self, password: str, password_hash: str) -> bool:
+        return await asyncio.wrap_future(
+            self._submit(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+        )
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # Modular crypt format: $2b$<cost>$<salt+digest>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+def init_password_hasher(app: Flask) -> None:
+    app.extensions['password_hasher'] = PasswordHasher(
+        rounds=app.config['BCRYPT_LOG_ROUNDS'],
+        max_workers=app.config['BCRYPT_WORKERS'] or os.cpu_count() or 1,
+        queue_limit=app.config['BCRYPT_QUEUE_LIMIT']
+    )
+
+
+def get_password_hasher() -> PasswordHasher:
+    return current_app.extensions['password_hasher']
+
+
+def hash_password(password: str) -> str:
+    if not has_app_context():
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return get_password_hasher().hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if not has_app_context():
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    return get_password_hasher().verify(password, password_hash)
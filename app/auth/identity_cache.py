@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from flask import Flask, current_app
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.extensions import db
+from app.models import User
+
+# password_hash stays out of memory; it lazy-loads if a handler ever touches it
+_CACHED_COLUMNS = tuple(
+    attr.key for attr in User.__mapper__.column_attrs if attr.key != 'password_hash'
+)
+
+
+class IdentityCache:
+    """Short-lived per-process snapshots of users, keyed by id, for ``auth_required``.
+
+    Entries are plain column dicts, so they can be shared across threads; each hit
+    is rebuilt into a session-bound ``User`` with ``merge(load=False)`` and costs no query.
+    Updates made in other processes become visible after at most ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl: float = 30, max_entries: int = 10000,
+                 stats_hook: Optional[Callable[[dict], None]] = None, stats_interval: int = 1000) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats_hook = stats_hook
+        self.stats_interval = stats_interval
+        self._entries: dict[int, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[User]:
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None and cached[0] <= time.monotonic():
+                del self._entries[user_id]
+                cached = None
+            if cached is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            report = (self.hits + self.misses) % self.stats_interval == 0
+        if report and self.stats_hook is not None:
+            self.stats_hook(self.stats())
+        if cached is None:
+            return None
+
+        user = User.__mapper__.class_manager.new_instance()
+        for key, value in cached[1].items():
+            setattr(user, key, value)
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+
+    def set(self, user: User) -> None:
+        snapshot = {key: getattr(user, key) for key in _CACHED_COLUMNS}
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user.id] = (time.monotonic() + self.ttl, snapshot)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'db_round_trips_saved': self.hits,
+                'entries': len(self._entries)
+            }
+
+
+def init_identity_cache(app: Flask) -> None:
+    app.extensions['identity_cache'] = IdentityCache(
+        ttl=app.config['IDENTITY_CACHE_TTL'],
+        max_entries=app.config['IDENTITY_CACHE_MAX_ENTRIES'],
+        stats_hook=app.config['IDENTITY_CACHE_STATS_HOOK'],
+        stats_interval=app.config['IDENTITY_CACHE_STATS_INTERVAL']
+    )
+
+
+def get_identity_cache() -> IdentityCache:
+    return current_app.extensions['identity_cache']
+
+
+def load_user(user_id: Any) -> Optional[User]:
+    """Return the user for ``user_id`` from the cache, falling back to one primary-key lookup."""
+    user_id = int(user_id)
+    cache = get_identity_cache()
+    user = cache.get(user_id)
+    if user is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            cache.set(user)
+    return user
@@ -0,0 +1,99 @@
+import threading
+import time
+from datetime import datetime
+
+from flask import Flask, current_app
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.models import RevokedToken
+from app.utils.jobs import job
+
+
+class RevocationList:
+    """Per-process copy of ``revoked_tokens`` for the flask-jwt-extended blocklist check.
+
+    A lookup is one dict probe. At most once per ``refresh_interval`` a lookup also fetches
+    the rows added since the last refresh (by id), so a logout in another process takes
+    effect within that interval; this process sees its own revocations at once. Expired
+    tokens are dropped from memory every ``prune_interval``.
+    """
+
+    def __init__(self, refresh_interval: float = 1.0, prune_interval: float = 3600) -> None:
+        self.refresh_interval = refresh_interval
+        self.prune_interval = prune_interval
+        self._expires: dict[str, datetime] = {}
+        self._last_id = 0
+        self._next_refresh = 0.0
+        self._next_prune = time.monotonic() + prune_interval
+        self._next_table_prune = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+        return jti in self._expires
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._expires[jti] = expires_at
+
+    def table_prune_due(self) -> bool:
+        """True at most once per ``prune_interval``, for the caller to schedule the table cleanup."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_table_prune:
+                return False
+            self._next_table_prune = now + self.prune_interval
+            return True
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_refresh:
+                return
+            # Claim this refresh so concurrent lookups keep using the current snapshot
+            self._next_refresh = now + self.refresh_interval
+            last_id = self._last_id
+
+        # Always the primary: a lagging replica would let a revoked token through.
+        # Ids come from SQLite's single writer, so they commit in increasing order
+        rows = db.session.execute(
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at)
+            .where(RevokedToken.id > last_id, RevokedToken.expires_at > datetime.utcnow())
+            .order_by(RevokedToken.id)
+            .execution_options(amortized=True),
+            bind_arguments={'bind': db.engine}
+        ).all()
+
+        with self._lock:
+            for row_id, jti, expires_at in rows:
+                self._expires[jti] = expires_at
+                self._last_id = max(self._last_id, row_id)
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                utcnow = datetime.utcnow()
+                self._expires = {jti: expires for jti, expires in self._expires.items() if expires > utcnow}
+
+
+@job('auth.prune_revoked_tokens')
+def prune_revoked_tokens() -> None:
+    """Delete revocations of tokens that have expired anyway."""
+    db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    db.session.commit()
+
+
+def init_revocation_list(app: Flask) -> None:
+    app.extensions['revocation_list'] = RevocationList(
+        refresh_interval=app.config['REVOCATION_REFRESH_SECONDS'],
+        prune_interval=app.config['REVOCATION_PRUNE_SECONDS']
+    )
+
+
+def get_revocation_list() -> RevocationList:
+    return current_app.extensions['revocation_list']
+
+
+def is_token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
+    """flask-jwt-extended ``token_in_blocklist_loader``."""
+    return get_revocation_list().is_revoked(jwt_payload['jti'])
@@ -1,36 +1,26 @@
 
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
 
 from app import db
 from app.models import User
 from app.schemas import UserRegistrationSchema, UserLoginSchema, UserSchema
-from app.utils.decorators import validate_json, auth_required
+from app.services import ServiceError
+from app.services import auth as auth_service
+from app.utils.decorators import validate_json, auth_required, use_replica
+from app.utils.ratelimit import rate_limit
 
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit('register')
 @validate_json(UserRegistrationSchema)
 def register(validated_data: dict) -> tuple:
     try:
-        user = User(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            first_name=validated_data.get('first_name'),
-            last_name=validated_data.get('last_name')
-        )
-
-        if validated_data['password'] != validated_data['confirm_password']:
-            return jsonify({'error':'Password and confirm password should be same!'}), 401
-        
-        db.session.add(user)
-        db.session.commit()
-        
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        user = auth_service.register_user(validated_data)
+        tokens = auth_service.issue_tokens(user)
         
         user_schema = UserSchema()
         user_data = user_schema.dump(user)
@@ -38,29 +28,24 @@ def register(validated_data: dict) -> tuple:
         return jsonify({
             'message': 'User registered successfully',
             'user': user_data,
-            'access_token': access_token,
-            'refresh_token': refresh_token
+            **tokens
         }), 201
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Registration failed', 'details': str(err)}), 500
 
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 @validate_json(UserLoginSchema)
 def login(validated_data: dict) -> tuple:
     try:
-        user = User.query.filter_by(username=validated_data['username']).first()
-        
-        if not user or not user.check_password(validated_data['password']):
-            return jsonify({'error': 'Invalid username or password'}), 401
-        
-        if not user.is_active:
-            return jsonify({'error': 'Account is deactivated'}), 401
-        
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
+        user = auth_service.authenticate(validated_data['username'], validated_data['password'])
+        tokens = auth_service.issue_tokens(user)
         
         user_schema = UserSchema()
         user_data = user_schema.dump(user)
@@ -68,22 +53,24 @@ def login(validated_data: dict) -> tuple:
         return jsonify({
             'message': 'Login successful',
             'user': user_data,
-            'access_token': access_token,
-            'refresh_token': refresh_token
+            **tokens
         }), 200
         
+    except ServiceError as err:
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         return jsonify({'error': 'Login failed', 'details': str(err)}), 500
 
 
 @auth_bp.route('/refresh', methods=['POST'])
+@rate_limit('refresh')
 @jwt_required(refresh=True)
 def refresh() -> tuple:
     try:
         current_user_id = get_jwt_identity()
         
-        user = User.query.get(current_user_id)
-        if not user or not user.is_active:
+        user = auth_service.get_active_user(current_user_id)
+        if not user:
             return jsonify({'error': 'User not found or inactive'}), 401
         
         access_token = create_access_token(identity=current_user_id)
@@ -96,7 +83,28 @@ def refresh() -> tuple:
         return jsonify({'error': 'Token refresh failed', 'details': str(err)}), 500
 
 
+@auth_bp.route('/logout', methods=['POST'])
+@rate_limit('write')
+@jwt_required(verify_type=False)
+def logout() -> tuple:
+    """Revoke the presented token, plus an optional ``refresh_token`` from the JSON body."""
+    try:
+        json_data = request.get_json(silent=True)
+        refresh_token = json_data.get('refresh_token') if isinstance(json_data, dict) else None
+        auth_service.revoke_tokens(get_jwt(), refresh_token)
+        
+        return jsonify({'message': 'Logged out successfully'}), 200
+        
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
+    except Exception as err:
+        db.session.rollback()
+        return jsonify({'error': 'Logout failed', 'details': str(err)}), 500
+
+
 @auth_bp.route('/me', methods=['GET'])
+@use_replica
 @auth_required
 def get_current_user(current_user: User) -> tuple:
     try:
@@ -113,6 +121,7 @@ def get_current_user(current_user: User) -> tuple:
 
 
 @auth_bp.route('/me', methods=['PUT'])
+@rate_limit('write')
 @auth_required
 def update_profile(current_user: User) -> tuple:
     """Update current user profile."""
@@ -125,20 +134,7 @@ def update_profile(current_user: User) -> tuple:
         if not json_data:
             return jsonify({'error': 'No JSON data provided'}), 400
         
-        # Update allowed fields
-        if 'first_name' in json_data:
-            current_user.first_name = json_data['first_name']
-        if 'last_name' in json_data:
-            current_user.last_name = json_data['last_name']
-        if 'email' in json_data:
-            # Check if email is already taken by another user
-            existing_user = User.query.filter_by(email=json_data['email']).first()
-            if existing_user and existing_user.id != current_user.id:
-                return jsonify({'error': 'Email already taken'}), 400
-            current_user.email = json_data['email']
-        
-        # Save changes
-        db.session.commit()
+        auth_service.update_profile(current_user, json_data)
         
         # Return updated user data
         user_schema = UserSchema()
@@ -149,6 +145,9 @@ def update_profile(current_user: User) -> tuple:
             'user': user_data
         }), 200
         
+    except ServiceError as err:
+        db.session.rollback()
+        return jsonify({'error': err.message}), err.status_code
     except Exception as err:
         db.session.rollback()
         return jsonify({'error': 'Profile update failed', 'details': str(err)}), 500
@@ -0,0 +1,102 @@
+import signal
+import time
+
+import click
+from flask import Flask, current_app
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Comment, Post
+from app.models.search import rebuild_search_index
+from app.seeding import DEFAULT_PASSWORD, seed_database
+from app.utils.jobs import SQLiteJobQueue, get_job_queue
+
+
+def recount_comments() -> int:
+    """Set posts.comment_count from the comments table; returns the number of posts fixed."""
+    posts = Post.__table__
+    comments = Comment.__table__
+
+    actual = (
+        select(func.count(comments.c.id))
+        .where(comments.c.post_id == posts.c.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(posts)
+        .where(posts.c.comment_count != actual)
+        .values(comment_count=actual, updated_at=posts.c.updated_at)
+    )
+    return result.rowcount
+
+
+@click.command('recount-comments')
+@with_appcontext
+def recount_comments_command() -> None:
+    """Backfill and reconcile posts.comment_count in a single bulk UPDATE."""
+    fixed = recount_comments()
+    db.session.commit()
+
+    click.echo(f"Reconciled comment counts on {fixed} post(s).")
+
+
+@click.command('search-rebuild')
+@with_appcontext
+def search_rebuild_command() -> None:
+    """Create the posts full-text index if needed and reindex all posts in bulk."""
+    rebuild_search_index(db.session.connection())
+    db.session.commit()
+
+    click.echo("Rebuilt the posts search index.")
+
+
+@click.command('seed')
+@click.option('--users', default=1_000, show_default=True)
+@click.option('--posts', default=10_000, show_default=True)
+@click.option('--comments', default=50_000, show_default=True)
+@click.option('--seed', 'seed_value', default=0, show_default=True, help='Random seed; same seed, same rows.')
+@click.option('--chunk-size', default=10_000, show_default=True, help='Rows per executemany.')
+@click.option('--password', default=DEFAULT_PASSWORD, show_default=True, help='Password shared by every user.')
+@with_appcontext
+def seed_command(users: int, posts: int, comments: int, seed_value: int, chunk_size: int, password: str) -> None:
+    """Bulk-load synthetic users, posts and comments for load tests and profiling."""
+    started = time.perf_counter()
+    try:
+        seed_database(db.session.connection(), users, posts, comments,
+                      seed=seed_value, chunk_size=chunk_size, password=password)
+    except ValueError as err:
+        raise click.UsageError(str(err))
+    recount_comments()
+    db.session.commit()
+
+    click.echo(f"Seeded {users} user(s), {posts} post(s) and {comments} comment(s) "
+               f"in {time.perf_counter() - started:.1f}s.")
+
+
+@click.command('worker')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds to sleep when no job is due.')
+@click.option('--burst', is_flag=True, help='Exit once no job is due instead of polling.')
+@with_appcontext
+def worker_command(poll_interval: float, burst: bool) -> None:
+    """Run jobs from the durable queue (JOB_QUEUE_BACKEND=sqlite) until SIGINT/SIGTERM."""
+    queue = get_job_queue()
+    if not isinstance(queue, SQLiteJobQueue):
+        raise click.UsageError('flask worker needs JOB_QUEUE_BACKEND=sqlite; the memory queue runs in the web process.')
+
+    stopping = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # Finish the job in hand, then exit
+        signal.signal(signum, lambda *_: stopping.append(True))
+
+    click.echo(f"Working jobs from {queue.path} ({queue.depth()} pending).")
+    processed = queue.work(current_app._get_current_object(), poll_interval=poll_interval,
+                           burst=burst, should_stop=lambda: bool(stopping))
+    click.echo(f"Processed {processed} job(s).")
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(recount_comments_command)
+    app.cli.add_command(search_rebuild_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(worker_command)
@@ -3,5 +3,7 @@
 from .user import User
 from .post import Post
 from .comment import Comment
+from .revoked_token import RevokedToken
+from . import search  # noqa: F401  registers the FTS index DDL
 
-__all__ = ['User', 'Post', 'Comment']
\ No newline at end of file
+__all__ = ['User', 'Post', 'Comment', 'RevokedToken']
\ No newline at end of file
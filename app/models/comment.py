@@ -3,19 +3,24 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Text, DateTime, ForeignKey, Integer
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, DateTime, ForeignKey, Integer, Index, event, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Mapped, Mapper, mapped_column, relationship
 
 if TYPE_CHECKING:
     from .user import User
-    from .post import Post
 
 from app.extensions import db
+from .post import Post
 
 
 class Comment(db.Model):
     
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Serves thread pages (WHERE post_id ORDER BY created_at DESC, id DESC) and plain post_id lookups
+        Index('ix_comments_post_created_id', 'post_id', 'created_at', 'id'),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     
@@ -25,8 +30,7 @@ class Comment(db.Model):
     post_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('posts.id', ondelete='CASCADE'),
-        nullable=False,
-        index=True
+        nullable=False
     )
     author_id: Mapped[int] = mapped_column(
         Integer,
@@ -43,6 +47,9 @@ class Comment(db.Model):
         nullable=False
     )
     
+    post: Mapped['Post'] = relationship(back_populates='comments')
+    author: Mapped['User'] = relationship(back_populates='comments')
+    
     def __init__(self, name: str, content: str, post_id: int, author_id: int) -> None:
         self.name = name
         self.content = content
@@ -83,4 +90,24 @@ class Comment(db.Model):
         return self.author_id == user_id
     
     def __repr__(self) -> str:
-        return f'<Comment by {self.name} on "{self.post.title if self.post else "Unknown"}">'
\ No newline at end of file
+        return f'<Comment by {self.name} on "{self.post.title if self.post else "Unknown"}">'
+
+
+def _adjust_comment_count(connection: Connection, post_id: int, delta: int) -> None:
+    posts = Post.__table__
+    connection.execute(
+        update(posts)
+        .where(posts.c.id == post_id)
+        # Keep updated_at untouched: a new comment is not an edit of the post
+        .values(comment_count=posts.c.comment_count + delta, updated_at=posts.c.updated_at)
+    )
+
+
+@event.listens_for(Comment, 'after_insert')
+def _increment_comment_count(mapper: Mapper, connection: Connection, target: Comment) -> None:
+    _adjust_comment_count(connection, target.post_id, 1)
+
+
+@event.listens_for(Comment, 'after_delete')
+def _decrement_comment_count(mapper: Mapper, connection: Connection, target: Comment) -> None:
+    _adjust_comment_count(connection, target.post_id, -1)
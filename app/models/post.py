@@ -3,7 +3,7 @@ from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Text, DateTime, ForeignKey, Integer
+from sqlalchemy import String, Text, DateTime, ForeignKey, Integer, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
@@ -16,6 +16,10 @@ from app.extensions import db
 class Post(db.Model):
     
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Backs the keyset feed: WHERE is_published ORDER BY created_at DESC, id DESC
+        Index('ix_posts_published_created_id', 'is_published', 'created_at', 'id'),
+    )
     
     id: Mapped[int] = mapped_column(primary_key=True)
     
@@ -25,6 +29,9 @@ class Post(db.Model):
     slug: Mapped[Optional[str]] = mapped_column(String(200), unique=True, index=True)
     is_published: Mapped[bool] = mapped_column(default=True, nullable=False)
     
+    # Denormalized; maintained by Comment mapper events, reconciled by `flask recount-comments`
+    comment_count: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    
     author_id: Mapped[int] = mapped_column(
         Integer,
         ForeignKey('users.id', ondelete='CASCADE'),
@@ -40,6 +47,13 @@ class Post(db.Model):
         nullable=False
     )
     
+    author: Mapped['User'] = relationship(back_populates='posts')
+    comments: Mapped[List['Comment']] = relationship(
+        back_populates='post',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+    
 
     def __init__(self, title: str, content: str, author_id: int, 
                  slug: Optional[str] = None, is_published: bool = True) -> None:
@@ -49,7 +63,8 @@ class Post(db.Model):
         self.slug = slug or self._generate_slug(title)
         self.is_published = is_published
     
-    def _generate_slug(self, title: str) -> str:
+    @staticmethod
+    def _generate_slug(title: str) -> str:
         import re
         slug = re.sub(r'[^\w\s-]', '', title.lower())
         slug = re.sub(r'[-\s]+', '-', slug)
@@ -61,10 +76,6 @@ class Post(db.Model):
             return self.content
         return self.content[:197] + "..."
     
-    @property
-    def comment_count(self) -> int:
-        return self.comments.count()
-    
     def to_dict(self, include_content: bool = True, include_author: bool = True) -> dict:
         data = {
             'id': self.id,
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.extensions import db
+
+
+class RevokedToken(db.Model):
+
+    __tablename__ = 'revoked_tokens'
+
+    # Increasing ids let every process fetch only the revocations it has not seen yet
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    jti: Mapped[str] = mapped_column(String(36), unique=True, nullable=False)
+    token_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    user_id: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey('users.id', ondelete='CASCADE'),
+        index=True
+    )
+
+    # Rows are pruned once the token would have expired anyway
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<RevokedToken {self.jti}>'
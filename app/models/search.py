@@ -0,0 +1,45 @@
+from typing import Any
+
+from sqlalchemy import DDL, event, text
+from sqlalchemy.engine import Connection
+
+from .post import Post
+
+# External-content FTS5 index over posts(title, content); rowid is posts.id.
+# Triggers keep it in sync for ORM, Core and bulk writes alike.
+FTS_TABLE = 'posts_fts'
+
+_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, content, content='posts', content_rowid='id', tokenize='porter unicode61')",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON posts BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON posts BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    "END",
+
+    # Only title/content edits touch the index; comment_count bumps do not
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, content ON posts BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, content) VALUES (new.id, new.title, new.content); "
+    "END",
+)
+
+for _statement in _FTS_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'before_drop', DDL(f'DROP TABLE IF EXISTS {FTS_TABLE}').execute_if(dialect='sqlite'))
+
+
+def rebuild_search_index(connection: Connection) -> None:
+    """Create the index and triggers if missing, then reindex every post in one pass."""
+    for statement in _FTS_DDL:
+        connection.execute(text(statement))
+    connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def include_object(obj: Any, name: str, type_: str, reflected: bool, compare_to: Any) -> bool:
+    """Keep Alembic autogenerate from dropping the FTS table and its shadow tables."""
+    return not (type_ == 'table' and name.startswith(FTS_TABLE))
@@ -2,7 +2,6 @@
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 
-import bcrypt
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import String, DateTime, Boolean
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -11,6 +10,7 @@ if TYPE_CHECKING:
     from .post import Post
     from .comment import Comment
 
+from app.auth.hashing import hash_password, verify_password
 from app.extensions import db
 
 
@@ -37,6 +37,17 @@ class User(db.Model):
         nullable=False
     )
     
+    posts: Mapped[List['Post']] = relationship(
+        back_populates='author',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+    comments: Mapped[List['Comment']] = relationship(
+        back_populates='author',
+        cascade='all, delete-orphan',
+        passive_deletes=True
+    )
+    
     def __init__(self, username: str, email: str, password: str, 
                  first_name: Optional[str] = None, last_name: Optional[str] = None) -> None:
         self.username = username
@@ -46,14 +57,10 @@ class User(db.Model):
         self.last_name = last_name
     
     def set_password(self, password: str) -> None:
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        self.password_hash = hash_password(password)
     
     def check_password(self, password: str) -> bool:
-        password_bytes = password.encode('utf-8')
-        hash_bytes = self.password_hash.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hash_bytes)
+        return verify_password(password, self.password_hash)
     
     @property
     def full_name(self) -> str:
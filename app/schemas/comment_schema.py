@@ -2,14 +2,17 @@ from marshmallow import Schema, fields, validate, validates, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 from app.models import Comment, Post
+from app.utils.request_metrics import TimedSchemaMixin
+from .user_schema import UserSchema
 
 
-class CommentSchema(SQLAlchemyAutoSchema):
+class CommentSchema(TimedSchemaMixin, SQLAlchemyAutoSchema):
     
     class Meta:
         model = Comment
         load_instance = True
     author_id = fields.Int(dump_only=True)
+    author = fields.Nested(UserSchema, only=('id', 'username', 'full_name'), dump_only=True)
 
 
 
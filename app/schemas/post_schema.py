@@ -3,13 +3,16 @@ from marshmallow import Schema, fields, validate, validates, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 from app.models import Post
+from app.utils.request_metrics import TimedSchemaMixin
+from .user_schema import UserSchema
 
 
-class PostSchema(SQLAlchemyAutoSchema):
+class PostSchema(TimedSchemaMixin, SQLAlchemyAutoSchema):
     
     class Meta:
         model = Post
         load_instance = True
+    author = fields.Nested(UserSchema, only=('id', 'username', 'full_name'), dump_only=True)
 
 
 
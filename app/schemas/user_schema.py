@@ -3,9 +3,10 @@ from marshmallow import Schema, fields, validate, validates, ValidationError
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 from app.models import User
+from app.utils.request_metrics import TimedSchemaMixin
 
 
-class UserSchema(SQLAlchemyAutoSchema):
+class UserSchema(TimedSchemaMixin, SQLAlchemyAutoSchema):
     
     class Meta:
         model = User
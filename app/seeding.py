@@ -0,0 +1,85 @@
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Iterator
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection
+
+from app.auth.hashing import hash_password
+from app.models import Comment, Post, User
+
+DEFAULT_PASSWORD = 'SeedPass123'
+WORDS = (
+    'flask', 'python', 'query', 'index', 'cache', 'latency', 'thread', 'worker', 'cursor', 'schema',
+    'garden', 'coffee', 'travel', 'music', 'recipe', 'tomato', 'mountain', 'river', 'winter', 'summer',
+)
+_EPOCH = datetime(2024, 1, 1)
+
+
+def _chunks(make_row: Callable[[int], dict], first_id: int, count: int, chunk_size: int) -> Iterator[list[dict]]:
+    for start in range(first_id, first_id + count, chunk_size):
+        yield [make_row(row_id) for row_id in range(start, min(start + chunk_size, first_id + count))]
+
+
+def seed_database(connection: Connection, users: int, posts: int, comments: int, seed: int = 0,
+                  chunk_size: int = 10_000, password: str = DEFAULT_PASSWORD) -> dict[str, range]:
+    """Append synthetic users, posts and comments with chunked Core ``executemany``.
+
+    Ids are assigned explicitly after the current maximum, so usernames (``user<id>``)
+    and slugs (``<title>-<id>``) are unique and the same seed on the same starting
+    database always produces the same rows. Every user shares one password hash.
+    Mapper events do not fire, so ``comment_count`` is left for the caller to reconcile.
+    """
+    if (posts or comments) and not users:
+        raise ValueError('Seeding posts or comments requires seeding users too')
+    if comments and not posts:
+        raise ValueError('Seeding comments requires seeding posts too')
+
+    def new_ids(model, count: int) -> range:
+        first = (connection.scalar(select(func.max(model.id))) or 0) + 1
+        return range(first, first + count)
+
+    user_ids = new_ids(User, users)
+    post_ids = new_ids(Post, posts)
+    comment_ids = new_ids(Comment, comments)
+    rng = random.Random(seed)
+    password_hash = hash_password(password)
+    # Drawing words per row dominates the run time; pick from small pre-built pools instead
+    titles = [rng.choices(WORDS, k=5) for _ in range(512)]
+    post_bodies = [' '.join(rng.choices(WORDS, k=120)) for _ in range(256)]
+    comment_bodies = [' '.join(rng.choices(WORDS, k=25)) for _ in range(256)]
+
+    def user_row(row_id: int) -> dict:
+        created = _EPOCH + timedelta(minutes=row_id)
+        return {
+            'id': row_id, 'username': f'user{row_id}', 'email': f'user{row_id}@example.com',
+            'password_hash': password_hash, 'first_name': None, 'last_name': None, 'is_active': True,
+            'created_at': created, 'updated_at': created
+        }
+
+    def post_row(row_id: int) -> dict:
+        words = rng.choice(titles)
+        created = _EPOCH + timedelta(seconds=30 * row_id)
+        return {
+            'id': row_id, 'title': ' '.join(words).capitalize(), 'content': rng.choice(post_bodies),
+            'slug': f"{'-'.join(words)}-{row_id}", 'is_published': rng.random() < 0.9, 'comment_count': 0,
+            'author_id': rng.choice(user_ids), 'created_at': created, 'updated_at': created
+        }
+
+    def comment_row(row_id: int) -> dict:
+        created = _EPOCH + timedelta(seconds=6 * row_id)
+        return {
+            'id': row_id, 'name': 'Reader', 'content': rng.choice(comment_bodies),
+            'post_id': rng.choice(post_ids), 'author_id': rng.choice(user_ids),
+            'created_at': created, 'updated_at': created
+        }
+
+    for model, make_row, ids in (
+        (User, user_row, user_ids),
+        (Post, post_row, post_ids),
+        (Comment, comment_row, comment_ids),
+    ):
+        for chunk in _chunks(make_row, ids.start, len(ids), chunk_size):
+            connection.execute(insert(model), chunk)
+
+    return {'users': user_ids, 'posts': post_ids, 'comments': comment_ids}
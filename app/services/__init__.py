@@ -0,0 +1,5 @@
+"""Business logic shared by the JSON API and the server-rendered UI."""
+
+from .errors import ServiceError, NotFound, PermissionDenied, AuthenticationFailed
+
+__all__ = ['ServiceError', 'NotFound', 'PermissionDenied', 'AuthenticationFailed']
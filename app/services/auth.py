@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from sqlalchemy import Select, select
+
+from app.auth.hashing import get_password_hasher
+from app.auth.identity_cache import get_identity_cache, load_user
+from app.auth.revocation import get_revocation_list
+from app.extensions import db
+from app.models import RevokedToken, User
+from app.utils.cache import invalidate_cache
+from app.utils.jobs import enqueue_after_commit
+from .errors import AuthenticationFailed, ServiceError
+
+
+def get_active_user(user_id: Any) -> Optional[User]:
+    user = load_user(user_id)
+    if not user or not user.is_active:
+        return None
+    return user
+
+
+def issue_tokens(user: User) -> dict:
+    return {
+        'access_token': create_access_token(identity=user.id),
+        'refresh_token': create_refresh_token(identity=user.id)
+    }
+
+
+def revocation_rows(tokens: list[dict]) -> dict[str, dict]:
+    """``RevokedToken`` values keyed by jti; a token presented twice is revoked once."""
+    return {
+        token['jti']: {
+            'jti': token['jti'],
+            'token_type': token['type'],
+            'user_id': int(token['sub']),
+            'expires_at': datetime.utcfromtimestamp(token['exp'])
+        }
+        for token in tokens
+    }
+
+
+def already_revoked_query(jtis: Iterable[str]) -> Select:
+    return select(RevokedToken.jti).where(RevokedToken.jti.in_(list(jtis)))
+
+
+def revoke_tokens(claims: dict, refresh_token: Optional[str] = None) -> None:
+    """Revoke the token behind ``claims`` and, if given, the caller's encoded refresh token.
+
+    Tokens that are already revoked are left as they are, so logging out twice is harmless.
+    """
+    revoked = [claims]
+    if refresh_token:
+        try:
+            refresh_claims = decode_token(refresh_token)
+        except Exception:
+            raise ServiceError('Invalid refresh token')
+        if refresh_claims['type'] != 'refresh' or str(refresh_claims['sub']) != str(claims['sub']):
+            raise ServiceError('Invalid refresh token')
+        revoked.append(refresh_claims)
+
+    rows = revocation_rows(revoked)
+    existing = set(db.session.scalars(already_revoked_query(rows)))
+    for jti, row in rows.items():
+        if jti not in existing:
+            db.session.add(RevokedToken(**row))
+    revocations = get_revocation_list()
+    if revocations.table_prune_due():
+        enqueue_after_commit('auth.prune_revoked_tokens')
+    db.session.commit()
+    for jti, row in rows.items():
+        revocations.add(jti, row['expires_at'])
+
+
+def register_user(data: dict) -> User:
+    if data['password'] != data['confirm_password']:
+        raise ServiceError('Password and confirm password should be same!', 401)
+
+    user = User(
+        username=data['username'],
+        email=data['email'],
+        password=data['password'],
+        first_name=data.get('first_name'),
+        last_name=data.get('last_name')
+    )
+
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def authenticate(username: str, password: str) -> User:
+    user = User.query.filter_by(username=username).first()
+
+    if not user or not user.check_password(password):
+        raise AuthenticationFailed('Invalid username or password')
+
+    if not user.is_active:
+        raise AuthenticationFailed('Account is deactivated')
+
+    # Upgrade hashes made under a different BCRYPT_LOG_ROUNDS while we hold the plaintext
+    if get_password_hasher().needs_rehash(user.password_hash):
+        user.set_password(password)
+        db.session.commit()
+
+    return user
+
+
+def update_profile(user: User, data: dict) -> User:
+    if 'first_name' in data:
+        user.first_name = data['first_name']
+    if 'last_name' in data:
+        user.last_name = data['last_name']
+    if 'email' in data:
+        # Check if email is already taken by another user
+        existing_user = User.query.filter_by(email=data['email']).first()
+        if existing_user and existing_user.id != user.id:
+            raise ServiceError('Email already taken')
+        user.email = data['email']
+
+    db.session.commit()
+    get_identity_cache().invalidate(user.id)
+    invalidate_cache(f'user:{user.id}')
+    return user
+
+
+def deactivate_user(user: User) -> None:
+    user.is_active = False
+    db.session.commit()
+    get_identity_cache().invalidate(user.id)
+    invalidate_cache(f'user:{user.id}')
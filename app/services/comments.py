@@ -0,0 +1,147 @@
+from datetime import datetime
+from typing import Collection, Optional, Sequence
+
+from sqlalchemy import Select, and_, desc, func, or_, select
+from sqlalchemy.orm import aliased, joinedload, load_only, selectinload
+
+from app.extensions import db
+from app.models import Comment, Post, User
+from app.utils.cache import invalidate_cache
+from app.utils.fieldsets import load_only_columns
+from .errors import NotFound, PermissionDenied, ServiceError
+
+
+def thread_page_query(post_id: int, position: Optional[tuple[datetime, int]] = None) -> Select:
+    """Comments of a post newest first, starting after ``position`` if given."""
+    query = (
+        select(Comment)
+        .where(Comment.post_id == post_id)
+        .order_by(desc(Comment.created_at), desc(Comment.id))
+    )
+    if position:
+        created_at, comment_id = position
+        query = query.where(or_(
+            Comment.created_at < created_at,
+            and_(Comment.created_at == created_at, Comment.id < comment_id)
+        ))
+    return query
+
+
+# Loaded under ``?fields=`` even when not requested: cache tags and cursors use them
+THREAD_COLUMNS = ('id', 'author_id', 'created_at')
+
+
+def thread_statement(post_id: int, page_query: Select, fields: Optional[Collection[str]] = None) -> Select:
+    """Load the post and one page of its comments in a single round trip.
+
+    The page is cut in a subquery and outer-joined to the post row, so an unknown or
+    unpublished post yields no rows while an empty page still yields the post. With
+    ``fields``, only those comment columns are selected. Only the post's summary
+    columns are, since they repeat on every comment row; ``content`` loads on access.
+    """
+    page = aliased(Comment, page_query.subquery())
+    options = [
+        load_only(Post.id, Post.title, Post.slug, Post.is_published, Post.author_id),
+        *load_only_columns(page, fields, *THREAD_COLUMNS)
+    ]
+    if fields is None or 'author' in fields:
+        options.append(selectinload(page.author))
+    return (
+        select(Post, page)
+        .outerjoin(page, page.post_id == Post.id)
+        .where(Post.id == post_id, Post.is_published.is_(True))
+        .order_by(desc(page.created_at), desc(page.id))
+        .options(*options)
+    )
+
+
+def unpack_thread(rows: Sequence) -> tuple[Post, list[Comment]]:
+    if not rows:
+        raise NotFound('Post not found')
+    return rows[0][0], [comment for _, comment in rows if comment is not None]
+
+
+def comment_count_query(post_id: int) -> Select:
+    return select(func.count(Comment.id)).where(Comment.post_id == post_id)
+
+
+def list_post_comments(post_id: int, page: int, per_page: int,
+                       fields: Optional[Collection[str]] = None) -> tuple[Post, list[Comment], int]:
+    page_query = thread_page_query(post_id).offset((page - 1) * per_page).limit(per_page)
+    post, comments = unpack_thread(db.session.execute(thread_statement(post_id, page_query, fields)).all())
+    total = db.session.scalar(comment_count_query(post_id))
+    return post, comments, total
+
+
+def list_post_comments_before(post_id: int, position: Optional[tuple[datetime, int]], per_page: int,
+                              fields: Optional[Collection[str]] = None) -> tuple[Post, list[Comment], bool]:
+    """Keyset page over ``(created_at, id)`` backed by the (post_id, created_at, id) index."""
+    page_query = thread_page_query(post_id, position).limit(per_page + 1)
+    post, comments = unpack_thread(db.session.execute(thread_statement(post_id, page_query, fields)).all())
+    return post, comments[:per_page], len(comments) > per_page
+
+
+def get_comment(comment_id: int, fields: Optional[Collection[str]] = None) -> Comment:
+    options = load_only_columns(Comment, fields, 'author_id')
+    if fields is None or 'author' in fields:
+        options.append(joinedload(Comment.author))
+    comment = db.session.get(Comment, comment_id, options=options)
+    if not comment:
+        raise NotFound('Comment not found')
+    return comment
+
+
+def get_own_comment(comment_id: int, user: User, for_delete: bool = False) -> Comment:
+    comment = db.session.get(Comment, comment_id)
+    if not comment:
+        raise NotFound('Comment not found')
+    allowed = comment.can_delete(user.id) if for_delete else comment.can_edit(user.id)
+    if not allowed:
+        raise PermissionDenied('Permission denied')
+    return comment
+
+
+def create_comment(author: User, data: dict) -> Comment:
+    post = db.session.get(Post, data['post_id'])
+    if not post or not post.is_published:
+        raise NotFound('Post not found')
+
+    comment = Comment(
+        name=data['name'],
+        content=data['content'],
+        post_id=data['post_id'],
+        author_id=author.id
+    )
+
+    db.session.add(comment)
+    db.session.commit()
+    invalidate_cache(f'post:{data["post_id"]}')
+    return comment
+
+
+def update_comment(comment_id: int, user: User, data: dict) -> Comment:
+    comment = get_own_comment(comment_id, user)
+
+    if 'name' in data:
+        if not data['name'].strip():
+            raise ServiceError('Name cannot be empty')
+        comment.name = data['name'].strip()
+
+    if 'content' in data:
+        if not data['content'].strip():
+            raise ServiceError('Content cannot be empty')
+        comment.content = data['content'].strip()
+
+    post_id = comment.post_id
+    db.session.commit()
+    invalidate_cache(f'comments:{post_id}')
+    return comment
+
+
+def delete_comment(comment_id: int, user: User) -> None:
+    comment = get_own_comment(comment_id, user, for_delete=True)
+
+    post_id = comment.post_id
+    db.session.delete(comment)
+    db.session.commit()
+    invalidate_cache(f'post:{post_id}')
@@ -0,0 +1,24 @@
+from typing import Optional
+
+
+class ServiceError(Exception):
+    
+    status_code: int = 400
+    
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.message = message
+        if status_code is not None:
+            self.status_code = status_code
+
+
+class NotFound(ServiceError):
+    status_code = 404
+
+
+class PermissionDenied(ServiceError):
+    status_code = 403
+
+
+class AuthenticationFailed(ServiceError):
+    status_code = 401
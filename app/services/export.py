@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Comment, Post
+
+
+def iter_posts_with_comments(since: Optional[datetime] = None, batch_size: int = 1000) -> Iterator[dict]:
+    """Yield each published post with its comments, in id order, at constant memory.
+
+    Posts and comments are read with two server-side cursors over Core rows (no ORM
+    identity map) and merge-joined on ``post_id``, so there is no query per post.
+    The two SELECTs may see different snapshots, so comments of a post missing from
+    the post stream (unpublished or edited in between) are skipped.
+    """
+    posts = Post.__table__
+    comments = Comment.__table__
+
+    post_filter = [posts.c.is_published.is_(True)]
+    if since is not None:
+        post_filter.append(posts.c.updated_at >= since)
+
+    post_rows = db.session.execute(
+        select(posts).where(*post_filter).order_by(posts.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    comment_rows = iter(db.session.execute(
+        select(comments).join(posts, posts.c.id == comments.c.post_id).where(*post_filter)
+        .order_by(comments.c.post_id, comments.c.id)
+        .execution_options(yield_per=batch_size)
+    ))
+
+    comment = next(comment_rows, None)
+    for post in post_rows:
+        thread = []
+        while comment is not None and comment.post_id < post.id:
+            comment = next(comment_rows, None)
+        while comment is not None and comment.post_id == post.id:
+            thread.append(dict(comment._mapping))
+            comment = next(comment_rows, None)
+        yield {**post._mapping, 'comments': thread}
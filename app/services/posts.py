@@ -0,0 +1,258 @@
+import html
+import logging
+import re
+from datetime import datetime
+from typing import Collection, Iterable, Optional, Sequence
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import ColumnElement, DateTime, Select, and_, desc, insert, or_, select, text
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.extensions import db
+from app.models import Post, User
+from app.utils.cache import invalidate_cache
+from app.utils.fieldsets import load_only_columns
+from app.utils.jobs import enqueue_after_commit, job
+from app.models.search import FTS_TABLE
+from .errors import NotFound, PermissionDenied, ServiceError
+
+logger = logging.getLogger('app.posts')
+
+
+# Loaded under ``?fields=`` even when not requested: cache tags need the author,
+# cursors need (created_at, id)
+FEED_COLUMNS = ('id', 'author_id', 'created_at')
+
+
+def feed_options(fields: Optional[Collection[str]] = None) -> list:
+    """Loader options for feed pages; with ``fields``, unrequested columns stay in the database."""
+    options = load_only_columns(Post, fields, *FEED_COLUMNS)
+    if fields is None or 'author' in fields:
+        options.append(selectinload(Post.author))
+    return options
+
+
+def list_published_posts(page: int, per_page: int, fields: Optional[Collection[str]] = None) -> Pagination:
+    return (
+        Post.query
+        .options(*feed_options(fields))
+        .filter_by(is_published=True)
+        .order_by(desc(Post.created_at))
+        .paginate(page=page, per_page=per_page, error_out=False)
+    )
+
+
+def published_feed_query(position: Optional[tuple[datetime, int]] = None,
+                         fields: Optional[Collection[str]] = None) -> Select:
+    """Newest-first published posts with authors, starting after ``position`` if given."""
+    query = select(Post).options(*feed_options(fields)).where(Post.is_published.is_(True))
+    if position:
+        created_at, post_id = position
+        query = query.where(or_(
+            Post.created_at < created_at,
+            and_(Post.created_at == created_at, Post.id < post_id)
+        ))
+    return query.order_by(desc(Post.created_at), desc(Post.id))
+
+
+def list_published_posts_after(position: Optional[tuple[datetime, int]], per_page: int,
+                               fields: Optional[Collection[str]] = None) -> tuple[Sequence[Post], bool]:
+    """Keyset page over ``(created_at, id)``; no OFFSET and no COUNT."""
+    posts = db.session.scalars(published_feed_query(position, fields).limit(per_page + 1)).all()
+    return posts[:per_page], len(posts) > per_page
+
+
+# FTS5 marks matches in the raw user text; control characters stand in for the tags so the
+# text can be HTML-escaped before the real <mark> tags go in
+_MARK_OPEN, _MARK_CLOSE = '\x02', '\x03'
+
+SEARCH_SQL = text(f"""
+    SELECT posts.id, posts.title, posts.slug, posts.author_id, posts.created_at,
+           highlight({FTS_TABLE}, 0, :mark_open, :mark_close) AS title_highlight,
+           snippet({FTS_TABLE}, 1, :mark_open, :mark_close, '…', 16) AS snippet,
+           bm25({FTS_TABLE}, 10.0, 1.0) AS rank
+    FROM {FTS_TABLE}
+    JOIN posts ON posts.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH :match AND posts.is_published = 1
+    ORDER BY rank
+    LIMIT :limit OFFSET :offset
+""").columns(created_at=DateTime())
+
+
+def search_params(query: str, page: int, per_page: int) -> dict:
+    """Bind parameters for ``SEARCH_SQL``; fetches one extra row to detect a next page."""
+    # Quote every word so user input can never be parsed as FTS5 syntax; the last word is a prefix
+    terms = re.findall(r'\w+', query)
+    if not terms:
+        raise ServiceError('Search query must contain at least one word')
+    return {
+        'match': ' '.join(f'"{term}"' for term in terms) + '*',
+        'mark_open': _MARK_OPEN,
+        'mark_close': _MARK_CLOSE,
+        'limit': per_page + 1,
+        'offset': (page - 1) * per_page
+    }
+
+
+def _marked_html(marked: str) -> str:
+    """HTML-escape user text, then turn the match markers into ``<mark>`` tags."""
+    return html.escape(marked).replace(_MARK_OPEN, '<mark>').replace(_MARK_CLOSE, '</mark>')
+
+
+def search_results(rows: Sequence, per_page: int) -> tuple[list[dict], bool]:
+    results = [
+        {
+            **row,
+            'created_at': row['created_at'].isoformat(),
+            'title_highlight': _marked_html(row['title_highlight']),
+            'snippet': _marked_html(row['snippet'])
+        }
+        for row in rows[:per_page]
+    ]
+    return results, len(rows) > per_page
+
+
+def search_posts(query: str, page: int, per_page: int) -> tuple[list[dict], bool]:
+    """Rank published posts by bm25 (title weighted over content) with highlighted snippets."""
+    if db.session.get_bind().dialect.name != 'sqlite':
+        raise ServiceError('Search is only available on SQLite', 501)
+
+    params = search_params(query, page, per_page)
+    rows = db.session.execute(SEARCH_SQL, params).mappings().all()
+    return search_results(rows, per_page)
+
+
+def get_published_post(post_id: int, fields: Optional[Collection[str]] = None) -> Post:
+    options = load_only_columns(Post, fields, 'author_id', 'is_published')
+    if fields is None or 'author' in fields:
+        options.append(joinedload(Post.author))
+    post = db.session.get(Post, post_id, options=options)
+    if not post or not post.is_published:
+        raise NotFound('Post not found')
+    return post
+
+
+def get_own_post(post_id: int, user: User, for_delete: bool = False) -> Post:
+    post = db.session.get(Post, post_id)
+    if not post:
+        raise NotFound('Post not found')
+    allowed = post.can_delete(user.id) if for_delete else post.can_edit(user.id)
+    if not allowed:
+        raise PermissionDenied('Permission denied')
+    return post
+
+
+def _slug_candidates(base: str) -> ColumnElement[bool]:
+    """Existing slugs ``assign_slugs`` could produce for ``base``: itself or ``base-<n>``."""
+    if len(base) > 190:
+        # Suffixed slugs of long titles cut into the base
+        return Post.slug.startswith(base[:190], autoescape=True)
+    return or_(Post.slug == base, Post.slug.startswith(f'{base}-', autoescape=True))
+
+
+def slug_conflicts_query(titles: list[str]) -> Select:
+    """One query for every existing slug the titles' slugs could collide with."""
+    bases = {Post._generate_slug(title) or 'post' for title in titles}
+    return select(Post.slug).where(or_(*(_slug_candidates(base) for base in bases)))
+
+
+def assign_slugs(titles: list[str], taken: set[str]) -> list[str]:
+    """Pick a free slug per title; clashes get ``-2``, ``-3``... suffixes within 200 chars."""
+    slugs = []
+    for title in titles:
+        base = Post._generate_slug(title) or 'post'
+        slug, n = base, 1
+        while slug in taken:
+            n += 1
+            suffix = f'-{n}'
+            slug = base[:200 - len(suffix)] + suffix
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slugs(titles: list[str], exclude: Iterable[Optional[str]] = ()) -> list[str]:
+    """Return a unique slug per title, de-duplicated against the table and each other."""
+    taken = set(db.session.scalars(slug_conflicts_query(titles)))
+    taken.difference_update(exclude)
+    return assign_slugs(titles, taken)
+
+
+def create_post(author: User, data: dict) -> Post:
+    post = Post(
+        title=data['title'],
+        content=data['content'],
+        author_id=author.id,
+        slug=allocate_slugs([data['title']])[0],
+        is_published= True #data.get('is_published', True) # Will work on this later
+    )
+
+    db.session.add(post)
+    db.session.flush()
+    enqueue_after_commit('posts.created', post_ids=[post.id])
+    db.session.commit()
+    invalidate_cache('feed')
+    return post
+
+
+def create_posts(author: User, items: list[dict]) -> list[tuple[int, str]]:
+    """Insert already-validated posts in one transaction with a single executemany."""
+    now = datetime.utcnow()
+    slugs = allocate_slugs([item['title'] for item in items])
+    rows = [
+        {
+            'title': item['title'],
+            'content': item['content'],
+            'slug': slug,
+            'author_id': author.id,
+            'is_published': True,  # matches create_post until is_published is honoured
+            'created_at': now,
+            'updated_at': now
+        }
+        for item, slug in zip(items, slugs)
+    ]
+    ids = db.session.scalars(insert(Post).returning(Post.id, sort_by_parameter_order=True), rows).all()
+    enqueue_after_commit('posts.created', post_ids=ids)
+    db.session.commit()
+    invalidate_cache('feed')
+    return list(zip(ids, slugs))
+
+
+@job('posts.created')
+def posts_created(post_ids: list[int]) -> None:
+    """Runs after the creating transaction commits, off the request path."""
+    rows = db.session.execute(
+        select(Post.id, Post.title, User.username)
+        .join(User, User.id == Post.author_id)
+        .where(Post.id.in_(post_ids))
+    ).all()
+    for post_id, title, username in rows:
+        logger.info('Post created: #%d %r by %s', post_id, title, username)
+
+
+def update_post(post_id: int, user: User, data: dict) -> Post:
+    post = get_own_post(post_id, user)
+
+    if 'title' in data:
+        post.title = data['title']
+        post.slug = allocate_slugs([data['title']], exclude=[post.slug])[0]
+
+    if 'content' in data:
+        post.content = data['content']
+
+    feed_changed = False
+    if 'is_published' in data:
+        feed_changed = post.is_published != data['is_published']
+        post.is_published = data['is_published']
+
+    db.session.commit()
+    invalidate_cache(f'post:{post_id}', *(('feed',) if feed_changed else ()))
+    return post
+
+
+def delete_post(post_id: int, user: User) -> None:
+    post = get_own_post(post_id, user, for_delete=True)
+
+    db.session.delete(post)
+    db.session.commit()
+    invalidate_cache(f'post:{post_id}', 'feed')
@@ -1,48 +1,70 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-import requests
+from typing import Optional
 
-ui = Blueprint("ui", __name__)
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, session, flash
+from flask_jwt_extended import decode_token
+from marshmallow import ValidationError
+
+from app import db
+from app.models import User
+from app.schemas import UserRegistrationSchema, UserLoginSchema, PostCreateSchema, PostUpdateSchema
+from app.services import ServiceError
+from app.services import auth as auth_service
+from app.services import comments as comment_service
+from app.services import posts as post_service
+from app.utils.ratelimit import rate_limit
 
-API_BASE = "http://localhost:5000/api"
+ui = Blueprint("ui", __name__)
 
 
-def get_auth_headers():
+def get_current_user() -> Optional[User]:
     token = session.get("access_token")
-    return {"Authorization": f"Bearer {token}"} if token else {}
+    if not token:
+        return None
+    try:
+        identity = decode_token(token)[current_app.config["JWT_IDENTITY_CLAIM"]]
+    except Exception:
+        return None
+    return auth_service.get_active_user(identity)
+
+
+def start_session(user: User) -> None:
+    session["access_token"] = auth_service.issue_tokens(user)["access_token"]
+    session["username"] = user.username
+    session["user"] = user.id
 
 
 @ui.route("/")
 def home():
-    res = requests.get(f"{API_BASE}/posts")
-    posts = res.json().get("posts", []) if res.ok else []
+    posts = post_service.list_published_posts(page=1, per_page=10).items
     return render_template("index.html", posts=posts)
 
 
 @ui.route("/register", methods=["GET", "POST"])
+@rate_limit('register')
 def register():
-    print(11111)
     if request.method == "POST":
-        data = request.form.to_dict()
-        res = requests.post(f"{API_BASE}/auth/register", json=data)
-        if res.ok:
-            session["access_token"] = res.json()["access_token"]
-            session["username"] = res.json()["user"]["username"]
-            session["user"] = res.json()["user"]['id']
+        try:
+            data = UserRegistrationSchema().load(request.form.to_dict())
+            start_session(auth_service.register_user(data))
             return redirect(url_for("ui.home"))
-        flash(res.json().get("error", "Registration failed"), "danger")
+        except ValidationError:
+            flash("Validation failed", "danger")
+        except ServiceError as err:
+            db.session.rollback()
+            flash(err.message, "danger")
     return render_template("register.html")
 
 
 @ui.route("/login", methods=["GET", "POST"])
+@rate_limit('login')
 def login():
     if request.method == "POST":
-        res = requests.post(f"{API_BASE}/auth/login", json=request.form.to_dict())
-        if res.ok:
-            session["access_token"] = res.json()["access_token"]
-            session["username"] = res.json()["user"]["username"]
-            session["user"] = res.json()["user"]['id']
+        try:
+            data = UserLoginSchema().load(request.form.to_dict())
+            start_session(auth_service.authenticate(data["username"], data["password"]))
             return redirect(url_for("ui.home"))
-        flash("Invalid credentials", "danger")
+        except (ValidationError, ServiceError):
+            flash("Invalid credentials", "danger")
     return render_template("login.html")
 
 
@@ -53,90 +75,120 @@ def logout():
 
 
 @ui.route("/posts/new", methods=["GET", "POST"])
+@rate_limit('write')
 def create_post():
     if request.method == "POST":
+        user = get_current_user()
         data = request.form.to_dict()
         data["is_published"] = "is_published" in data
-        res = requests.post(f"{API_BASE}/posts", json=data, headers=get_auth_headers())
-        if res.ok:
+        try:
+            if not user:
+                raise ServiceError("Authentication required", 401)
+            post_service.create_post(user, PostCreateSchema().load(data))
             return redirect(url_for("ui.home"))
-        flash("Post creation failed", "danger")
+        except (ValidationError, ServiceError):
+            db.session.rollback()
+            flash("Post creation failed", "danger")
     return render_template("post_form.html", post=None)
 
 
 @ui.route("/posts/<int:post_id>", methods=["GET", "POST"])
+@rate_limit('write')
 def post_detail(post_id):
-    post_res = requests.get(f"{API_BASE}/posts/{post_id}")
-    comments_res = requests.get(f"{API_BASE}/comments/posts/{post_id}")
     if request.method == "POST" and session.get("user"):
-        comment_data = {
-            "name": session["username"],
-            "content": request.form["content"],
-            "post_id": post_id,
-        }
-        requests.post(f"{API_BASE}/comments", json=comment_data, headers=get_auth_headers())
+        user = get_current_user()
+        if user:
+            comment_data = {
+                "name": session["username"],
+                "content": request.form["content"],
+                "post_id": post_id,
+            }
+            try:
+                comment_service.create_comment(user, comment_data)
+            except ServiceError:
+                db.session.rollback()
         return redirect(request.url)
+    try:
+        post, comments, _ = comment_service.list_post_comments(post_id, page=1, per_page=20)
+    except ServiceError:
+        post, comments = None, []
     return render_template(
         "post_detail.html",
-        post=post_res.json().get("post"),
-        comments=comments_res.json().get("comments", []),
+        post=post,
+        comments=comments,
     )
 
 
 @ui.route("/posts/<int:post_id>/edit", methods=["GET", "POST"])
+@rate_limit('write')
 def edit_post(post_id):
-    post_res = requests.get(f"{API_BASE}/posts/{post_id}", headers=get_auth_headers())
-    post = post_res.json().get("post") if post_res.ok else None
-    if not post:
+    try:
+        post = post_service.get_published_post(post_id)
+    except ServiceError:
         flash("Post not found", "danger")
         return redirect(url_for("ui.home"))
     if request.method == "POST":
+        user = get_current_user()
         data = request.form.to_dict()
         data["is_published"] = "is_published" in data
-        res = requests.put(f"{API_BASE}/posts/{post_id}", json=data, headers=get_auth_headers())
-        if res.ok:
+        try:
+            if not user:
+                raise ServiceError("Authentication required", 401)
+            post_service.update_post(post_id, user, PostUpdateSchema().load(data))
             return redirect(url_for("ui.post_detail", post_id=post_id))
-        flash("Update failed", "danger")
+        except (ValidationError, ServiceError):
+            db.session.rollback()
+            flash("Update failed", "danger")
     return render_template("post_form.html", post=post)
 
 @ui.route("/posts/<int:post_id>/delete", methods=["POST"])
+@rate_limit('write')
 def delete_post(post_id):
-    res = requests.delete(f"{API_BASE}/posts/{post_id}", headers=get_auth_headers())
-    if res.ok:
+    user = get_current_user()
+    try:
+        if not user:
+            raise ServiceError("Authentication required", 401)
+        post_service.delete_post(post_id, user)
         flash("Post deleted", "success")
-    else:
+    except ServiceError:
+        db.session.rollback()
         flash("Failed to delete post", "danger")
     return redirect(url_for("ui.home"))
 
 @ui.route("/comments/<int:comment_id>/delete", methods=["POST"])
+@rate_limit('write')
 def delete_comment(comment_id):
-    res = requests.delete(f"{API_BASE}/comments/{comment_id}", headers=get_auth_headers())
-    if res.ok:
+    user = get_current_user()
+    try:
+        if not user:
+            raise ServiceError("Authentication required", 401)
+        comment_service.delete_comment(comment_id, user)
         flash("Comment deleted", "success")
-    else:
+    except ServiceError:
+        db.session.rollback()
         flash("Failed to delete comment", "danger")
     return redirect(request.referrer or url_for("ui.home"))
 
 @ui.route("/comments/<int:comment_id>", methods=["PUT"])
+@rate_limit('write')
 def update_comment(comment_id):
     if not request.is_json:
         return {"error": "Invalid request format"}, 400
 
     data = request.get_json()
-    res = requests.put(
-        f"{API_BASE}/comments/{comment_id}",
-        headers=get_auth_headers(),
-        json=data,
-    )
-    if res.ok:
+    user = get_current_user()
+    try:
+        if not user:
+            raise ServiceError("Authentication required", 401)
+        comment_service.update_comment(comment_id, user, data)
         return {"message": "Comment updated successfully"}, 200
-    else:
-        return {"error": "Failed to update comment"}, res.status_code
+    except ServiceError as err:
+        db.session.rollback()
+        return {"error": "Failed to update comment"}, err.status_code
 
 
 
 @ui.route("/profile")
 def profile():
-    res = requests.get(f"{API_BASE}/auth/me", headers=get_auth_headers())
-    user = res.json().get("user") if res.ok else {}
-    return render_template("profile.html", user=user)
+    user = get_current_user()
+    return render_template("profile.html", user=user or {})
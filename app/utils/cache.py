@@ -0,0 +1,181 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from flask import Flask, current_app, g
+
+from app.utils.metrics import CACHE_BYTES, CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_INVALIDATIONS, CACHE_LOOKUPS
+
+_HITS, _MISSES = CACHE_LOOKUPS.labels('hit'), CACHE_LOOKUPS.labels('miss')
+
+
+class CachedResponse:
+
+    __slots__ = ('body', 'status', 'mimetype', 'tags', 'expires_at', 'encoded')
+
+    def __init__(self, body: bytes, status: int, mimetype: str,
+                 tags: frozenset[str], expires_at: float) -> None:
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.tags = tags
+        self.expires_at = expires_at
+        # Content-Encoding -> compressed body, filled in by app.utils.compression on first use
+        self.encoded: dict[str, bytes] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+
+class ResponseCache:
+    """LRU of rendered responses with a TTL, a byte-size cap and tag-based invalidation."""
+
+    def __init__(self, ttl: float = 60, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024,
+                 invalidation_memory: float = 0) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # How long invalidated tags are remembered for ``invalidated_within``
+        self.invalidation_memory = invalidation_memory
+
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._invalidated: OrderedDict[str, float] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._report_size()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                _MISSES.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            _HITS.inc()
+            return entry
+
+    def set(self, key: str, body: bytes, status: int, mimetype: str,
+            tags: Iterable[str]) -> Optional[CachedResponse]:
+        if len(body) > self.max_bytes:
+            return None
+        entry = CachedResponse(body, status, mimetype, frozenset(tags), time.monotonic() + self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+            for tag in entry.tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict()
+            self._report_size()
+        return entry
+
+    def add_encoding(self, key: str, entry: CachedResponse, encoding: str, data: bytes) -> None:
+        """Store a compressed variant of ``entry``, unless it was replaced or dropped meanwhile."""
+        with self._lock:
+            if self._entries.get(key) is not entry or encoding in entry.encoded:
+                return
+            entry.encoded[encoding] = data
+            self._size += len(data)
+            self._evict()
+            self._report_size()
+
+    def invalidate(self, *tags: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+                        CACHE_INVALIDATIONS.inc()
+                if self.invalidation_memory:
+                    self._invalidated[tag] = now
+                    self._invalidated.move_to_end(tag)
+            while self._invalidated and next(iter(self._invalidated.values())) <= now - self.invalidation_memory:
+                self._invalidated.popitem(last=False)
+            self._report_size()
+
+    def invalidated_within(self, tags: Iterable[str], seconds: float) -> bool:
+        """True if any of ``tags`` was invalidated in the last ``seconds`` (up to ``invalidation_memory``)."""
+        since = time.monotonic() - seconds
+        with self._lock:
+            return any(self._invalidated.get(tag, since) > since for tag in tags)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._invalidated.clear()
+            self._size = 0
+            self._report_size()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+            CACHE_EVICTIONS.inc()
+
+    def _report_size(self) -> None:
+        CACHE_ENTRIES.set(len(self._entries))
+        CACHE_BYTES.set(self._size)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def init_response_cache(app: Flask) -> None:
+    app.extensions['response_cache'] = ResponseCache(
+        ttl=app.config['RESPONSE_CACHE_TTL'],
+        max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+        max_bytes=app.config['RESPONSE_CACHE_MAX_BYTES'],
+        # Replica reads of a just-changed resource must not be cached; see cached_response
+        invalidation_memory=app.config['REPLICA_STALENESS_SECONDS']
+    )
+
+
+def get_response_cache() -> ResponseCache:
+    return current_app.extensions['response_cache']
+
+
+def tag_response(*tags: str) -> None:
+    """Attach invalidation tags to the response being built by a ``cached_response`` view."""
+    g.setdefault('cache_tags', set()).update(tags)
+
+
+def invalidate_cache(*tags: str) -> None:
+    get_response_cache().invalidate(*tags)
@@ -0,0 +1,68 @@
+import gzip
+from typing import Optional
+
+from flask import Flask, Response, current_app, g, request
+
+from app.utils.cache import get_response_cache
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def available_encodings() -> tuple[str, ...]:
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Best encoding the client accepts, preferring brotli on a tie; None for identity."""
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str, config: dict) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=config['COMPRESSION_BROTLI_QUALITY'])
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=config['COMPRESSION_GZIP_LEVEL'], mtime=0)
+
+
+def _compress_response(response: Response) -> Response:
+    config = current_app.config
+    if (response.mimetype not in config['COMPRESSION_MIMETYPES']
+            or response.direct_passthrough or response.is_streamed):
+        return response
+    response.vary.add('Accept-Encoding')  # type: ignore[union-attr]  # types-Werkzeug 1.x types it as str
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers):
+        return response
+    encoding = negotiate_encoding()
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < config['COMPRESSION_MIN_SIZE']:
+        return response
+
+    # Hot cached pages keep their compressed variants next to the plain body
+    entry = g.get('cache_entry')
+    data = entry.encoded.get(encoding) if entry is not None else None
+    if data is None:
+        data = compress(body, encoding, config)
+        if entry is not None:
+            get_response_cache().add_encoding(g.cache_key, entry, encoding, data)
+    if len(data) >= len(body):
+        return response
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_compression(app: Flask) -> None:
+    if app.config['COMPRESSION_ENABLED']:
+        app.after_request(_compress_response)
@@ -1,12 +1,20 @@
 
+import hashlib
+import logging
+from datetime import datetime
 from functools import wraps
-from typing import Callable, Any
+from typing import Callable, Any, Optional
 
-from flask import jsonify, request
+from flask import current_app, g, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import ValidationError
 
-from app.models import User
+from app.services import auth as auth_service
+from app.utils.cache import get_response_cache
+from app.utils.fieldsets import InvalidFields, parse_fields
+from app.utils.replica import get_recent_writers, replica_enabled, request_identity
+
+logger = logging.getLogger('app.api')
 
 
 def validate_json(schema_class: type) -> Callable:
@@ -22,9 +30,7 @@ def validate_json(schema_class: type) -> Callable:
                 if not json_data:
                     return jsonify({'error': 'No JSON data provided'}), 400
                 schema = schema_class()
-                print(f"Validating JSON data: {json_data}")
                 validated_data = schema.load(json_data)
-                print(f"Validated data: {validated_data}")
                 
                 kwargs['validated_data'] = validated_data
                 
@@ -33,7 +39,7 @@ def validate_json(schema_class: type) -> Callable:
             except ValidationError as err:
                 return jsonify({'error': 'Validation failed', 'details': err.messages}), 400
             except Exception as err:
-                print(err)
+                logger.debug('Rejected JSON body in %s: %s', func.__name__, err)
                 return jsonify({'error': 'Invalid JSON data'}), 400
         
         return wrapper
@@ -48,8 +54,8 @@ def auth_required(func: Callable) -> Callable:
         try:
             current_user_id = get_jwt_identity()
             
-            current_user = User.query.get(current_user_id)
-            if not current_user or not current_user.is_active:
+            current_user = auth_service.get_active_user(current_user_id)
+            if not current_user:
                 return jsonify({'error': 'User not found or inactive'}), 401
             
             kwargs['current_user'] = current_user
@@ -68,8 +74,8 @@ def handle_db_errors(func: Callable) -> Callable:
     def wrapper(*args: Any, **kwargs: Any) -> Any:
         try:
             return func(*args, **kwargs)
-        except Exception as err:
-            print(f"Database error in {func.__name__}: {str(err)}")
+        except Exception:
+            logger.exception('Database error in %s', func.__name__)
             return jsonify({'error': 'Database operation failed'}), 500
     
     return wrapper
@@ -98,6 +104,27 @@ def paginate_query(default_per_page: int = 10, max_per_page: int = 100) -> Calla
     return decorator
 
 
+def sparse_fields(schema_class: type) -> Callable:
+    """Pass ``fields`` from ``?fields=id,title`` (None when absent) to the view.
+    
+    Names ``schema_class`` does not dump are rejected with 400. The cache key and ETag
+    already cover the query string, so each field set is cached separately.
+    """
+    
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                kwargs['fields'] = parse_fields(schema_class, request.args.get('fields'))
+            except InvalidFields as err:
+                return jsonify({'error': str(err)}), 400
+            
+            return func(*args, **kwargs)
+        
+        return wrapper
+    return decorator
+
+
 def cors_headers(func: Callable) -> Callable:
     
     @wraps(func)
@@ -113,4 +140,102 @@ def cors_headers(func: Callable) -> Callable:
         
         return response
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+def cached_response(func: Callable) -> Callable:
+    """Serve the view from the response cache, filled on 200 responses that set tags.
+    
+    Under ``conditional_get`` the validator version is part of the key, so a body cached
+    before a write made elsewhere (another worker) is never served under the new ETag.
+    Under ``use_replica`` recent writers bypass the lookup, and a replica-served body is
+    not stored while its tags were invalidated within ``REPLICA_STALENESS_SECONDS``, since
+    the replica may not have the change yet.
+    """
+    
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not current_app.config['RESPONSE_CACHE_ENABLED']:
+            return func(*args, **kwargs)
+        
+        cache = get_response_cache()
+        query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        key = f'{request.endpoint}:{request.path}?{query}'
+        version = g.get('resource_version')
+        if version is not None:
+            key = f'{key}#{version}'
+        
+        g.cache_key = key
+        entry = None if g.get('recent_writer') else cache.get(key)
+        if entry is not None:
+            g.cache_entry = entry
+            response = current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+            response.headers['X-Cache'] = 'HIT'
+            return response
+        
+        g.cache_tags = set()
+        response = current_app.make_response(func(*args, **kwargs))
+        if response.status_code == 200 and g.cache_tags and not (
+            g.get('use_replica')
+            and cache.invalidated_within(g.cache_tags, current_app.config['REPLICA_STALENESS_SECONDS'])
+        ):
+            g.cache_entry = cache.set(key, response.get_data(), response.status_code, response.mimetype, g.cache_tags)
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    
+    return wrapper
+
+
+def use_replica(func: Callable) -> Callable:
+    """Serve the view's SELECTs from the replica bind when one is configured.
+    
+    Callers who wrote within ``REPLICA_STALENESS_SECONDS`` stay on the primary so they
+    see their own changes. Put it directly under ``@route`` so validators and auth
+    lookups are routed too.
+    """
+    
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if replica_enabled():
+            identity = request_identity()
+            g.recent_writer = identity is not None and get_recent_writers().is_recent(identity)
+            g.use_replica = not g.recent_writer
+        return func(*args, **kwargs)
+    
+    return wrapper
+
+
+def conditional_get(validator: Callable[..., Optional[tuple[Any, datetime]]]) -> Callable:
+    """Answer ``If-None-Match`` with 304 from a cheap ``(version, last_modified)`` validator.
+    
+    The validator receives the view kwargs and returns None when the resource does not
+    exist, in which case the view runs normally and produces its own 404. The weak ETag
+    covers the endpoint, the version and the query args, since those shape the body.
+    """
+    
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            validated = validator(**kwargs)
+            if validated is None:
+                return func(*args, **kwargs)
+            
+            version, last_modified = validated
+            g.resource_version = version
+            query = sorted(request.args.items(multi=True))
+            etag = hashlib.sha1(f'{request.endpoint}|{version}|{query}'.encode('utf-8')).hexdigest()[:24]
+            
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        
+        return wrapper
+    return decorator
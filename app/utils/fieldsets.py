@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Any, Collection, Optional
+
+from marshmallow import Schema
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+class InvalidFields(ValueError):
+    pass
+
+
+@lru_cache(maxsize=None)
+def dump_fields(schema_class: type[Schema]) -> frozenset[str]:
+    return frozenset(name for name, field in schema_class().fields.items() if not field.load_only)
+
+
+def parse_fields(schema_class: type[Schema], raw: Optional[str]) -> Optional[frozenset[str]]:
+    """Names from a ``?fields=id,title`` parameter, checked against what ``schema_class`` dumps.
+
+    None means the parameter was absent and every field is wanted.
+    """
+    if raw is None:
+        return None
+    requested = frozenset(name.strip() for name in raw.split(',') if name.strip())
+    if not requested:
+        raise InvalidFields('fields must name at least one field')
+    unknown = requested - dump_fields(schema_class)
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def restricted_schema(schema_class: type[Schema], fields: Optional[Collection[str]],
+                      many: bool = False) -> Schema:
+    """Shared ``schema_class`` instance dumping only ``fields``; built once per field set."""
+    return _restricted_schema(schema_class, None if fields is None else frozenset(fields), many)
+
+
+@lru_cache(maxsize=256)
+def _restricted_schema(schema_class: type[Schema], fields: Optional[frozenset[str]], many: bool) -> Schema:
+    return schema_class(only=fields, many=many)
+
+
+def load_only_columns(entity: Any, fields: Optional[Collection[str]], *required: str) -> list:
+    """Loader options fetching only the requested columns of ``entity`` plus ``required``.
+
+    Empty when ``fields`` is None, so every column is loaded as usual. ``entity`` may be
+    a mapped class or an ``aliased()`` one.
+    """
+    if fields is None:
+        return []
+    columns = inspect(entity).mapper.column_attrs.keys()
+    return [load_only(*(getattr(entity, name) for name in columns if name in fields or name in required))]
@@ -0,0 +1,284 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.replica import RoutingSession
+
+logger = logging.getLogger('app.jobs')
+
+_JOBS: dict[str, Callable[..., Any]] = {}
+
+
+def job(name: str) -> Callable:
+    """Register a function as a job; its keyword arguments must be JSON-serializable."""
+
+    def decorator(func: Callable) -> Callable:
+        _JOBS[name] = func
+        return func
+    return decorator
+
+
+def run_job(app: Flask, name: str, kwargs: dict) -> None:
+    # A fresh app context means a fresh scoped session, even when called from inside a commit
+    with app.app_context():
+        _JOBS[name](**kwargs)
+
+
+def retry_delay(base: float, attempts: int) -> float:
+    return base * 2 ** (attempts - 1)
+
+
+class JobQueue:
+    """In-process queue drained by a small pool of daemon threads.
+
+    Failed jobs are retried with exponential backoff up to ``max_attempts``. Threads start
+    on the first submit, so a preforking server does not fork them. Pending jobs are lost
+    when the process exits; use the SQLite backend for anything that must survive that.
+    """
+
+    def __init__(self, app: Flask, workers: int = 2, max_size: int = 1000,
+                 max_attempts: int = 3, retry_delay: float = 1.0) -> None:
+        self.app = app
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.inline = workers <= 0
+
+        # (run_at, seq, name, kwargs, attempts); retries wait in the same heap as new jobs
+        self._heap: list[tuple[float, int, str, dict, int]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._pid: Optional[int] = None
+
+    def submit(self, name: str, kwargs: dict) -> bool:
+        """Queue a job; False when the caller should run it itself (queue full, or no worker threads)."""
+        if name not in _JOBS:
+            raise KeyError(f'Unknown job {name!r}')
+        if self.inline:
+            return False
+        with self._cond:
+            if len(self._heap) >= self.max_size:
+                return False
+            self._push(time.monotonic(), name, kwargs, 0)
+            self._ensure_started()
+        return True
+
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def _push(self, run_at: float, name: str, kwargs: dict, attempts: int) -> None:
+        heapq.heappush(self._heap, (run_at, next(self._seq), name, kwargs, attempts))
+        self._cond.notify()
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        # First submit in this process (or the first after a fork, where threads do not survive)
+        self._pid = os.getpid()
+        self._threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _next(self) -> tuple[str, dict, int]:
+        with self._cond:
+            while True:
+                if self._heap:
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        _, _, name, kwargs, attempts = heapq.heappop(self._heap)
+                        return name, kwargs, attempts
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            name, kwargs, attempts = self._next()
+            attempts += 1
+            try:
+                run_job(self.app, name, kwargs)
+            except Exception:
+                if attempts >= self.max_attempts:
+                    logger.exception('Job %s failed after %d attempt(s); dropping it', name, attempts)
+                    continue
+                logger.warning('Job %s failed (attempt %d of %d); retrying', name, attempts,
+                               self.max_attempts, exc_info=True)
+                with self._cond:
+                    self._push(time.monotonic() + retry_delay(self.retry_delay, attempts), name, kwargs, attempts)
+
+
+class SQLiteJobQueue:
+    """Durable queue in its own SQLite file, drained by ``flask worker``.
+
+    A claimed job is leased rather than removed: its ``run_at`` moves ``lease`` seconds
+    ahead, so a worker that dies mid-job leaves it to be picked up again. Jobs that use
+    up ``max_attempts`` stay in the table with ``failed = 1`` and their last error.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            run_at REAL NOT NULL,
+            failed INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_jobs_due ON jobs (failed, run_at);
+    """
+
+    inline = False
+
+    def __init__(self, path: str, max_size: int = 1000, max_attempts: int = 3,
+                 retry_delay: float = 1.0, lease: float = 300) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process; sqlite3 connections must not cross either
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(self.SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def submit(self, name: str, kwargs: dict) -> bool:
+        if name not in _JOBS:
+            raise KeyError(f'Unknown job {name!r}')
+        conn = self._connection()
+        # The count and the insert need not be atomic; max_size is a soft limit
+        if self.depth() >= self.max_size:
+            return False
+        conn.execute(
+            'INSERT INTO jobs (name, payload, run_at) VALUES (?, ?, ?)',
+            (name, json.dumps(kwargs), time.time())
+        )
+        return True
+
+    def depth(self) -> int:
+        return self._connection().execute('SELECT count(*) FROM jobs WHERE failed = 0').fetchone()[0]
+
+    def claim(self) -> Optional[tuple[int, str, dict, int]]:
+        now = time.time()
+        row = self._connection().execute(
+            """
+            UPDATE jobs SET run_at = ?, attempts = attempts + 1
+            WHERE id = (SELECT id FROM jobs WHERE failed = 0 AND run_at <= ? ORDER BY run_at, id LIMIT 1)
+            RETURNING id, name, payload, attempts
+            """,
+            (now + self.lease, now)
+        ).fetchone()
+        if row is None:
+            return None
+        job_id, name, payload, attempts = row
+        return job_id, name, json.loads(payload), attempts
+
+    def complete(self, job_id: int) -> None:
+        self._connection().execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def fail(self, job_id: int, attempts: int, error: str) -> None:
+        if attempts >= self.max_attempts:
+            self._connection().execute(
+                'UPDATE jobs SET failed = 1, last_error = ? WHERE id = ?', (error, job_id)
+            )
+        else:
+            self._connection().execute(
+                'UPDATE jobs SET run_at = ?, last_error = ? WHERE id = ?',
+                (time.time() + retry_delay(self.retry_delay, attempts), error, job_id)
+            )
+
+    def work(self, app: Flask, poll_interval: float = 1.0, burst: bool = False,
+             should_stop: Callable[[], bool] = lambda: False) -> int:
+        """Run due jobs until ``should_stop()``, or until none are due when ``burst``; returns jobs run."""
+        processed = 0
+        while not should_stop():
+            claimed = self.claim()
+            if claimed is None:
+                if burst:
+                    break
+                time.sleep(poll_interval)
+                continue
+            job_id, name, kwargs, attempts = claimed
+            try:
+                run_job(app, name, kwargs)
+            except Exception as err:
+                logger.warning('Job %s #%d failed (attempt %d of %d)', name, job_id, attempts,
+                               self.max_attempts, exc_info=True)
+                self.fail(job_id, attempts, f'{type(err).__name__}: {err}')
+            else:
+                self.complete(job_id)
+            processed += 1
+        return processed
+
+
+def enqueue_after_commit(name: str, **kwargs: Any) -> None:
+    """Queue a job once the current ``db.session`` transaction commits; a rollback discards it."""
+    from app.extensions import db
+
+    db.session.info.setdefault('pending_jobs', []).append((name, kwargs))
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _dispatch_pending(session: Session) -> None:
+    pending = session.info.pop('pending_jobs', None)
+    if not pending or not has_app_context():
+        return
+    app = current_app._get_current_object()
+    queue = get_job_queue()
+    for name, kwargs in pending:
+        if not queue.submit(name, kwargs):
+            # Backpressure: a full queue makes the request that produced the job run it
+            if not queue.inline:
+                logger.warning('Job queue full; running %s inline', name)
+            try:
+                run_job(app, name, kwargs)
+            except Exception:
+                logger.exception('Inline job %s failed', name)
+
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _discard_pending(session: Session, previous_transaction: Any) -> None:
+    if not session.in_transaction():
+        session.info.pop('pending_jobs', None)
+
+
+def init_job_queue(app: Flask) -> None:
+    options = {
+        'max_size': app.config['JOB_QUEUE_MAX_SIZE'],
+        'max_attempts': app.config['JOB_QUEUE_MAX_ATTEMPTS'],
+        'retry_delay': app.config['JOB_QUEUE_RETRY_DELAY'],
+    }
+    if app.config['JOB_QUEUE_BACKEND'] == 'sqlite':
+        queue: Union[JobQueue, SQLiteJobQueue] = SQLiteJobQueue(
+            app.config['JOB_QUEUE_DATABASE'], lease=app.config['JOB_QUEUE_LEASE_SECONDS'], **options
+        )
+    else:
+        queue = JobQueue(app, workers=app.config['JOB_QUEUE_WORKERS'], **options)
+    app.extensions['job_queue'] = queue
+
+
+def get_job_queue() -> Union[JobQueue, SQLiteJobQueue]:
+    return current_app.extensions['job_queue']
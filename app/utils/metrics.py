@@ -0,0 +1,123 @@
+import os
+import time
+
+from flask import Flask, Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from sqlalchemy import event
+
+from app.extensions import db
+
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR before the app is imported: every worker then
+# writes its samples to its own mmap-backed files there and a scrape aggregates them.
+# Gauges use the live* modes so series from dead workers drop out.
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled', ['endpoint', 'status']
+)
+LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time from request start to response', ['endpoint', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+POOL_CONNECTIONS = Gauge(
+    'db_pool_connections', 'Open DB-API connections held by the pool', multiprocess_mode='livesum'
+)
+POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out', 'Pool connections currently checked out', multiprocess_mode='livesum'
+)
+BCRYPT_IN_FLIGHT = Gauge(
+    'bcrypt_in_flight', 'Password hashes running or queued', multiprocess_mode='livesum'
+)
+BCRYPT_QUEUE_DEPTH = Gauge(
+    'bcrypt_queue_depth', 'Password hashes waiting for a bcrypt worker', multiprocess_mode='livesum'
+)
+RATE_LIMITED = Counter(
+    'rate_limited_total', 'Requests rejected with 429, by limit scope and bucket kind', ['scope', 'bucket']
+)
+CACHE_LOOKUPS = Counter(
+    'response_cache_lookups_total', 'Response cache lookups, by result (hit or miss)', ['result']
+)
+CACHE_EVICTIONS = Counter(
+    'response_cache_evictions_total', 'Response cache entries dropped by the entry or byte cap'
+)
+CACHE_INVALIDATIONS = Counter(
+    'response_cache_invalidations_total', 'Response cache entries dropped by tag invalidation'
+)
+CACHE_ENTRIES = Gauge(
+    'response_cache_entries', 'Responses held by the response cache', multiprocess_mode='livesum'
+)
+CACHE_BYTES = Gauge(
+    'response_cache_bytes', 'Bytes held by the response cache, compressed variants included',
+    multiprocess_mode='livesum'
+)
+
+# Label lookups take the metric's lock; resolve each (endpoint, status) child once and
+# reuse it so the hot path is a dict read plus the value's own increment
+_children: dict[tuple[str, str], tuple] = {}
+
+
+def _observe(endpoint: str, status: str, seconds: float) -> None:
+    key = (endpoint, status)
+    children = _children.get(key)
+    if children is None:
+        children = _children.setdefault(key, (REQUESTS.labels(*key), LATENCY.labels(*key)))
+    children[0].inc()
+    children[1].observe(seconds)
+
+
+def _start_timer() -> None:
+    g.metrics_started = time.perf_counter()
+
+
+def _record_request(response: Response) -> Response:
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        # Unmatched URLs share one label so scanners cannot blow up series cardinality
+        _observe(request.endpoint or 'unmatched', str(response.status_code), time.perf_counter() - started)
+    return response
+
+
+def _on_connect(dbapi_connection, connection_record) -> None:
+    POOL_CONNECTIONS.inc()
+
+
+def _on_close(dbapi_connection, connection_record) -> None:
+    POOL_CONNECTIONS.dec()
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(dbapi_connection, connection_record) -> None:
+    POOL_CHECKED_OUT.dec()
+
+
+def render_metrics() -> Response:
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Call from gunicorn's ``child_exit`` hook so a dead worker's live gauges are dropped."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app: Flask) -> None:
+    if not app.config['METRICS_ENABLED']:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine.pool, 'connect', _on_connect)
+            event.listen(engine.pool, 'close', _on_close)
+            event.listen(engine.pool, 'detach', _on_close)
+            event.listen(engine.pool, 'checkout', _on_checkout)
+            event.listen(engine.pool, 'checkin', _on_checkin)
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.add_url_rule('/metrics', 'metrics', render_metrics)
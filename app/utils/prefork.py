@@ -0,0 +1,41 @@
+import gc
+
+from flask import Flask
+from sqlalchemy.orm import configure_mappers
+
+from app.extensions import db
+from app.schemas import (
+    CommentCreateSchema, CommentSchema, PostCreateSchema, PostListSchema, PostSchema, PostUpdateSchema,
+    UserLoginSchema, UserRegistrationSchema, UserSchema
+)
+
+
+def warm_up(app: Flask) -> None:
+    """Do the lazy one-off work in a preforking master, so workers share it copy-on-write.
+
+    Must not open database connections: a connection inherited across fork is shared by
+    every worker.
+    """
+    configure_mappers()
+    for schema in (
+        UserSchema, UserRegistrationSchema, UserLoginSchema,
+        PostSchema, PostListSchema, PostCreateSchema, PostUpdateSchema,
+        CommentSchema, CommentCreateSchema,
+    ):
+        schema()
+        schema(many=True)
+    for template in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template)
+    app.url_map.bind('localhost').match('/api/posts', method='GET')  # compiles the URL matcher
+    # Move everything allocated so far out of the collector's generations; otherwise each
+    # worker's first full collection touches (and so copies) every preloaded page
+    gc.freeze()
+
+
+def reset_after_fork(app: Flask) -> None:
+    """Drop per-process state a forked worker must not share with its parent or siblings."""
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False: leave the parent's connections alone, just stop using them here
+            engine.dispose(close=False)
+    app.extensions['password_hasher'].reset()
@@ -0,0 +1,170 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Optional, Union
+
+from flask import Flask, current_app, jsonify, request, session
+
+from app.utils.metrics import RATE_LIMITED
+from app.utils.replica import request_identity
+
+
+class MemoryBuckets:
+    """Token buckets for this process only; each gunicorn worker gets its own allowance."""
+
+    def __init__(self, max_entries: int = 100000) -> None:
+        self.max_entries = max_entries
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets: dict[str, tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        """Take one token; returns 0 if granted, else seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_entries:
+                    self._prune(now)
+                tokens = float(capacity)
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            return wait
+
+    def _prune(self, now: float) -> None:
+        # A bucket that has refilled is indistinguishable from a missing one
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+
+class SQLiteBuckets:
+    """Token buckets shared by every process that opens the same file.
+
+    Refill and take happen in one UPSERT, so concurrent workers cannot both spend the last
+    token. Point ``RATE_LIMIT_DATABASE`` at tmpfs (``/dev/shm/...``) to keep it in memory.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS buckets (
+            key TEXT PRIMARY KEY,
+            tokens REAL NOT NULL,
+            updated REAL NOT NULL,
+            granted INTEGER NOT NULL
+        ) WITHOUT ROWID
+    """
+
+    # SET expressions all see the row as it was before the update
+    TAKE = """
+        INSERT INTO buckets (key, tokens, updated, granted) VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = min(:capacity, tokens + (:now - updated) * :rate)
+                     - (min(:capacity, tokens + (:now - updated) * :rate) >= 1),
+            granted = min(:capacity, tokens + (:now - updated) * :rate) >= 1,
+            updated = :now
+        RETURNING granted, tokens
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # losing recent buckets in a crash is harmless
+            conn.execute(self.SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        granted, tokens = self._connection().execute(
+            self.TAKE, {'key': key, 'capacity': capacity, 'rate': rate, 'now': time.time()}
+        ).fetchone()
+        return 0.0 if granted else (1 - tokens) / rate
+
+
+def _client_ip() -> Optional[str]:
+    return request.remote_addr
+
+
+def _login_username() -> Optional[str]:
+    # get_json caches the parsed body, so validate_json does not parse it twice
+    data = request.get_json(silent=True) if request.is_json else request.form
+    username = data.get('username') if isinstance(data, dict) else None
+    return username.lower() if isinstance(username, str) else None
+
+
+def _user_identity() -> Optional[str]:
+    # API clients send a JWT; the HTML pages keep the user id in the signed session cookie
+    identity = request_identity()
+    if identity is None and 'user' in session:
+        identity = str(session['user'])
+    return identity
+
+
+# Bucket kind -> function returning the key for this request, or None to skip that bucket
+KEY_FUNCTIONS: dict[str, Callable[[], Optional[str]]] = {
+    'ip': _client_ip,
+    'username': _login_username,
+    'user': _user_identity,
+}
+
+
+def take_tokens(buckets: Union[MemoryBuckets, SQLiteBuckets], scope: str,
+                keys: dict[str, Optional[str]], limits: dict[str, tuple[int, float]]) -> float:
+    """Take one token per applicable bucket of ``scope``; 0 if all were granted, else the wait."""
+    for kind, (capacity, period) in limits.items():
+        key = keys.get(kind)
+        if key is None:
+            continue
+        wait = buckets.take(f'{scope}:{kind}:{key}', capacity, capacity / period)
+        if wait:
+            RATE_LIMITED.labels(scope, kind).inc()
+            return wait
+    return 0.0
+
+
+def rate_limit(scope: str) -> Callable:
+    """Reject over-limit requests with 429 before anything below this decorator runs.
+
+    Limits come from ``RATE_LIMITS[scope]``: bucket kind -> (burst, seconds to refill it).
+    Put it above ``auth_required`` and ``validate_json`` so rejections cost no DB or bcrypt work.
+    GET and HEAD pass untouched, so form pages that also render on GET are only limited on submit.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not current_app.config['RATE_LIMIT_ENABLED'] or request.method in ('GET', 'HEAD'):
+                return func(*args, **kwargs)
+            limits = current_app.config['RATE_LIMITS'].get(scope, {})
+            keys = {kind: KEY_FUNCTIONS[kind]() for kind in limits}
+            wait = take_tokens(get_rate_limiter(), scope, keys, limits)
+            if wait:
+                retry_after = math.ceil(wait)
+                response = jsonify({'error': 'Too many requests', 'retry_after': retry_after})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def create_buckets(backend: str, database: str) -> Union[MemoryBuckets, SQLiteBuckets]:
+    return SQLiteBuckets(database) if backend == 'sqlite' else MemoryBuckets()
+
+
+def init_rate_limiter(app: Flask) -> None:
+    app.extensions['rate_limiter'] = create_buckets(app.config['RATE_LIMIT_BACKEND'], app.config['RATE_LIMIT_DATABASE'])
+
+
+def get_rate_limiter() -> Union[MemoryBuckets, SQLiteBuckets]:
+    return current_app.extensions['rate_limiter']
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Union
+
+from flask import Flask, current_app, g, has_request_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the ``replica`` bind while a ``use_replica`` view runs.
+
+    Everything else stays on the primary: flushes, DML, requests that are not marked,
+    and any read that follows a write in the same request, so a handler always
+    reads its own writes.
+    """
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any) -> Any:
+        if (
+            bind is None
+            and not self._flushing
+            and getattr(clause, 'is_select', False)
+            and has_request_context()
+            and g.get('use_replica')
+            and not g.get('db_wrote')
+        ):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _mark_write() -> None:
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session: Session, flush_context: Any) -> None:
+    _mark_write()
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _on_execute(state: ORMExecuteState) -> None:
+    # Bulk insert/update/delete through session.execute() never flushes
+    if not state.is_select:
+        _mark_write()
+
+
+class RecentWriters:
+    """Per-process record of who wrote recently, so their next reads skip the lagging replica.
+
+    Only right for a single process: under several workers a user's follow-up request may
+    land on one that did not see the write. Use ``SQLiteRecentWriters`` there.
+    """
+
+    def __init__(self, window: float, max_entries: int = 10000) -> None:
+        self.window = window
+        self.max_entries = max_entries
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, identity: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_entries:
+                self._until = {key: until for key, until in self._until.items() if until > now}
+            self._until[identity] = now + self.window
+
+    def is_recent(self, identity: str) -> bool:
+        until = self._until.get(identity)
+        return until is not None and until > time.monotonic()
+
+
+class SQLiteRecentWriters:
+    """Recent writers shared by every process that opens the same file.
+
+    A write recorded by one gunicorn worker keeps the user on the primary in all of them.
+    Point ``REPLICA_WRITERS_DATABASE`` at tmpfs (``/dev/shm/...``) to keep it in memory.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS writers (
+            identity TEXT PRIMARY KEY,
+            until REAL NOT NULL
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, path: str, window: float, prune_every: int = 1000) -> None:
+        self.path = path
+        self.window = window
+        self.prune_every = prune_every
+        self._records = 0
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')  # a lost entry only sends a few reads to the replica
+            conn.execute(self.SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def record(self, identity: str) -> None:
+        # Wall-clock time: monotonic clocks are not comparable across processes
+        now = time.time()
+        conn = self._connection()
+        conn.execute(
+            'INSERT INTO writers (identity, until) VALUES (?, ?) '
+            'ON CONFLICT (identity) DO UPDATE SET until = excluded.until',
+            (identity, now + self.window)
+        )
+        self._records += 1
+        if self._records % self.prune_every == 0:
+            conn.execute('DELETE FROM writers WHERE until <= ?', (now,))
+
+    def is_recent(self, identity: str) -> bool:
+        row = self._connection().execute('SELECT until FROM writers WHERE identity = ?', (identity,)).fetchone()
+        return row is not None and row[0] > time.time()
+
+
+def request_identity() -> Optional[str]:
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None
+    return str(identity) if identity is not None else None
+
+
+def _reset_routing() -> None:
+    g.use_replica = False
+    g.db_wrote = False
+
+
+def _remember_writer(response: Any) -> Any:
+    if g.get('db_wrote') and response.status_code < 400:
+        identity = request_identity()
+        if identity is not None:
+            get_recent_writers().record(identity)
+    return response
+
+
+def init_replica(app: Flask) -> None:
+    if REPLICA_BIND not in (app.config.get('SQLALCHEMY_BINDS') or {}):
+        return
+    window = app.config['REPLICA_STALENESS_SECONDS']
+    if app.config['REPLICA_WRITERS_BACKEND'] == 'sqlite':
+        app.extensions['recent_writers'] = SQLiteRecentWriters(app.config['REPLICA_WRITERS_DATABASE'], window)
+    else:
+        app.extensions['recent_writers'] = RecentWriters(window)
+    app.before_request(_reset_routing)
+    app.after_request(_remember_writer)
+
+
+def get_recent_writers() -> Union[RecentWriters, SQLiteRecentWriters]:
+    return current_app.extensions['recent_writers']
+
+
+def replica_enabled() -> bool:
+    return 'recent_writers' in current_app.extensions
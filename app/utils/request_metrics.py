@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from flask.json.provider import DefaultJSONProvider
+from marshmallow import Schema
+from sqlalchemy import event
+
+from app.extensions import db
+
+logger = logging.getLogger('app.requests')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    """SQL and serialization timings accumulated over one request."""
+
+    __slots__ = ('started', 'db_queries', 'amortized_queries', 'db_time', 'serialize_time', 'serialize_depth')
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.amortized_queries = 0  # periodic refreshes run on behalf of all requests; no budget
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serialize_depth = 0
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return g.get('request_metrics') if has_app_context() else None
+
+
+@contextmanager
+def serialize_timer() -> Iterator[None]:
+    """Count the wrapped block towards ``serialize``, minus any queries it triggers (lazy loads)."""
+    metrics = current_metrics()
+    if metrics is None or metrics.serialize_depth:
+        yield
+        return
+    metrics.serialize_depth += 1
+    started, db_time = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.serialize_depth -= 1
+        metrics.serialize_time += time.perf_counter() - started - (metrics.db_time - db_time)
+
+
+class TimedSchemaMixin(Schema):
+    """Put before the marshmallow base class so ``dump`` shows up as ``serialize`` in Server-Timing."""
+
+    def dump(self, obj: Any, *, many: Optional[bool] = None) -> Any:
+        with serialize_timer():
+            return super().dump(obj, many=many)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        with serialize_timer():
+            return super().dumps(obj, **kwargs)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info['query_started'] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.db_queries += 1
+        if context is not None and context.execution_options.get('amortized'):
+            metrics.amortized_queries += 1
+        metrics.db_time += time.perf_counter() - conn.info['query_started']
+
+
+def _start_request() -> None:
+    g.request_metrics = RequestMetrics()
+
+
+def _finish_request(response: Response) -> Response:
+    metrics = current_metrics()
+    if metrics is None:
+        return response
+    total = time.perf_counter() - metrics.started
+    queries = f'{metrics.db_queries} queries'
+    if metrics.amortized_queries:
+        queries += f', {metrics.amortized_queries} amortized'
+    response.headers['Server-Timing'] = (
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{queries}", '
+        f'serialize;dur={metrics.serialize_time * 1000:.2f}, '
+        f'total;dur={total * 1000:.2f}'
+    )
+    logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+        'db_queries': metrics.db_queries,
+        'amortized_queries': metrics.amortized_queries,
+        'db_ms': round(metrics.db_time * 1000, 2),
+        'serialize_ms': round(metrics.serialize_time * 1000, 2),
+        'total_ms': round(total * 1000, 2)
+    }))
+    _check_query_budget(metrics.db_queries - metrics.amortized_queries)
+    return response
+
+
+def _check_query_budget(queries: int) -> None:
+    budget = current_app.config['SQL_QUERY_BUDGETS'].get(
+        request.endpoint, current_app.config['SQL_QUERY_BUDGET_DEFAULT']
+    )
+    if budget is None or queries <= budget:
+        return
+    message = f'{request.endpoint} ran {queries} queries, budget is {budget}'
+    if current_app.config['SQL_QUERY_BUDGET_STRICT']:
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+def init_request_metrics(app: Flask) -> None:
+    """Count statements and DB time per request on every engine and report them per response.
+
+    Must run after ``db.init_app``. Queries issued while a streamed body is being
+    generated happen after the headers are sent and are not reported.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    app.json = TimedJSONProvider(app)  # type: ignore[arg-type]  # Flask 3.0 annotates the sansio App
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,55 @@
+from typing import Any
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.extensions import db
+
+# Config key -> PRAGMA it drives; a key set to None leaves SQLite's own default
+_PRAGMAS = (
+    ('SQLITE_JOURNAL_MODE', 'journal_mode'),
+    ('SQLITE_SYNCHRONOUS', 'synchronous'),
+    ('SQLITE_BUSY_TIMEOUT_MS', 'busy_timeout'),
+    ('SQLITE_MMAP_SIZE', 'mmap_size'),
+    ('SQLITE_CACHE_SIZE', 'cache_size'),
+    ('SQLITE_FOREIGN_KEYS', 'foreign_keys'),
+)
+
+
+def _pragma_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'ON' if value else 'OFF'
+    return str(value)
+
+
+def sqlite_pragmas(config: dict) -> list[str]:
+    return [
+        f'PRAGMA {pragma}={_pragma_value(config[key])}'
+        for key, pragma in _PRAGMAS
+        if config.get(key) is not None
+    ]
+
+
+def _apply_on_connect(engine: Engine, statements: list[str]) -> None:
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        # Runs once per new DB-API connection, before the pool hands it out and
+        # outside any transaction (foreign_keys is a no-op inside one)
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def init_sqlite_pragmas(app: Flask) -> None:
+    """Apply the ``SQLITE_*`` tuning keys to every SQLite engine, primary and binds alike."""
+    statements = sqlite_pragmas(app.config)
+    if not statements:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                _apply_on_connect(engine, statements)
@@ -0,0 +1,93 @@
+"""Gunicorn sync workers versus the ASGI variant under uvicorn, at high client concurrency.
+
+    python -m benchmarks.asgi_vs_wsgi                       # 4 workers, 64 client threads, 10s per server
+    python -m benchmarks.asgi_vs_wsgi --workers 2 --threads 256 --duration 30
+
+Both servers get their own copy of one seeded database (tuned SQLite profile) and face the
+same read/write mix as ``benchmarks.concurrency``; client threads far outnumber sync
+workers, so the sync server queues requests that the event loop can interleave.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Optional
+
+from starlette.applications import Starlette
+
+from app.asgi import create_asgi_app
+from config import Config, config
+from .concurrency import PROFILES, _free_port, _wait_for, drive, seed_file
+
+
+def make_asgi_app() -> Starlette:
+    """Uvicorn entry point; the database comes from the environment like ``concurrency.make_app``."""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.environ['BENCH_DATABASE']}",
+        'BCRYPT_LOG_ROUNDS': 4,
+        'RATE_LIMIT_ENABLED': False,
+        **PROFILES[os.environ['BENCH_PROFILE']],
+    }
+    config['benchmark'] = type('BenchmarkConfig', (Config,), settings)
+    return create_asgi_app('benchmark')
+
+
+SERVERS = {
+    'gunicorn': lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', '--workers', str(workers), '--bind', f'127.0.0.1:{port}',
+        '--log-level', 'warning', 'benchmarks.concurrency:make_app()'
+    ],
+    'uvicorn': lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', '--factory', '--workers', str(workers), '--port', str(port),
+        '--log-level', 'warning', '--no-access-log', 'benchmarks.asgi_vs_wsgi:make_asgi_app'
+    ],
+}
+
+
+def run_server(name: str, seeded: str, args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f'blog-{name}-')
+    database = os.path.join(workdir, 'bench.db')
+    shutil.copy(seeded, database)
+    port = _free_port()
+    env = {**os.environ, 'BENCH_DATABASE': database, 'BENCH_PROFILE': 'tuned'}
+    server = subprocess.Popen(SERVERS[name](port, args.workers), env=env, stdout=subprocess.DEVNULL)
+    try:
+        _wait_for(port)
+        return drive(port, args)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--posts', type=int, default=20_000)
+    parser.add_argument('--comments', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--servers', nargs='*', default=list(SERVERS), choices=list(SERVERS))
+    args = parser.parse_args(argv)
+
+    seeded = os.path.join(tempfile.mkdtemp(prefix='blog-asgi-'), 'seed.db')
+    seed_file(seeded, args)
+
+    print(f'{args.workers} workers each, {args.threads} client threads, {args.duration:.0f}s, '
+          f'{args.write_ratio:.0%} writes')
+    print(f"{'server':<10}{'reads/s':>10}{'read p95':>12}{'read 5xx':>10}{'writes/s':>10}{'write p95':>12}{'write 5xx':>11}")
+    for name in args.servers:
+        result = run_server(name, seeded, args)
+        read, write = result['read'], result['write']
+        print(f"{name:<10}{read['per_second']:>10}{read['p95_ms']:>10}ms{read['errors_5xx']:>10}"
+              f"{write['per_second']:>10}{write['p95_ms']:>10}ms{write['errors_5xx']:>11}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
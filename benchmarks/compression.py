@@ -0,0 +1,85 @@
+"""CPU cost against bytes saved for each gzip level and brotli quality.
+
+    python -m benchmarks.compression                 # seeds a small temp database
+    python -m benchmarks.compression --database /tmp/bench.db
+
+Renders real responses (post lists, a post with its full content, a comment thread)
+through ``app.test_client()`` and compresses each body at every level. The seeded
+post and comment bodies repeat, so ratios are somewhat better than on real content;
+the relative cost of the levels is what to compare. Brotli rows appear only when
+the optional ``brotli`` package is installed.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Post
+from app.utils.compression import brotli, compress
+from .run import build_app, prepare_data
+
+GZIP_LEVELS = (1, 3, 4, 5, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 9, 11)
+
+
+def render_bodies(args: argparse.Namespace) -> dict[str, bytes]:
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='blog-bench-'), 'bench.db')
+    app = build_app(database)
+    with app.app_context():
+        prepare_data(args)
+        post_id = db.session.scalar(
+            select(Post.id).where(Post.is_published.is_(True)).order_by(Post.comment_count.desc()).limit(1)
+        )
+        client = app.test_client()
+        paths = {
+            'posts list (10)': '/api/posts',
+            'posts list (50)': '/api/posts?per_page=50',
+            'post detail': f'/api/posts/{post_id}',
+            'comment thread (100)': f'/api/comments/posts/{post_id}?per_page=100',
+        }
+        return {name: client.get(path).get_data() for name, path in paths.items()}
+
+
+def time_compression(body: bytes, encoding: str, level: int, repeat: int) -> tuple[float, int]:
+    settings = {'COMPRESSION_GZIP_LEVEL': level, 'COMPRESSION_BROTLI_QUALITY': level}
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        data = compress(body, encoding, settings)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(data)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--posts', type=int, default=2_000)
+    parser.add_argument('--comments', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', help='SQLite file to seed or reuse (default: a fresh temp file)')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    bodies = render_bodies(args)
+
+    levels = [('gzip', level) for level in GZIP_LEVELS]
+    if brotli is not None:
+        levels += [('br', quality) for quality in BROTLI_QUALITIES]
+    for name, body in bodies.items():
+        print(f'{name}: {len(body):,} bytes')
+        for encoding, level in levels:
+            seconds, size = time_compression(body, encoding, level, args.repeat)
+            saved = len(body) - size
+            print(f'  {encoding:<5}{level:>3}  {size:>9,} bytes  {size / len(body):>6.1%}  '
+                  f'{seconds * 1e6:>9.0f}us  {saved / 1024 / seconds / 1024 if seconds else 0:>8.1f} MB saved/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Concurrent read/write throughput against gunicorn for each SQLite tuning profile.
+
+    python -m benchmarks.concurrency                      # 4 workers, 16 client threads, 10s per profile
+    python -m benchmarks.concurrency --workers 8 --threads 32 --duration 30 --write-ratio 0.3
+
+Each profile gets its own copy of one seeded database and its own gunicorn; the client
+mixes thread reads (``GET /api/comments/posts/<id>?before=``, ``GET /api/posts/<id>``)
+with comment writes (``POST /api/comments``) and reports throughput, p95 and 5xx counts.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Optional
+
+from flask import Flask
+
+from app import create_app, db
+from app.commands import recount_comments
+from app.seeding import DEFAULT_PASSWORD, seed_database
+from config import Config, config
+
+PROFILES: dict[str, dict[str, Any]] = {
+    'tuned': {},  # the Config defaults
+    'default': {
+        'SQLITE_JOURNAL_MODE': 'DELETE',
+        'SQLITE_SYNCHRONOUS': 'FULL',
+        'SQLITE_BUSY_TIMEOUT_MS': None,
+        'SQLITE_MMAP_SIZE': None,
+        'SQLITE_CACHE_SIZE': None,
+        'SQLITE_FOREIGN_KEYS': None,
+    },
+}
+
+
+def make_app() -> Flask:
+    """Gunicorn entry point; the database and profile come from the environment."""
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.environ['BENCH_DATABASE']}",
+        'SQLALCHEMY_ECHO': False,
+        'RESPONSE_CACHE_ENABLED': False,
+        'RATE_LIMIT_ENABLED': False,
+        'BCRYPT_LOG_ROUNDS': 4,
+        **PROFILES[os.environ['BENCH_PROFILE']],
+    }
+    config['benchmark'] = type('BenchmarkConfig', (Config,), settings)
+    return create_app('benchmark')
+
+
+def seed_file(path: str, args: argparse.Namespace) -> None:
+    os.environ['BENCH_DATABASE'], os.environ['BENCH_PROFILE'] = path, 'default'
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        seed_database(db.session.connection(), args.users, args.posts, args.comments, seed=args.seed)
+        recount_comments()
+        db.session.commit()
+        db.engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('gunicorn did not start')
+
+
+def _request(conn: http.client.HTTPConnection, method: str, path: str,
+             body: Optional[dict] = None, headers: Optional[dict] = None) -> tuple[int, bytes]:
+    payload = json.dumps(body) if body is not None else None
+    conn.request(method, path, body=payload, headers={'Content-Type': 'application/json', **(headers or {})})
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def drive(port: int, args: argparse.Namespace) -> dict:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    status, body = _request(conn, 'POST', '/api/auth/login', {'username': 'user1', 'password': DEFAULT_PASSWORD})
+    if status != 200:
+        raise RuntimeError(f'login failed: {status} {body[:200]!r}')
+    headers = {'Authorization': f"Bearer {json.loads(body)['access_token']}"}
+
+    samples: dict[str, list[float]] = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def client(index: int) -> None:
+        rng = random.Random(args.seed + index)
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local: dict[str, list[float]] = {'read': [], 'write': []}
+        failed = {'read': 0, 'write': 0}
+        while time.monotonic() < deadline:
+            post_id = rng.randint(1, args.posts)
+            request: tuple[str, str, Optional[dict], Optional[dict]]
+            if rng.random() < args.write_ratio:
+                kind, request = 'write', ('POST', '/api/comments', {
+                    'name': 'Load', 'content': 'Concurrent comment', 'post_id': post_id
+                }, headers)
+            elif rng.random() < 0.5:
+                kind, request = 'read', ('GET', f'/api/comments/posts/{post_id}?before=&per_page=20', None, None)
+            else:
+                kind, request = 'read', ('GET', f'/api/posts/{post_id}', None, None)
+            started = time.perf_counter()
+            status, _ = _request(conn, *request)
+            local[kind].append(time.perf_counter() - started)
+            if status >= 500:
+                failed[kind] += 1
+        with lock:
+            for kind in samples:
+                samples[kind] += local[kind]
+                errors[kind] += failed[kind]
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = {}
+    for kind, durations in samples.items():
+        report[kind] = {
+            'per_second': round(len(durations) / args.duration, 1),
+            'p95_ms': round(statistics.quantiles(durations, n=100)[94] * 1000, 2) if len(durations) > 1 else None,
+            'errors_5xx': errors[kind],
+        }
+    return report
+
+
+def run_profile(profile: str, seeded: str, args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f'blog-concurrency-{profile}-')
+    database = os.path.join(workdir, 'bench.db')
+    shutil.copy(seeded, database)
+    port = _free_port()
+    env = {**os.environ, 'BENCH_DATABASE': database, 'BENCH_PROFILE': profile}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--workers', str(args.workers), '--bind', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'benchmarks.concurrency:make_app()'],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        _wait_for(port)
+        return drive(port, args)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--posts', type=int, default=20_000)
+    parser.add_argument('--comments', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per profile')
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--profiles', nargs='*', default=list(PROFILES), choices=list(PROFILES))
+    args = parser.parse_args(argv)
+
+    seeded = os.path.join(tempfile.mkdtemp(prefix='blog-concurrency-'), 'seed.db')
+    seed_file(seeded, args)
+
+    print(f'{args.workers} gunicorn workers, {args.threads} client threads, {args.duration:.0f}s, '
+          f'{args.write_ratio:.0%} writes')
+    print(f"{'profile':<10}{'reads/s':>10}{'read p95':>12}{'read 5xx':>10}{'writes/s':>10}{'write p95':>12}{'write 5xx':>11}")
+    for profile in args.profiles:
+        result = run_profile(profile, seeded, args)
+        read, write = result['read'], result['write']
+        print(f"{profile:<10}{read['per_second']:>10}{read['p95_ms']:>10}ms{read['errors_5xx']:>10}"
+              f"{write['per_second']:>10}{write['p95_ms']:>10}ms{write['errors_5xx']:>11}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Worker memory and time-to-first-request with and without ``preload_app``.
+
+    python -m benchmarks.prefork                   # 4 workers, 200 warm-up requests
+    python -m benchmarks.prefork --workers 8
+
+Starts ``gunicorn`` (so ``gunicorn.conf.py`` and ``run:app``) once per mode against a small
+seeded database. Time-to-first-request runs from spawning the master to the first 200 from
+``GET /api/posts``. Memory is read from ``/proc/<pid>/smaps_rollup`` after the warm-up
+requests. RSS counts shared pages in full for every worker; PSS splits them between the
+processes sharing them, and private pages are what each extra worker really costs. Linux only.
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from .concurrency import _free_port, seed_file
+
+MODES = {'preload': '1', 'no-preload': '0'}
+
+
+def _smaps(pid: int) -> dict[str, int]:
+    """kB figures from smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return values
+
+
+def _children(pid: int) -> list[int]:
+    with open(f'/proc/{pid}/task/{pid}/children') as children:
+        return [int(child) for child in children.read().split()]
+
+
+def _get(port: int, path: str) -> Optional[int]:
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    except OSError:
+        return None
+
+
+def run_mode(mode: str, database: str, args: argparse.Namespace) -> dict:
+    port = _free_port()
+    env = {
+        **os.environ,
+        'FLASK_CONFIG': 'production',
+        'SECRET_KEY': os.environ.get('SECRET_KEY') or 'benchmark',
+        'JWT_SECRET_KEY': os.environ.get('JWT_SECRET_KEY') or 'benchmark',
+        'DATABASE_URL': f'sqlite:///{database}',
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(args.workers),
+        'GUNICORN_PRELOAD': MODES[mode],
+    }
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '--log-level', 'warning'],
+                              env=env, stdout=subprocess.DEVNULL)
+    try:
+        while _get(port, '/api/posts') != 200:
+            if server.poll() is not None or time.perf_counter() - started > 60:
+                raise RuntimeError(f'gunicorn ({mode}) did not serve a request')
+            time.sleep(0.01)
+        first_request = time.perf_counter() - started
+
+        # Let every worker finish booting, then route traffic through all of them
+        time.sleep(args.settle)
+        for _ in range(args.requests):
+            _get(port, '/api/posts')
+
+        workers = [_smaps(pid) for pid in _children(server.pid)]
+        return {
+            'first_request_ms': first_request * 1000,
+            'workers': len(workers),
+            'master_rss_mb': _smaps(server.pid)['Rss'] / 1024,
+            'worker_rss_mb': sum(w['Rss'] for w in workers) / len(workers) / 1024,
+            'worker_pss_mb': sum(w['Pss'] for w in workers) / len(workers) / 1024,
+            'worker_private_mb': sum(w['Private_Clean'] + w['Private_Dirty'] for w in workers) / len(workers) / 1024,
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Warm-up requests before sampling memory')
+    parser.add_argument('--settle', type=float, default=3.0, help='Seconds to wait for the remaining workers')
+    parser.add_argument('--modes', nargs='*', default=list(MODES), choices=list(MODES))
+    args = parser.parse_args(argv)
+
+    database = os.path.join(tempfile.mkdtemp(prefix='blog-prefork-'), 'bench.db')
+    args.users, args.posts, args.comments, args.seed = 100, 1_000, 5_000, 0
+    seed_file(database, args)
+
+    print(f'{args.workers} workers, {args.requests} warm-up requests')
+    print(f"{'mode':<12}{'first req':>11}{'master RSS':>12}{'worker RSS':>12}{'worker PSS':>12}{'private':>10}")
+    for mode in args.modes:
+        result = run_mode(mode, database, args)
+        print(f"{mode:<12}{result['first_request_ms']:>9.0f}ms{result['master_rss_mb']:>10.1f}MB"
+              f"{result['worker_rss_mb']:>10.1f}MB{result['worker_pss_mb']:>10.1f}MB"
+              f"{result['worker_private_mb']:>8.1f}MB")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,284 @@
+"""Time every API route against a seeded database and compare with a stored baseline.
+
+    python -m benchmarks.run                                   # small default volumes
+    python -m benchmarks.run --users 10000 --posts 1000000 --comments 5000000
+    python -m benchmarks.run --update-baseline                 # accept the current numbers
+
+Exits with status 1 when a route's p95 grows by more than ``--threshold`` over the
+baseline or it issues more SQL statements than it did in the baseline.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+from flask import Flask
+from flask.testing import FlaskClient
+from sqlalchemy import func, select
+
+from app import create_app, db
+from app.commands import recount_comments
+from app.models import Comment, Post
+from app.seeding import DEFAULT_PASSWORD as PASSWORD, seed_database
+from config import Config, config
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+_QUERIES = re.compile(r'desc="(\d+) queries(?:, (\d+) amortized)?"')
+
+
+@dataclass
+class Context:
+    client: FlaskClient
+    rng: random.Random
+    users: int
+    published: list[int]
+    max_comment_id: int
+    headers: dict = field(default_factory=dict)
+    own_posts: list[int] = field(default_factory=list)
+    own_comments: list[int] = field(default_factory=list)
+    registered: int = 0
+
+    def post_id(self) -> int:
+        return self.rng.choice(self.published)
+
+    def comment_id(self) -> int:
+        return self.rng.randint(1, self.max_comment_id)
+
+
+@dataclass
+class Route:
+    name: str
+    method: str
+    # Builds the kwargs for ``client.open`` outside the timed section
+    prepare: Callable[[Context], dict]
+    iterations: Optional[int] = None
+
+
+def _new_post(ctx: Context) -> int:
+    response = ctx.client.post('/api/posts', json={'title': 'Benchmark post', 'content': 'Body'},
+                               headers=ctx.headers)
+    return response.json['post']['id']
+
+
+def _new_comment(ctx: Context) -> int:
+    response = ctx.client.post('/api/comments', json={
+        'name': 'Bench', 'content': 'Comment body', 'post_id': ctx.own_posts[0]
+    }, headers=ctx.headers)
+    return response.json['comment']['id']
+
+
+def _register(ctx: Context) -> dict:
+    ctx.registered += 1
+    username = f'bench{ctx.registered}'
+    return {'path': '/api/auth/register', 'json': {
+        'username': username, 'email': f'{username}@example.com',
+        'password': PASSWORD, 'confirm_password': PASSWORD
+    }}
+
+
+ROUTES = [
+    Route('posts.get_posts', 'GET', lambda ctx: {'path': '/api/posts?per_page=20'}),
+    Route('posts.get_posts deep page', 'GET', lambda ctx: {'path': '/api/posts?page=500&per_page=20'}),
+    Route('posts.get_posts cursor', 'GET', lambda ctx: {'path': '/api/posts?cursor=&per_page=20'}),
+    Route('posts.search_posts', 'GET',
+          lambda ctx: {'path': f'/api/posts/search?q={ctx.rng.choice(["flask cache", "tomato", "river win"])}'}),
+    Route('posts.get_post', 'GET', lambda ctx: {'path': f'/api/posts/{ctx.post_id()}'}),
+    Route('posts.create_post', 'POST', lambda ctx: {
+        'path': '/api/posts', 'json': {'title': 'Benchmark post', 'content': 'Body'}, 'headers': ctx.headers
+    }),
+    Route('posts.create_posts_batch', 'POST', lambda ctx: {
+        'path': '/api/posts/batch', 'headers': ctx.headers,
+        'json': {'posts': [{'title': f'Batch post {i}', 'content': 'Body'} for i in range(20)]}
+    }),
+    Route('posts.update_post', 'PUT', lambda ctx: {
+        'path': f'/api/posts/{ctx.rng.choice(ctx.own_posts)}', 'json': {'content': 'Edited'},
+        'headers': ctx.headers
+    }),
+    Route('posts.delete_post', 'DELETE', lambda ctx: {
+        'path': f'/api/posts/{_new_post(ctx)}', 'headers': ctx.headers
+    }),
+    Route('comments.get_post_comments', 'GET',
+          lambda ctx: {'path': f'/api/comments/posts/{ctx.post_id()}?per_page=20'}),
+    Route('comments.get_post_comments before', 'GET',
+          lambda ctx: {'path': f'/api/comments/posts/{ctx.post_id()}?before=&per_page=20'}),
+    Route('comments.get_comment', 'GET', lambda ctx: {'path': f'/api/comments/{ctx.comment_id()}'}),
+    Route('comments.create_comment', 'POST', lambda ctx: {
+        'path': '/api/comments', 'headers': ctx.headers,
+        'json': {'name': 'Bench', 'content': 'Comment body', 'post_id': ctx.rng.choice(ctx.own_posts)}
+    }),
+    Route('comments.update_comment', 'PUT', lambda ctx: {
+        'path': f'/api/comments/{ctx.rng.choice(ctx.own_comments)}', 'json': {'content': 'Edited'},
+        'headers': ctx.headers
+    }),
+    Route('comments.delete_comment', 'DELETE', lambda ctx: {
+        'path': f'/api/comments/{_new_comment(ctx)}', 'headers': ctx.headers
+    }),
+    Route('export.export_posts', 'GET',
+          lambda ctx: {'path': '/api/export/posts.ndjson?since=2100-01-01T00:00:00'}),
+    Route('auth.login', 'POST', lambda ctx: {
+        'path': '/api/auth/login',
+        'json': {'username': f'user{ctx.rng.randint(1, ctx.users)}', 'password': PASSWORD}
+    }, iterations=20),
+    Route('auth.register', 'POST', _register, iterations=20),
+    Route('auth.get_current_user', 'GET', lambda ctx: {'path': '/api/auth/me', 'headers': ctx.headers}),
+]
+
+
+def _percentile(quantiles: list[float], p: int) -> float:
+    return round(quantiles[p - 1] * 1000, 3)
+
+
+def time_route(ctx: Context, route: Route, iterations: int, warmup: int) -> dict:
+    durations = []
+    queries = []
+    statuses = set()
+    for i in range(warmup + (route.iterations or iterations)):
+        kwargs = route.prepare(ctx)
+        started = time.perf_counter()
+        response = ctx.client.open(method=route.method, **kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        if i < warmup:
+            continue
+        durations.append(elapsed)
+        statuses.add(response.status_code)
+        match = _QUERIES.search(response.headers.get('Server-Timing', ''))
+        # Periodic refreshes done on behalf of every request are not this route's cost
+        queries.append(int(match.group(1)) - int(match.group(2) or 0) if match else 0)
+    quantiles = statistics.quantiles(durations, n=100, method='inclusive')
+    return {
+        'p50_ms': _percentile(quantiles, 50),
+        'p95_ms': _percentile(quantiles, 95),
+        'p99_ms': _percentile(quantiles, 99),
+        'queries': max(queries),
+        'statuses': sorted(statuses)
+    }
+
+
+def build_app(database: str) -> Flask:
+    config['benchmark'] = type('BenchmarkConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'SQLALCHEMY_ECHO': False,
+        # Measure the handlers themselves, not response-cache hits
+        'RESPONSE_CACHE_ENABLED': False,
+        'RATE_LIMIT_ENABLED': False,
+        'SQL_QUERY_BUDGET_STRICT': False,
+    })
+    return create_app('benchmark')
+
+
+def prepare_data(args: argparse.Namespace) -> None:
+    db.create_all()
+    if db.session.scalar(select(func.count(Post.id))):
+        print('Reusing seeded database', file=sys.stderr)
+        return
+    started = time.perf_counter()
+    seed_database(db.session.connection(), args.users, args.posts, args.comments, seed=args.seed)
+    recount_comments()
+    db.session.commit()
+    print(f'Seeded {args.users} users, {args.posts} posts, {args.comments} comments '
+          f'in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+
+def run(args: argparse.Namespace) -> dict:
+    database = args.database or os.path.join(tempfile.mkdtemp(prefix='blog-bench-'), 'bench.db')
+    app = build_app(database)
+    with app.app_context():
+        prepare_data(args)
+        client = app.test_client()
+        login = client.post('/api/auth/login', json={'username': 'user1', 'password': PASSWORD})
+        ctx = Context(
+            client=client,
+            rng=random.Random(args.seed),
+            users=args.users,
+            published=list(db.session.scalars(
+                select(Post.id).where(Post.is_published.is_(True)).order_by(func.random()).limit(10_000)
+            )),
+            max_comment_id=db.session.scalar(select(func.max(Comment.id))) or 0,
+            headers={'Authorization': f'Bearer {login.json["access_token"]}'}
+        )
+        ctx.own_posts = [_new_post(ctx) for _ in range(5)]
+        ctx.own_comments = [_new_comment(ctx) for _ in range(5)]
+
+        results = {}
+        for route in ROUTES:
+            if args.only and not any(name in route.name for name in args.only):
+                continue
+            results[route.name] = time_route(ctx, route, args.iterations, args.warmup)
+            print(f"{route.name:<38} p50 {results[route.name]['p50_ms']:>9.2f}ms  "
+                  f"p95 {results[route.name]['p95_ms']:>9.2f}ms  "
+                  f"p99 {results[route.name]['p99_ms']:>9.2f}ms  "
+                  f"queries {results[route.name]['queries']:>3}", file=sys.stderr)
+    return {
+        'recorded_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'volumes': {'users': args.users, 'posts': args.posts, 'comments': args.comments},
+        'iterations': args.iterations,
+        'routes': results
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    if current['volumes'] != baseline['volumes']:
+        print('Warning: baseline was recorded with different volumes', baseline['volumes'], file=sys.stderr)
+    for name, result in current['routes'].items():
+        base = baseline['routes'].get(name)
+        if base is None:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {result['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if result['queries'] > base['queries']:
+            regressions.append(f"{name}: {result['queries']} queries vs baseline {base['queries']}")
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1_000)
+    parser.add_argument('--posts', type=int, default=20_000)
+    parser.add_argument('--comments', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', help='SQLite file to seed or reuse (default: a fresh temp file)')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--only', nargs='*', help='Run only routes whose name contains one of these')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p95 growth, 0.25 = 25%%')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--output', help='Also write the results JSON here')
+    args = parser.parse_args(argv)
+
+    current = run(args)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(current, fh, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as fh:
+            json.dump(current, fh, indent=2)
+            fh.write('\n')
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print('No baseline found; run with --update-baseline first')
+        return 0
+
+    with open(args.baseline) as fh:
+        regressions = compare(current, json.load(fh), args.threshold)
+    for line in regressions:
+        print(f'REGRESSION {line}')
+    if not regressions:
+        print('No regressions against baseline')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
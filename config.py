@@ -1,7 +1,7 @@
 
 import os
 from datetime import timedelta
-from typing import Optional
+from typing import Callable, Optional
 
 from dotenv import load_dotenv
 
@@ -15,15 +15,99 @@ class Config:
     SQLALCHEMY_DATABASE_URI: str = os.environ.get('DATABASE_URL') or 'sqlite:///blog.db'
     SQLALCHEMY_TRACK_MODIFICATIONS: bool = False
     SQLALCHEMY_ECHO: bool = False
+    # Set REPLICA_DATABASE_URL to serve @use_replica GET handlers from a read replica
+    SQLALCHEMY_BINDS: dict[str, str] = (
+        {'replica': os.environ['REPLICA_DATABASE_URL']} if os.environ.get('REPLICA_DATABASE_URL') else {}
+    )
+    REPLICA_STALENESS_SECONDS: float = 5  # a user's reads stay on the primary this long after they write
+    # Who wrote recently must be visible to every worker: 'sqlite' shares it through
+    # REPLICA_WRITERS_DATABASE, 'memory' only suits a single process
+    REPLICA_WRITERS_BACKEND: str = os.environ.get('REPLICA_WRITERS_BACKEND') or 'sqlite'
+    REPLICA_WRITERS_DATABASE: str = os.environ.get('REPLICA_WRITERS_DATABASE') or 'replica-writers.db'
+    
+    # Applied as PRAGMAs on every new SQLite connection; None keeps SQLite's default.
+    # WAL lets readers run alongside the single writer; NORMAL is durable across app
+    # crashes in WAL mode and only risks the last commits on power loss.
+    SQLITE_JOURNAL_MODE: Optional[str] = 'WAL'
+    SQLITE_SYNCHRONOUS: Optional[str] = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS: Optional[int] = 5000
+    SQLITE_MMAP_SIZE: Optional[int] = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: Optional[int] = -64000  # negative = KiB, so ~64 MB per connection
+    SQLITE_FOREIGN_KEYS: Optional[bool] = True
     
     JWT_SECRET_KEY: str = os.environ.get('JWT_SECRET_KEY') or SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES: timedelta = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES: timedelta = timedelta(days=30)
+    REVOCATION_REFRESH_SECONDS: float = 1.0  # how soon a logout in one worker reaches the others
+    REVOCATION_PRUNE_SECONDS: float = 3600  # expired revocations are dropped this often
     
     POSTS_PER_PAGE: int = 10
     COMMENTS_PER_PAGE: int = 20
+    POSTS_BATCH_MAX: int = 100
     
     BCRYPT_LOG_ROUNDS: int = 12
+    BCRYPT_WORKERS: Optional[int] = None  # defaults to os.cpu_count()
+    BCRYPT_QUEUE_LIMIT: int = 16  # waiting hashes beyond the pool before failing with 503
+    
+    RESPONSE_CACHE_ENABLED: bool = True
+    # Per process: a worker only drops entries for writes it handled, so other workers may
+    # serve the post list up to this long after a change (detail and threads follow the ETag)
+    RESPONSE_CACHE_TTL: int = 60  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    
+    # gzip, plus brotli when the optional brotli package is installed; see benchmarks/compression.py
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller bodies go out as they are
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_MIMETYPES: tuple[str, ...] = (
+        'application/json', 'text/html', 'text/plain', 'text/css', 'text/csv', 'application/javascript'
+    )
+    
+    IDENTITY_CACHE_TTL: int = 30  # seconds
+    IDENTITY_CACHE_MAX_ENTRIES: int = 10000
+    IDENTITY_CACHE_STATS_HOOK: Optional[Callable[[dict], None]] = None  # called with stats() every interval
+    IDENTITY_CACHE_STATS_INTERVAL: int = 1000  # lookups
+    
+    # Per-request SQL statement budgets keyed by endpoint; over-budget requests log a
+    # warning, or raise QueryBudgetExceeded when SQL_QUERY_BUDGET_STRICT is set
+    SQL_QUERY_BUDGET_DEFAULT: Optional[int] = None
+    SQL_QUERY_BUDGETS: dict[str, int] = {
+        'posts.get_posts': 3,
+        'posts.get_post': 2,
+        'posts.search_posts': 1,
+        'comments.get_post_comments': 4,
+        'comments.get_comment': 1,
+    }
+    SQL_QUERY_BUDGET_STRICT: bool = False
+    
+    # Token buckets checked before auth, validation and bcrypt; scope -> bucket kind ->
+    # (burst, seconds to refill it). Kinds: 'ip', 'username' (from the JSON body), 'user'
+    # (JWT identity). 'memory' limits per worker process; 'sqlite' shares buckets through
+    # RATE_LIMIT_DATABASE across every worker on the host.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = os.environ.get('RATE_LIMIT_BACKEND') or 'memory'
+    RATE_LIMIT_DATABASE: str = os.environ.get('RATE_LIMIT_DATABASE') or 'ratelimit.db'
+    RATE_LIMITS: dict[str, dict[str, tuple[int, float]]] = {
+        'login': {'ip': (20, 60), 'username': (5, 60)},
+        'register': {'ip': (5, 300)},
+        'refresh': {'ip': (30, 60)},  # refresh tokens carry no access identity, so per IP only
+        'write': {'user': (60, 60), 'ip': (120, 60)},
+    }
+    
+    # Post-commit side effects (app/utils/jobs.py). 'memory' runs them on in-process threads;
+    # 'sqlite' persists them to JOB_QUEUE_DATABASE for `flask worker`. A full queue makes the
+    # producing request run the job itself.
+    JOB_QUEUE_BACKEND: str = os.environ.get('JOB_QUEUE_BACKEND') or 'memory'
+    JOB_QUEUE_WORKERS: int = 2  # memory backend threads; 0 runs jobs in the committing request
+    JOB_QUEUE_MAX_SIZE: int = 1000
+    JOB_QUEUE_MAX_ATTEMPTS: int = 3
+    JOB_QUEUE_RETRY_DELAY: float = 1.0  # seconds, doubled after each failed attempt
+    JOB_QUEUE_DATABASE: str = os.environ.get('JOB_QUEUE_DATABASE') or 'jobs.db'
+    JOB_QUEUE_LEASE_SECONDS: float = 300  # a claimed job is retried if its worker has not finished by then
+    
+    METRICS_ENABLED: bool = True  # Prometheus /metrics; see app/utils/metrics.py for gunicorn setup
     
     CORS_ORIGINS: list[str] = ['http://localhost:3000', 'http://127.0.0.1:3000']
 
@@ -54,7 +138,11 @@ class TestingConfig(Config):
     TESTING: bool = True
     SQLALCHEMY_DATABASE_URI: str = 'sqlite:///:memory:'
     BCRYPT_LOG_ROUNDS: int = 4
-    JWT_ACCESS_TOKEN_EXPIRES: timedelta = timedelta(seconds=1)
+    JWT_ACCESS_TOKEN_EXPIRES: timedelta = timedelta(seconds=5)  # exp is whole seconds; 1s tokens could expire instantly
+    SQL_QUERY_BUDGET_STRICT: bool = True
+    JOB_QUEUE_BACKEND: str = 'memory'
+    JOB_QUEUE_WORKERS: int = 0  # deterministic: jobs finish before the response
+    REPLICA_WRITERS_BACKEND: str = 'memory'
 
 
 config: dict[str, type[Config]] = {
@@ -0,0 +1,45 @@
+"""Gunicorn settings, picked up automatically when gunicorn runs from the repo root.
+
+    FLASK_CONFIG=production gunicorn                     # run:app, preloaded, 2 x CPUs + 1 workers
+    GUNICORN_WORKERS=4 GUNICORN_PRELOAD=0 gunicorn       # every worker imports and builds the app itself
+
+With ``preload_app`` the master builds the app once and warms it (mappers, schemas,
+templates) before forking, so workers start immediately and share those pages
+copy-on-write. ``post_fork`` then drops what must stay per process: SQLAlchemy pools
+and the bcrypt executor. ``python -m benchmarks.prefork`` measures both modes.
+"""
+import multiprocessing
+import os
+
+from prometheus_client import multiprocess
+
+wsgi_app = 'run:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot accumulate; jitter avoids restarting them together
+max_requests = 10000
+max_requests_jitter = 1000
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from app.utils.prefork import warm_up
+        warm_up(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app.utils.prefork import reset_after_fork
+        reset_after_fork(server.app.wsgi())
+
+
+def child_exit(server, worker):
+    # Same as app.utils.metrics.mark_process_dead, without importing the app into a master
+    # that does not preload it; this hook runs inside the SIGCHLD handler, where an import
+    # can interrupt another half-finished one
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
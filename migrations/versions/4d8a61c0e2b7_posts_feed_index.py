@@ -0,0 +1,26 @@
+"""Posts feed index
+
+Revision ID: 4d8a61c0e2b7
+Revises: 2b29d30735dd
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4d8a61c0e2b7'
+down_revision = '2b29d30735dd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backs the keyset feed: WHERE is_published ORDER BY created_at DESC, id DESC
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index('ix_posts_published_created_id', ['is_published', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_published_created_id')
@@ -0,0 +1,32 @@
+"""Denormalized posts.comment_count
+
+Revision ID: 9f3b27d4a5c1
+Revises: 4d8a61c0e2b7
+Create Date: 2026-10-18 11:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9f3b27d4a5c1'
+down_revision = '4d8a61c0e2b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Same as `flask recount-comments`
+    op.execute(
+        "UPDATE posts SET comment_count = "
+        "(SELECT count(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
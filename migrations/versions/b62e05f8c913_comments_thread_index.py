@@ -0,0 +1,29 @@
+"""Comments thread index
+
+Revision ID: b62e05f8c913
+Revises: 9f3b27d4a5c1
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b62e05f8c913'
+down_revision = '9f3b27d4a5c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves thread pages (WHERE post_id ORDER BY created_at DESC, id DESC) and plain
+    # post_id lookups, so the single-column index is redundant
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_post_created_id', ['post_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_comments_post_id')
+
+
+def downgrade():
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('ix_comments_post_id', ['post_id'], unique=False)
+        batch_op.drop_index('ix_comments_post_created_id')
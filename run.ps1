@@ -20,12 +20,6 @@ Write-Host "Installing dependencies..."
 pip install -r requirements.txt
 
 Write-Host "Running DB migrations..."
-
-if (-Not (Test-Path "migrations")) {
-    flask db init
-}
-
-flask db migrate -m "Auto migration via script"
 flask db upgrade
 
 Write-Host "Starting Flask server..."
@@ -19,11 +19,6 @@ echo "Installing dependencies..."
 pip install -r requirements.txt
 
 echo "Running DB migrations..."
-if [ ! -d "migrations" ]; then
-    flask db init
-fi
-
-flask db migrate -m "Auto migration via script"
 flask db upgrade
 
 echo "Starting Flask server..."
@@ -0,0 +1,118 @@
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import create_engine
+from starlette.testclient import TestClient
+
+from app import create_app, db
+from app.asgi import create_asgi_app
+from config import TestingConfig, config
+
+
+@pytest.fixture
+def asgi_client(tmp_path):
+    database_uri = f'sqlite:///{tmp_path / "asgi.db"}'
+    config['asgi-testing'] = type('AsgiTestingConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': database_uri})
+    engine = create_engine(database_uri)
+    db.metadata.create_all(engine)
+    engine.dispose()
+    with TestClient(create_asgi_app('asgi-testing')) as client:
+        yield client
+
+
+def _register(client, username='john'):
+    response = client.post('/api/auth/register', json={
+        'username': username,
+        'email': f'{username}@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    assert response.status_code == 201
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+def test_post_and_comment_flow(asgi_client):
+    headers = _register(asgi_client)
+    assert asgi_client.post('/api/auth/register', json={
+        'username': 'john', 'email': 'other@example.com',
+        'password': 'TestPass123', 'confirm_password': 'TestPass123'
+    }).json()['details'] == {'username': ['Username already exists']}
+
+    login = asgi_client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    assert login.status_code == 200
+    assert asgi_client.post('/api/auth/login', json={'username': 'john', 'password': 'wrong'}).status_code == 401
+
+    created = asgi_client.post('/api/posts', json={'title': 'Async post', 'content': 'Body'}, headers=headers)
+    assert created.status_code == 201
+    post_id = created.json()['post']['id']
+    assert created.json()['post']['slug'] == 'async-post'
+
+    listing = asgi_client.get('/api/posts').json()
+    assert [post['title'] for post in listing['posts']] == ['Async post']
+    assert listing['pagination']['total'] == 1
+
+    comment = asgi_client.post('/api/comments', json={'name': 'John', 'content': 'Hi', 'post_id': post_id},
+                               headers=headers)
+    assert comment.status_code == 201
+    missing = asgi_client.post('/api/comments', json={'name': 'John', 'content': 'Hi', 'post_id': 999},
+                               headers=headers)
+    assert missing.status_code == 400
+
+    thread = asgi_client.get(f'/api/comments/posts/{post_id}?before=').json()
+    assert [c['content'] for c in thread['comments']] == ['Hi']
+    assert thread['post']['slug'] == 'async-post'
+
+    assert asgi_client.get('/api/posts/999').status_code == 404
+    assert asgi_client.post('/api/posts', json={'title': 'x', 'content': 'y'}).json() == {
+        'msg': 'Missing Authorization Header'
+    }
+
+
+def test_tokens_are_shared_with_the_flask_app(asgi_client):
+    asgi_token = _register(asgi_client)['Authorization'].split()[1]
+    flask_app = create_app('testing')
+    with flask_app.app_context():
+        assert decode_token(asgi_token)['sub'] == 1
+        flask_token = create_access_token(identity=1)
+
+    me = asgi_client.get('/api/auth/me', headers={'Authorization': f'Bearer {flask_token}'})
+    assert me.status_code == 200
+    assert me.json()['user']['username'] == 'john'
+    assert asgi_client.post('/api/auth/logout', headers={'Authorization': f'Bearer {flask_token}'}).status_code == 200
+    assert asgi_client.get('/api/auth/me', headers={'Authorization': f'Bearer {flask_token}'}).json() == {
+        'msg': 'Token has been revoked'
+    }
+
+
+def test_logout_twice_with_the_same_refresh_token(asgi_client):
+    _register(asgi_client)
+    first = asgi_client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'}).json()
+    refresh = {'refresh_token': first['refresh_token']}
+    assert asgi_client.post('/api/auth/logout', json=refresh,
+                            headers={'Authorization': f'Bearer {first["access_token"]}'}).status_code == 200
+
+    second = asgi_client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'}).json()
+    assert asgi_client.post('/api/auth/logout', json=refresh,
+                            headers={'Authorization': f'Bearer {second["access_token"]}'}).status_code == 200
+    assert asgi_client.post('/api/auth/logout', json={'refresh_token': second['refresh_token']},
+                            headers={'Authorization': f'Bearer {second["refresh_token"]}'}).status_code == 200
+
+
+def test_auth_and_writes_are_rate_limited(tmp_path):
+    database_uri = f'sqlite:///{tmp_path / "asgi.db"}'
+    config['asgi-limited'] = type('AsgiLimitedConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': database_uri,
+        'RATE_LIMITS': {'login': {'username': (1, 60)}, 'write': {'user': (1, 60)}},
+    })
+    engine = create_engine(database_uri)
+    db.metadata.create_all(engine)
+    engine.dispose()
+    with TestClient(create_asgi_app('asgi-limited')) as client:
+        headers = _register(client)
+        assert client.post('/api/auth/login', json={'username': 'JOHN', 'password': 'x'}).status_code == 401
+        limited = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+        assert limited.status_code == 429
+        assert 1 <= int(limited.headers['Retry-After']) <= 60
+
+        post = {'title': 'Title', 'content': 'Content'}
+        assert client.post('/api/posts', json=post, headers=headers).status_code == 201
+        assert client.put('/api/posts/1', json={'title': 'Edited'}, headers=headers).status_code == 429
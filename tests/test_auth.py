@@ -21,3 +21,122 @@ def test_login_user(client):
     })
     assert response.status_code == 200
     assert 'access_token' in response.json
+
+
+def test_identity_cache_hits_and_invalidation(app, client):
+    from app.auth.identity_cache import get_identity_cache
+    from app.models import User
+    from app.services import auth as auth_service
+
+    register = client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {register.json["access_token"]}'}
+
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+    assert get_identity_cache().stats()['hits'] >= 1
+
+    updated = client.put('/api/auth/me', json={'first_name': 'Johnny'}, headers=headers)
+    assert updated.json['user']['first_name'] == 'Johnny'
+    assert client.get('/api/auth/me', headers=headers).json['user']['first_name'] == 'Johnny'
+
+    auth_service.deactivate_user(User.query.filter_by(username='john').first())
+    assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+
+def test_login_rehashes_to_configured_cost(app, client):
+    from app.auth.hashing import get_password_hasher
+    from app.models import User
+
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    assert User.query.filter_by(username='john').first().password_hash.startswith('$2b$04$')
+
+    get_password_hasher().rounds = 5
+    response = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    assert response.status_code == 200
+    assert User.query.filter_by(username='john').first().password_hash.startswith('$2b$05$')
+
+
+def test_register_fails_fast_when_hasher_is_saturated(app, client):
+    from app.auth.hashing import get_password_hasher
+
+    hasher = get_password_hasher()
+    slots = hasher.max_workers + hasher.queue_limit
+    for _ in range(slots):
+        hasher._slots.acquire()
+    try:
+        response = client.post('/api/auth/register', json={
+            'username': 'john',
+            'email': 'john@example.com',
+            'password': 'TestPass123',
+            'confirm_password': 'TestPass123'
+        })
+        assert response.status_code == 503
+    finally:
+        for _ in range(slots):
+            hasher._slots.release()
+
+
+def test_logout_revokes_tokens_across_processes(app, client):
+    from app.auth.revocation import RevocationList, get_revocation_list
+    from app.models import RevokedToken
+
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    tokens = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'}).json
+    headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+
+    # A second worker's list, already warmed before the logout
+    other_worker = RevocationList(refresh_interval=0)
+    assert not other_worker.is_revoked('unknown')
+
+    response = client.post('/api/auth/logout', json={'refresh_token': tokens['refresh_token']}, headers=headers)
+    assert response.status_code == 200
+    assert client.get('/api/auth/me', headers=headers).json == {'msg': 'Token has been revoked'}
+    refresh = client.post('/api/auth/refresh', headers={'Authorization': f'Bearer {tokens["refresh_token"]}'})
+    assert refresh.status_code == 401
+
+    revoked = [token.jti for token in RevokedToken.query.all()]
+    assert len(revoked) == 2
+    assert all(other_worker.is_revoked(jti) for jti in revoked)
+    assert all(get_revocation_list().is_revoked(jti) for jti in revoked)
+
+
+
+def test_logout_twice_with_the_same_refresh_token(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    first = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'}).json
+    refresh = {'refresh_token': first['refresh_token']}
+    headers = {'Authorization': f'Bearer {first["access_token"]}'}
+    assert client.post('/api/auth/logout', json=refresh, headers=headers).status_code == 200
+
+    # The body's refresh token is already revoked
+    second = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'}).json
+    headers = {'Authorization': f'Bearer {second["access_token"]}'}
+    assert client.post('/api/auth/logout', json=refresh, headers=headers).status_code == 200
+
+    # The same token as bearer and in the body
+    refresh = {'refresh_token': second['refresh_token']}
+    headers = {'Authorization': f'Bearer {second["refresh_token"]}'}
+    assert client.post('/api/auth/logout', json=refresh, headers=headers).status_code == 200
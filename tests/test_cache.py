@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app import db
+from app.models import Post
+from app.utils.cache import ResponseCache
+
+
+def test_response_cache_lru_bytes_and_tags():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=10)
+    cache.set('a', b'1234', 200, 'application/json', {'post:1'})
+    cache.set('b', b'1234', 200, 'application/json', {'post:2'})
+    cache.get('a')
+    cache.set('c', b'1234', 200, 'application/json', {'post:1'})
+
+    assert cache.get('b') is None  # least recently used, evicted by the byte cap
+    assert cache.get('a').body == b'1234'
+
+    cache.invalidate('post:1')
+    assert cache.get('a') is None
+    assert cache.get('c') is None
+    assert cache.stats()['hits'] == 2
+
+
+def test_post_detail_is_cached_until_updated(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers=headers).json['post']
+
+    assert client.get(f'/api/posts/{post["id"]}').headers['X-Cache'] == 'MISS'
+    assert client.get(f'/api/posts/{post["id"]}').headers['X-Cache'] == 'HIT'
+
+    client.put(f'/api/posts/{post["id"]}', json={'title': 'Edited'}, headers=headers)
+    response = client.get(f'/api/posts/{post["id"]}')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.json['post']['title'] == 'Edited'
+
+
+def test_cached_body_follows_the_validator_version(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    post = client.post('/api/posts', json={
+        'title': 'Old',
+        'content': 'Content here'
+    }, headers={'Authorization': f'Bearer {login.json["access_token"]}'}).json['post']
+    url = f'/api/posts/{post["id"]}'
+    old = client.get(url)
+
+    # Written by another worker: this process's cache never hears about it
+    db.session.execute(
+        update(Post).where(Post.id == post['id'])
+        .values(title='New', updated_at=datetime.utcnow() + timedelta(seconds=1))
+    )
+    db.session.commit()
+
+    response = client.get(url, headers={'If-None-Match': old.headers['ETag']})
+    assert response.status_code == 200
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.json['post']['title'] == 'New'
+    assert client.get(url).headers['X-Cache'] == 'HIT'
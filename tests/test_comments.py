@@ -25,3 +25,161 @@ def test_add_comment(client):
     }, headers={'Authorization': f'Bearer {token}'})
     assert response.status_code == 201
     assert 'comment' in response.json
+
+
+def test_comment_count_is_maintained(app, client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers=headers).json['post']
+
+    comment_ids = [
+        client.post('/api/comments', json={
+            'name': 'John',
+            'content': f'Comment {i}',
+            'post_id': post['id']
+        }, headers=headers).json['comment']['id']
+        for i in range(3)
+    ]
+    client.delete(f'/api/comments/{comment_ids[0]}', headers=headers)
+
+    listed = client.get('/api/posts').json['posts'][0]
+    assert listed['comment_count'] == 2
+
+    from app import db
+    from app.models import Post
+    db.session.query(Post).update({'comment_count': 42})
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['recount-comments'])
+    assert 'on 1 post(s)' in result.output
+    assert client.get(f'/api/posts/{post["id"]}').json['post']['comment_count'] == 2
+
+
+def test_post_comments_conditional_get(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers=headers).json['post']
+    url = f'/api/comments/posts/{post["id"]}'
+
+    first = client.get(url)
+    etag = first.headers['ETag']
+    assert etag.startswith('W/')
+    assert 'Last-Modified' in first.headers
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    client.post('/api/comments', json={
+        'name': 'John',
+        'content': 'Great post!',
+        'post_id': post['id']
+    }, headers=headers)
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert len(changed.json['comments']) == 1
+
+    # The commenter renames themselves; the nested author in the thread changes
+    client.put('/api/auth/me', json={'first_name': 'Johnny', 'last_name': 'Doe'}, headers=headers)
+    renamed = client.get(url, headers={'If-None-Match': changed.headers['ETag']})
+    assert renamed.status_code == 200
+    assert renamed.json['comments'][0]['author']['full_name'] == 'Johnny Doe'
+
+    post_etag = client.get(f'/api/posts/{post["id"]}').headers['ETag']
+    assert client.get(f'/api/posts/{post["id"]}', headers={'If-None-Match': post_etag}).status_code == 304
+    assert client.get('/api/posts/999', headers={'If-None-Match': post_etag}).status_code == 404
+
+
+def test_post_comments_before_cursor(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers=headers).json['post']
+    for i in range(5):
+        client.post('/api/comments', json={
+            'name': 'John',
+            'content': f'Comment {i}',
+            'post_id': post['id']
+        }, headers=headers)
+    url = f'/api/comments/posts/{post["id"]}'
+
+    first = client.get(f'{url}?before=&per_page=3')
+    assert first.status_code == 200
+    assert [c['content'] for c in first.json['comments']] == ['Comment 4', 'Comment 3', 'Comment 2']
+    assert first.json['post']['id'] == post['id']
+    assert first.json['pagination']['has_next'] is True
+
+    cursor = first.json['pagination']['next_cursor']
+    second = client.get(f'{url}?before={cursor}&per_page=3')
+    assert [c['content'] for c in second.json['comments']] == ['Comment 1', 'Comment 0']
+    assert second.json['pagination']['next_cursor'] is None
+
+    legacy = client.get(f'{url}?page=2&per_page=3').json['pagination']
+    assert (legacy['total'], legacy['pages'], legacy['has_next'], legacy['has_prev']) == (5, 2, False, True)
+
+    assert client.get(f'{url}?before=not-a-cursor').status_code == 400
+    assert client.get('/api/comments/posts/999?before=').status_code == 404
+
+
+def test_deleting_post_cascades_to_comments(client):
+    from sqlalchemy import func, select
+    from app import db
+    from app.models import Comment
+
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers=headers).json['post']
+    client.post('/api/comments', json={
+        'name': 'John',
+        'content': 'Great post!',
+        'post_id': post['id']
+    }, headers=headers)
+
+    # passive_deletes leaves this to ON DELETE CASCADE, which needs PRAGMA foreign_keys
+    assert db.session.execute(db.text('PRAGMA foreign_keys')).scalar() == 1
+    client.delete(f'/api/posts/{post["id"]}', headers=headers)
+    assert db.session.scalar(select(func.count(Comment.id))) == 0
@@ -0,0 +1,61 @@
+import gzip
+import json
+
+from app.utils.cache import ResponseCache, get_response_cache
+
+
+def _create_post(client, content):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    return client.post('/api/posts', json={'title': 'Long post', 'content': content},
+                       headers=headers).json['post']
+
+
+def test_large_responses_are_gzipped_and_cached_compressed(app, client):
+    post = _create_post(client, 'Lorem ipsum dolor sit amet. ' * 200)
+    url = f'/api/posts/{post["id"]}'
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    assert 'Accept-Encoding' in plain.headers['Vary']
+
+    compressed = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert compressed.headers['X-Cache'] == 'HIT'
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert int(compressed.headers['Content-Length']) < len(plain.data) // 10
+    assert json.loads(gzip.decompress(compressed.data)) == plain.json
+
+    cache = get_response_cache()
+    key = next(key for key in cache._entries if key.startswith(f'posts.get_post:{url}?#'))
+    entry = cache.get(key)
+    assert entry.encoded['gzip'] == compressed.data
+    assert client.get(url, headers={'Accept-Encoding': 'gzip'}).data == compressed.data
+    assert 'Content-Encoding' not in client.get(url, headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+
+def test_small_responses_are_not_compressed(client):
+    post = _create_post(client, 'Short')
+    response = client.get(f'/api/posts/{post["id"]}', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_cache_counts_compressed_variants():
+    cache = ResponseCache(ttl=60, max_entries=10, max_bytes=10)
+    entry = cache.set('a', b'1234', 200, 'application/json', {'post:1'})
+    cache.add_encoding('a', entry, 'gzip', b'12')
+    assert cache.stats()['bytes'] == 6
+
+    replaced = cache.set('a', b'5678', 200, 'application/json', {'post:1'})
+    cache.add_encoding('a', entry, 'gzip', b'12')  # stale entry: ignored
+    assert replaced.encoded == {}
+    assert cache.stats()['bytes'] == 4
+
+    cache.add_encoding('a', replaced, 'gzip', b'1234567')
+    assert cache.get('a') is None  # over the byte cap once the variant is added
@@ -0,0 +1,63 @@
+import json
+
+
+def test_export_posts_ndjson(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    for title in ('First', 'Second'):
+        client.post('/api/posts', json={'title': title, 'content': 'Body'}, headers=headers)
+    client.post('/api/comments', json={'name': 'John', 'content': 'Nice', 'post_id': 2}, headers=headers)
+
+    response = client.get('/api/export/posts.ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [post['title'] for post in lines] == ['First', 'Second']
+    assert lines[0]['comments'] == []
+    assert [comment['content'] for comment in lines[1]['comments']] == ['Nice']
+
+    future = client.get('/api/export/posts.ndjson?since=2999-01-01T00:00:00')
+    assert future.data == b''
+    assert client.get('/api/export/posts.ndjson?since=yesterday').status_code == 400
+
+
+def test_export_skips_comments_of_posts_missing_from_the_post_stream(app, client, monkeypatch):
+    from app import db
+    from app.services.export import iter_posts_with_comments
+
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    for title in ('First', 'Second'):
+        client.post('/api/posts', json={'title': title, 'content': 'Body'}, headers=headers)
+    for post_id in (1, 2):
+        client.post('/api/comments', json={'name': 'John', 'content': f'On {post_id}', 'post_id': post_id},
+                    headers=headers)
+
+    # Post 1 is unpublished between the post SELECT and the comment SELECT
+    execute = db.session.execute
+    calls = []
+
+    def execute_posts_without_first(statement, *args, **kwargs):
+        result = execute(statement, *args, **kwargs)
+        calls.append(statement)
+        return [row for row in result if row.id != 1] if len(calls) == 1 else result
+
+    monkeypatch.setattr(db.session, 'execute', execute_posts_without_first)
+    exported = list(iter_posts_with_comments())
+    assert [post['title'] for post in exported] == ['Second']
+    assert [comment['content'] for comment in exported[0]['comments']] == ['On 2']
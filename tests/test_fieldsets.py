@@ -0,0 +1,80 @@
+from sqlalchemy import event
+
+from app import db
+from app.schemas import PostListSchema
+from app.utils.fieldsets import restricted_schema
+
+
+def _create_post(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    post = client.post('/api/posts', json={'title': 'Test Post', 'content': 'Content here'},
+                       headers=headers).json['post']
+    client.post('/api/comments', json={'name': 'John', 'content': 'Hi', 'post_id': post['id']},
+                headers=headers)
+    db.session.expunge_all()  # later requests load from the database, not the identity map
+    return post
+
+
+def _capture_selects(app):
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_post_list_fields_are_selected_in_sql(app, client):
+    _create_post(client)
+    statements = _capture_selects(app)
+
+    response = client.get('/api/posts?fields=id,title,slug,created_at')
+    assert response.status_code == 200
+    assert response.json['posts'] == [{
+        'id': 1, 'title': 'Test Post', 'slug': 'test-post',
+        'created_at': response.json['posts'][0]['created_at']
+    }]
+    selects = [s for s in statements if 'FROM posts' in s and 'count(' not in s]
+    assert selects and all('posts.content' not in s for s in selects)
+    assert not any('FROM users' in s for s in statements)  # author not requested
+
+    assert client.get('/api/posts?fields=title,author').json['posts'][0]['author']['username'] == 'john'
+    assert restricted_schema(PostListSchema, frozenset({'title'}), True) is \
+        restricted_schema(PostListSchema, ['title'], True)
+
+
+def test_unknown_or_empty_fields_are_rejected(client):
+    _create_post(client)
+    response = client.get('/api/posts?fields=id,content')  # the list schema never dumps content
+    assert response.status_code == 400
+    assert response.json == {'error': 'Unknown fields: content'}
+    assert client.get('/api/posts/1?fields=').status_code == 400
+    assert client.get('/api/comments/posts/1?fields=password').status_code == 400
+
+
+def test_post_detail_and_comments_fields(client):
+    post = _create_post(client)
+
+    full = client.get(f'/api/posts/{post["id"]}')
+    sparse = client.get(f'/api/posts/{post["id"]}?fields=title,content')
+    assert sparse.json == {'post': {'title': 'Test Post', 'content': 'Content here'}}
+    assert sparse.headers['ETag'] != full.headers['ETag']
+
+    thread = client.get(f'/api/comments/posts/{post["id"]}?fields=id,content')
+    assert thread.json['comments'] == [{'id': 1, 'content': 'Hi'}]
+    assert client.get('/api/comments/1?fields=name').json == {'comment': {'name': 'John'}}
+
+
+def test_comment_thread_never_selects_post_content(app, client):
+    post = _create_post(client)
+    statements = _capture_selects(app)
+
+    thread = client.get(f'/api/comments/posts/{post["id"]}')
+    assert thread.json['post'] == {'id': post['id'], 'title': 'Test Post', 'slug': 'test-post'}
+    selects = [s for s in statements if 'FROM posts' in s]
+    assert selects and all('posts.content' not in s for s in selects)
@@ -0,0 +1,97 @@
+import logging
+import sqlite3
+import threading
+import time
+
+from app import create_app, db
+from app.utils.jobs import JobQueue, enqueue_after_commit, get_job_queue, job
+from config import TestingConfig, config
+
+calls = []
+
+
+@job('tests.record')
+def record(value: int) -> None:
+    calls.append(value)
+
+
+@job('tests.flaky')
+def flaky(value: int) -> None:
+    calls.append(value)
+    if len(calls) < 2:
+        raise RuntimeError('first attempt fails')
+
+
+def test_jobs_run_after_commit_only(app):
+    calls.clear()
+    db.session.execute(db.text('SELECT 1'))
+    enqueue_after_commit('tests.record', value=1)
+    db.session.rollback()
+    enqueue_after_commit('tests.record', value=2)
+    assert calls == []
+    db.session.commit()
+    assert calls == [2]
+
+
+def test_post_creation_logs_through_the_queue(client, caplog):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+
+    with caplog.at_level(logging.INFO, logger='app.posts'):
+        client.post('/api/posts', json={'title': 'Queued', 'content': 'Content'}, headers=headers)
+    assert "Post created: #1 'Queued' by john" in caplog.text
+
+
+def test_memory_queue_retries_and_applies_backpressure(app):
+    calls.clear()
+    queue = JobQueue(app, workers=1, max_size=2, retry_delay=0.01)
+    queue.submit('tests.flaky', {'value': 7})
+    deadline = time.monotonic() + 2
+    while len(calls) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert calls == [7, 7]
+
+    # The only worker is busy and two jobs are waiting: the queue is full
+    release = threading.Event()
+    job('tests.block')(lambda: release.wait(2))
+    queue.submit('tests.block', {})
+    while queue.depth():
+        time.sleep(0.01)
+    assert queue.submit('tests.record', {'value': 1})
+    assert queue.submit('tests.record', {'value': 2})
+    assert not queue.submit('tests.record', {'value': 3})
+    release.set()
+
+
+def test_sqlite_queue_is_drained_by_flask_worker(tmp_path):
+    config['jobs-testing'] = type('JobsTestingConfig', (TestingConfig,), {
+        'JOB_QUEUE_BACKEND': 'sqlite',
+        'JOB_QUEUE_DATABASE': str(tmp_path / 'jobs.db'),
+        'JOB_QUEUE_MAX_ATTEMPTS': 2,
+        'JOB_QUEUE_RETRY_DELAY': 0,
+    })
+    app = create_app('jobs-testing')
+    calls.clear()
+    with app.app_context():
+        enqueue_after_commit('tests.record', value=3)
+        enqueue_after_commit('tests.record', value='not an int')
+        db.session.commit()
+        assert calls == []
+        assert get_job_queue().depth() == 2
+
+    job('tests.record')(lambda value: calls.append(value + 1))
+    try:
+        result = app.test_cli_runner().invoke(args=['worker', '--burst'])
+    finally:
+        job('tests.record')(record)
+    assert 'Processed 3 job(s).' in result.output
+    assert calls == [4]
+
+    rows = sqlite3.connect(tmp_path / 'jobs.db').execute('SELECT attempts, failed, last_error FROM jobs').fetchall()
+    assert rows == [(2, 1, 'TypeError: can only concatenate str (not "int") to str')]
@@ -0,0 +1,15 @@
+def test_metrics_endpoint(client):
+    client.get('/api/posts')
+    client.get('/api/posts')
+    client.get('/api/posts/999')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'http_requests_total{endpoint="posts.get_posts",status="200"}' in body
+    assert 'http_request_duration_seconds_bucket{endpoint="posts.get_post",le="0.005",status="404"}' in body
+    assert 'db_pool_checked_out' in body
+    assert 'bcrypt_queue_depth' in body
+    assert 'response_cache_lookups_total{result="hit"}' in body
+    assert 'response_cache_entries' in body
@@ -16,3 +16,167 @@ def test_create_post(client):
     }, headers={'Authorization': f'Bearer {token}'})
     assert response.status_code == 201
     assert 'post' in response.json
+
+
+def test_get_posts_cursor_pagination(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    token = login.json['access_token']
+    for i in range(5):
+        client.post('/api/posts', json={
+            'title': f'Post {i}',
+            'content': 'Some content'
+        }, headers={'Authorization': f'Bearer {token}'})
+
+    first = client.get('/api/posts?cursor=&per_page=3')
+    assert first.status_code == 200
+    assert [p['title'] for p in first.json['posts']] == ['Post 4', 'Post 3', 'Post 2']
+    assert 'total' not in first.json['pagination']
+    assert first.json['pagination']['has_next'] is True
+
+    cursor = first.json['pagination']['next_cursor']
+    second = client.get(f'/api/posts?cursor={cursor}&per_page=3')
+    assert [p['title'] for p in second.json['posts']] == ['Post 1', 'Post 0']
+    assert second.json['pagination']['next_cursor'] is None
+
+    assert client.get('/api/posts?cursor=not-a-cursor').status_code == 400
+
+
+def test_get_posts_query_count_is_fixed(app, client):
+    from sqlalchemy import event
+    from app import db
+    from app.models import Post, User
+
+    authors = [User(username=f'author{i}', email=f'author{i}@example.com', password='TestPass123')
+               for i in range(3)]
+    db.session.add_all(authors)
+    db.session.flush()
+    db.session.add_all([
+        Post(title=f'Post {i}', content='Some content', author_id=authors[i % 3].id)
+        for i in range(50)
+    ])
+    db.session.commit()
+    db.session.expunge_all()
+
+    statements = []
+    def count(*args):
+        statements.append(args)
+
+    event.listen(db.engine, 'before_cursor_execute', count)
+    try:
+        for per_page in (5, 50):
+            statements.clear()
+            response = client.get(f'/api/posts?cursor=&per_page={per_page}')
+            assert len(response.json['posts']) == per_page
+            assert response.json['posts'][0]['author']['username'].startswith('author')
+            assert len(statements) == 2
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count)
+
+
+def test_create_posts_batch(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    client.post('/api/posts', json={'title': 'Hello World', 'content': 'First'}, headers=headers)
+
+    response = client.post('/api/posts/batch', json={'posts': [
+        {'title': 'Hello World', 'content': 'Second'},
+        {'title': '', 'content': 'Missing title'},
+        {'title': 'Hello World', 'content': 'Third'}
+    ]}, headers=headers)
+
+    assert response.status_code == 201
+    assert response.json['created'] == 2
+    assert response.json['failed'] == 1
+    results = response.json['results']
+    assert [r['status'] for r in results] == ['created', 'invalid', 'created']
+    assert [results[0]['slug'], results[2]['slug']] == ['hello-world-2', 'hello-world-3']
+    assert client.get('/api/posts').json['pagination']['total'] == 3
+
+    from app import db
+    from app.services.posts import slug_conflicts_query
+
+    # Only the base slug and its suffixed variants are collision candidates
+    client.post('/api/posts', json={'title': 'Hello Worlds', 'content': 'Other'}, headers=headers)
+    assert set(db.session.scalars(slug_conflicts_query(['Hello World']))) == {
+        'hello-world', 'hello-world-2', 'hello-world-3'
+    }
+
+
+def test_search_posts(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    client.post('/api/posts', json={'title': 'Gardening notes', 'content': 'Tomatoes like sun'}, headers=headers)
+    client.post('/api/posts', json={'title': 'Tomatoes', 'content': 'A post about tomatoes'}, headers=headers)
+    client.post('/api/posts', json={'title': 'Unrelated', 'content': 'Nothing here'}, headers=headers)
+    client.put('/api/posts/3', json={'content': 'Now it mentions a tomato'}, headers=headers)
+
+    response = client.get('/api/posts/search?q=tomato')
+    assert response.status_code == 200
+    results = response.json['results']
+    assert [r['title'] for r in results][0] == 'Tomatoes'
+    assert {r['id'] for r in results} == {1, 2, 3}
+    assert '<mark>' in results[0]['snippet']
+
+    client.delete('/api/posts/2', headers=headers)
+    assert {r['id'] for r in client.get('/api/posts/search?q=tomatoes').json['results']} == {1, 3}
+    assert client.get('/api/posts/search?q=%22%29').status_code == 400
+
+    # User text is escaped; only the match markers become tags
+    client.post('/api/posts', json={
+        'title': '<b>Pumpkin</b>', 'content': '<script>alert(1)</script> pumpkin pie'
+    }, headers=headers)
+    result = client.get('/api/posts/search?q=pumpkin').json['results'][0]
+    assert result['title_highlight'] == '&lt;b&gt;<mark>Pumpkin</mark>&lt;/b&gt;'
+    assert result['snippet'] == '&lt;script&gt;alert(1)&lt;/script&gt; <mark>pumpkin</mark> pie'
+
+
+def test_seed_command(app, client):
+    from sqlalchemy import func, select
+    from app import db
+    from app.models import Comment, Post
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['seed', '--users', '3', '--posts', '10', '--comments', '40', '--seed', '7'])
+    assert result.exit_code == 0, result.output
+    assert 'Seeded 3 user(s), 10 post(s) and 40 comment(s)' in result.output
+
+    slugs = db.session.scalars(select(Post.slug).order_by(Post.id)).all()
+    assert len(set(slugs)) == 10 and slugs[0].endswith('-1')
+    assert db.session.scalar(select(func.sum(Post.comment_count))) == 40
+    assert db.session.scalar(select(func.count(Comment.id))) == 40
+
+    # Appends after existing rows instead of colliding with them
+    runner.invoke(args=['seed', '--users', '1', '--posts', '1', '--comments', '0'])
+    assert db.session.scalar(select(Post.slug).where(Post.id == 11)).endswith('-11')
+
+    login = client.post('/api/auth/login', json={'username': 'user1', 'password': 'SeedPass123'})
+    assert login.status_code == 200
+
+    assert runner.invoke(args=['seed', '--users', '0', '--posts', '5']).exit_code != 0
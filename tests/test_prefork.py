@@ -0,0 +1,37 @@
+import gc
+
+from app import create_app, db
+from app.utils.prefork import reset_after_fork, warm_up
+from config import TestingConfig, config
+
+
+def test_reset_after_fork_replaces_pools(tmp_path):
+    config['prefork-testing'] = type('PreforkTestingConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "prefork.db"}'
+    })
+    app = create_app('prefork-testing')
+    with app.app_context():
+        db.create_all()
+        db.session.remove()
+        pool = db.engine.pool
+    hasher = app.extensions['password_hasher']
+    executor = hasher._executor
+
+    try:
+        warm_up(app)
+    finally:
+        gc.unfreeze()
+    reset_after_fork(app)
+
+    with app.app_context():
+        assert db.engine.pool is not pool
+    assert hasher._executor is not executor
+    assert hasher.in_flight == 0
+
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={
+        'username': 'john', 'email': 'john@example.com',
+        'password': 'TestPass123', 'confirm_password': 'TestPass123'
+    })
+    assert response.status_code == 201
+    assert client.get('/api/posts').status_code == 200
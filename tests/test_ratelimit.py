@@ -0,0 +1,81 @@
+from app.utils.ratelimit import MemoryBuckets, SQLiteBuckets
+
+
+def _login(client, username='john', password='TestPass123'):
+    return client.post('/api/auth/login', json={'username': username, 'password': password})
+
+
+def test_login_is_limited_per_username_before_bcrypt(app, client, monkeypatch):
+    app.config['RATE_LIMITS'] = {'login': {'ip': (10, 60), 'username': (2, 60)}}
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    verified = []
+    monkeypatch.setattr('app.models.user.verify_password', lambda *args: verified.append(args) or False)
+
+    assert _login(client).status_code == 401
+    assert _login(client).status_code == 401
+    limited = _login(client)
+    assert limited.status_code == 429
+    assert limited.json['error'] == 'Too many requests'
+    assert 1 <= int(limited.headers['Retry-After']) <= 30
+    assert len(verified) == 2  # the rejected attempt never reached bcrypt
+
+    # Another username still has its own bucket, until the shared per-IP bucket runs dry
+    statuses = [_login(client, username=f'user{index}').status_code for index in range(8)]
+    assert statuses == [401] * 7 + [429]
+
+
+def test_write_limit_keys_on_the_token_identity(app, client):
+    app.config['RATE_LIMITS'] = {'write': {'user': (1, 60)}}
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {_login(client).json["access_token"]}'}
+    post = {'title': 'Title', 'content': 'Content'}
+
+    assert client.post('/api/posts', json=post, headers=headers).status_code == 201
+    assert client.post('/api/posts', json=post, headers=headers).status_code == 429
+    # No identity, no bucket: auth_required answers instead
+    assert client.post('/api/posts', json=post).status_code == 401
+
+    # Every other mutating route spends from the same bucket
+    assert client.put('/api/posts/1', json={'title': 'Edited'}, headers=headers).status_code == 429
+    assert client.delete('/api/posts/1', headers=headers).status_code == 429
+    assert client.delete('/api/comments/1', headers=headers).status_code == 429
+    assert client.put('/api/auth/me', json={'first_name': 'John'}, headers=headers).status_code == 429
+    assert client.post('/api/auth/logout', headers=headers).status_code == 429
+
+
+def test_html_forms_are_limited_on_submit_only(app, client):
+    app.config['RATE_LIMITS'] = {'login': {'username': (1, 60)}, 'register': {'ip': (1, 60)}}
+    form = {'username': 'john', 'email': 'john@example.com',
+            'password': 'TestPass123', 'confirm_password': 'TestPass123'}
+
+    assert client.post('/register', data=form).status_code == 302
+    assert client.post('/register', data=form).status_code == 429
+    assert client.get('/register').status_code == 200
+
+    assert client.post('/login', data={'username': 'John', 'password': 'wrong'}).status_code == 200
+    assert client.post('/login', data={'username': 'john', 'password': 'TestPass123'}).status_code == 429
+    assert client.get('/login').status_code == 200
+
+
+def test_backends_refill_at_the_configured_rate(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('app.utils.ratelimit.time.monotonic', lambda: now[0])
+    monkeypatch.setattr('app.utils.ratelimit.time.time', lambda: now[0])
+
+    for buckets in (MemoryBuckets(), SQLiteBuckets(str(tmp_path / 'buckets.db'))):
+        assert [buckets.take('k', 2, 0.5) for _ in range(3)] == [0, 0, 2.0]
+        now[0] += 1
+        assert buckets.take('k', 2, 0.5) == 1.0
+        now[0] += 1
+        assert buckets.take('k', 2, 0.5) == 0
+        now[0] += 100
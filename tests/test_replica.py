@@ -0,0 +1,122 @@
+import time
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import create_app, db
+from app.utils.replica import SQLiteRecentWriters
+from app.models import Post, User
+from config import TestingConfig, config
+
+
+class ReplicaTestingConfig(TestingConfig):
+    SQLALCHEMY_BINDS = {'replica': 'sqlite:///:memory:'}
+    REPLICA_STALENESS_SECONDS = 0.5
+    RESPONSE_CACHE_ENABLED = False
+
+
+def _replica_app(tmp_path, **settings):
+    # Shared between workers, as under gunicorn
+    config['replica-testing'] = type('SharedWritersReplicaTestingConfig', (ReplicaTestingConfig,), {
+        'REPLICA_WRITERS_BACKEND': 'sqlite',
+        'REPLICA_WRITERS_DATABASE': str(tmp_path / 'writers.db'),
+        **settings,
+    })
+    app = create_app('replica-testing')
+    try:
+        with app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines['replica'])
+            yield app
+            db.session.remove()
+            db.drop_all(bind_key=None)
+    finally:
+        # init_app registers a metadata per bind on the shared extension; later apps have no replica
+        db.metadatas.pop('replica', None)
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    yield from _replica_app(tmp_path)
+
+
+@pytest.fixture
+def cached_replica_app(tmp_path):
+    yield from _replica_app(tmp_path, RESPONSE_CACHE_ENABLED=True)
+
+
+def _titles(response):
+    return [post['title'] for post in response.json['posts']]
+
+
+def test_reads_use_replica_until_the_caller_writes(replica_app):
+    client = replica_app.test_client()
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+
+    # Replicate the user row only, so the replica lags behind the post written below
+    user_row = db.session.execute(select(User.__table__)).mappings().one()
+    with db.engines['replica'].begin() as conn:
+        conn.execute(insert(User.__table__), dict(user_row))
+
+    client.post('/api/posts', json={'title': 'Fresh post', 'content': 'Content'}, headers=headers)
+
+    assert _titles(client.get('/api/posts')) == []
+    assert _titles(client.get('/api/posts', headers=headers)) == ['Fresh post']
+
+    time.sleep(0.6)
+    assert _titles(client.get('/api/posts', headers=headers)) == []
+    assert client.get('/api/auth/me', headers=headers).json['user']['username'] == 'john'
+
+    # Unmarked handlers and writes always go to the primary
+    assert db.session.scalar(select(Post.title)) == 'Fresh post'
+
+
+def test_replica_reads_do_not_cache_stale_pages_for_writers(cached_replica_app):
+    client = cached_replica_app.test_client()
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+    client.post('/api/posts', json={'title': 'Old', 'content': 'Content'}, headers=headers)
+
+    # The replica catches up, then lags behind the edit below
+    with db.engines['replica'].begin() as conn:
+        for model in (User, Post):
+            rows = db.session.execute(select(model.__table__)).mappings().all()
+            conn.execute(insert(model.__table__), [dict(row) for row in rows])
+    time.sleep(0.6)
+    assert _titles(client.get('/api/posts')) == ['Old']
+    assert client.get('/api/posts').headers['X-Cache'] == 'HIT'
+
+    client.put('/api/posts/1', json={'title': 'New'}, headers=headers)
+
+    # Anonymous reads still see the lagging replica, but no longer fill the cache with it
+    for _ in range(2):
+        response = client.get('/api/posts')
+        assert _titles(response) == ['Old'] and response.headers['X-Cache'] == 'MISS'
+    assert _titles(client.get('/api/posts', headers=headers)) == ['New']
+    assert client.get('/api/posts/1', headers=headers).json['post']['title'] == 'New'
+
+
+def test_recent_writers_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'writers.db')
+    worker_a, worker_b = SQLiteRecentWriters(path, window=0.3), SQLiteRecentWriters(path, window=0.3)
+    worker_a.record('1')
+    assert worker_b.is_recent('1')
+    assert not worker_b.is_recent('2')
+    time.sleep(0.35)
+    assert not worker_b.is_recent('1')
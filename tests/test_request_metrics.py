@@ -0,0 +1,51 @@
+import pytest
+
+from app.utils.request_metrics import QueryBudgetExceeded
+
+
+def _create_post(client):
+    client.post('/api/auth/register', json={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    login = client.post('/api/auth/login', json={
+        'username': 'john',
+        'password': 'TestPass123'
+    })
+    return client.post('/api/posts', json={
+        'title': 'Test Post',
+        'content': 'Content here'
+    }, headers={'Authorization': f'Bearer {login.json["access_token"]}'}).json['post']
+
+
+def test_server_timing_header(client):
+    post = _create_post(client)
+    response = client.get(f'/api/posts/{post["id"]}')
+
+    timing = response.headers['Server-Timing']
+    assert 'db;dur=' in timing and 'desc="2 queries"' in timing
+    assert 'serialize;dur=' in timing
+    assert 'total;dur=' in timing
+
+
+def test_server_timing_reports_amortized_queries(client):
+    _create_post(client)
+    login = client.post('/api/auth/login', json={'username': 'john', 'password': 'TestPass123'})
+    headers = {'Authorization': f'Bearer {login.json["access_token"]}'}
+
+    # The revocation snapshot was refreshed by the first authenticated request, on behalf of all
+    assert 'amortized' not in client.get('/api/auth/me', headers=headers).headers['Server-Timing']
+
+    client.application.extensions['revocation_list']._next_refresh = 0
+    timing = client.get('/api/auth/me', headers=headers).headers['Server-Timing']
+    assert ', 1 amortized"' in timing
+
+
+def test_query_budget_raises_in_testing(app, client):
+    post = _create_post(client)
+    app.config['SQL_QUERY_BUDGETS'] = {'posts.get_post': 1}
+
+    with pytest.raises(QueryBudgetExceeded, match='ran 2 queries, budget is 1'):
+        client.get(f'/api/posts/{post["id"]}')
@@ -0,0 +1,16 @@
+def test_ui_renders_in_process(client):
+    response = client.post('/register', data={
+        'username': 'john',
+        'email': 'john@example.com',
+        'password': 'TestPass123',
+        'confirm_password': 'TestPass123'
+    })
+    assert response.status_code == 302
+
+    client.post('/posts/new', data={'title': 'Rendered Post', 'content': 'Rendered content'})
+    assert b'Rendered Post' in client.get('/').data
+
+    client.post('/posts/1', data={'content': 'Nice one'})
+    page = client.get('/posts/1')
+    assert b'Rendered content' in page.data
+    assert b'Nice one' in page.data